@@ -47,6 +47,10 @@ sp.add_compilation_target(
     "SavingsPool",
     SavingsPool(Constants.DEFAULT_ADDRESS, 0, {}),
 )
+sp.add_compilation_target(
+    "SavingsPoolBalanceView",
+    SavingsPool(Constants.DEFAULT_ADDRESS, 0, {}, use_balance_view=True),
+)
 sp.add_compilation_target(
     "StakingPool",
     StakingPool(
@@ -57,16 +61,44 @@ sp.add_compilation_target(
         0,
     ),
 )
+sp.add_compilation_target(
+    "StakingPoolBalanceView",
+    StakingPool(
+        Constants.DEFAULT_ADDRESS,
+        Constants.DEFAULT_ADDRESS,
+        0,
+        Constants.DEFAULT_ADDRESS,
+        0,
+        use_balance_view=True,
+    ),
+)
 sp.add_compilation_target(
     "TrackerEngine",
     TrackerEngine(Constants.DEFAULT_ADDRESS, 0, administrators=sp.big_map({})),
 )
+sp.add_compilation_target(
+    "TrackerEngineTargetPriceView",
+    TrackerEngine(
+        Constants.DEFAULT_ADDRESS,
+        0,
+        administrators=sp.big_map({}),
+        use_target_price_view=True,
+    ),
+)
 sp.add_compilation_target("Viewer", Viewer())
 sp.add_compilation_target("Vester", Vester(Constants.DEFAULT_ADDRESS, 0))
 sp.add_compilation_target(
     "StakeManager",
     StakeManager(Constants.DEFAULT_ADDRESS, administrators=sp.big_map({})),
 )
+sp.add_compilation_target(
+    "StakeManagerAutoRefresh",
+    StakeManager(
+        Constants.DEFAULT_ADDRESS,
+        administrators=sp.big_map({}),
+        auto_refresh_fixed_stakes=True,
+    ),
+)
 sp.add_compilation_target(
     "LiquidityFarm",
     LiquidityFarm(
@@ -76,6 +108,16 @@ sp.add_compilation_target(
         administrators=sp.map({}),
     ),
 )
+sp.add_compilation_target(
+    "LiquidityFarmDeferredStake",
+    LiquidityFarm(
+        Constants.DEFAULT_ADDRESS,
+        0,
+        Constants.DEFAULT_ADDRESS,
+        administrators=sp.map({}),
+        deferred_stake_updates=True,
+    ),
+)
 sp.add_compilation_target(
     "FA2TrackerEngineV2",
     TokenTrackerEngineV2(
@@ -124,6 +166,16 @@ sp.add_compilation_target(
         administrators=sp.big_map({}),
     ),
 )
+sp.add_compilation_target(
+    "InterestRateUpdaterLinearViewPrices",
+    InterestRateUpdaterLinear(
+        [Constants.DEFAULT_ADDRESS],
+        Constants.DEFAULT_ADDRESS,
+        Constants.DEFAULT_ADDRESS,
+        administrators=sp.big_map({}),
+        use_price_views=True,
+    ),
+)
 sp.add_compilation_target(
     "FA1TrackerEngine",
     AsyncTokenTrackerEngine(
@@ -160,6 +212,26 @@ sp.add_compilation_target(
         administrators=sp.big_map({}),
     ),
 )
+sp.add_compilation_target(
+    "InterestRateUpdaterExponentialViewPrices",
+    InterestRateUpdaterExponential(
+        [Constants.DEFAULT_ADDRESS],
+        Constants.DEFAULT_ADDRESS,
+        Constants.DEFAULT_ADDRESS,
+        administrators=sp.big_map({}),
+        use_price_views=True,
+    ),
+)
+sp.add_compilation_target(
+    "InterestRateUpdaterExponentialPull",
+    InterestRateUpdaterExponential(
+        [],
+        Constants.DEFAULT_ADDRESS,
+        Constants.DEFAULT_ADDRESS,
+        administrators=sp.big_map({}),
+        pull_reference_interest_rate=True,
+    ),
+)
 sp.add_compilation_target(
     "FA2LongStakingPool",
     LongStakingPool(
@@ -180,6 +252,17 @@ sp.add_compilation_target(
         0,
     ),
 )
+sp.add_compilation_target(
+    "FA2LongStakingPoolBalanceView",
+    LongStakingPool(
+        Constants.DEFAULT_ADDRESS,
+        0,
+        Constants.TOKEN_TYPE_FA2,
+        Constants.DEFAULT_ADDRESS,
+        0,
+        use_balance_view=True,
+    ),
+)
 sp.add_compilation_target(
     "UnifiedStakingPool",
     UnifiedStakingPool(
@@ -189,6 +272,16 @@ sp.add_compilation_target(
         administrators=sp.big_map({}),
     ),
 )
+sp.add_compilation_target(
+    "UnifiedStakingPoolBalanceView",
+    UnifiedStakingPool(
+        Constants.DEFAULT_ADDRESS,
+        sp.nat(0),
+        sp.nat(180 * 24 * 60 * 60),
+        administrators=sp.big_map({}),
+        use_balance_view=True,
+    ),
+)
 sp.add_compilation_target("AutoManager", AutoManager(sp.big_map({})))
 sp.add_compilation_target(
     "FA1TrackerEngineExtraPrecisionOracle",
@@ -244,4 +337,16 @@ sp.add_compilation_target(
         token_address=Constants.DEFAULT_ADDRESS,
         token_id=sp.nat(0),
     ),
+)
+sp.add_compilation_target(
+    "CommitmentPoolBalanceView",
+    CommitmentPool(
+        administrators=sp.big_map(l={}),
+        max_cooldown_duration=sp.nat(4 * 365 * 24 * 60 * 60), # 4 years in seconds
+        max_withdraw_delay=sp.nat(2 * 24 * 60 * 60), # 2 days
+        kicker_reward_ratio=Ratio.make(10, 100), # 10%
+        token_address=Constants.DEFAULT_ADDRESS,
+        token_id=sp.nat(0),
+        use_balance_view=True,
+    ),
 )
\ No newline at end of file
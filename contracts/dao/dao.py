@@ -180,10 +180,15 @@ class DAOContract(sp.Contract):
         sp.verify(~self.data.vote_tracker.contains(vote_key), Errors.ERROR_ALREADY_VOTED)
 
         # Check if the sender owns the stake they are voting with.
-        sender_stakes = sp.local(
-            "sender_stakes",
-            sp.view("view_owner_stakes", self.data.voting_contract, sp.sender, t = sp.TSet(sp.TNat)).open_some("Invalid View: view_owner_stakes"))
-        sp.verify(sender_stakes.value.contains(params.vote_id), Errors.ERROR_NOT_OWNER)
+        is_stake_owner = sp.view(
+            "view_is_stake_owner",
+            self.data.voting_contract,
+            sp.set_type_expr(
+                sp.record(owner=sp.sender, stake_id=params.vote_id),
+                sp.TRecord(owner=sp.TAddress, stake_id=sp.TNat).layout(("owner", "stake_id")),
+            ),
+            t = sp.TBool).open_some("Invalid View: view_is_stake_owner")
+        sp.verify(is_stake_owner, Errors.ERROR_NOT_OWNER)
 
         # Fetch the weight of the vote.
         stake = sp.local(
@@ -137,12 +137,15 @@ class AsyncTokenTrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         token_decimals=12,
         collateral_token_decimals=12,
         price_extra_precision_factor=1,
+        batch_touch_stakes=False,
     ):
         """init to set the token and administrators, in order to be fully operational set_contracts need to be called first.
         Args:
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            batch_touch_stakes (bool, optional): internal_touch sends all stakes in one "update_stakes" call instead of
+                one "update_stake" call per vault. Defaults to False.
         """
         self.token_contract = token_contract
         self.token_id = token_id
@@ -153,6 +156,7 @@ class AsyncTokenTrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         self.token_decimals = token_decimals
         self.collateral_token_decimals = collateral_token_decimals
         self.price_extra_precision_factor = price_extra_precision_factor
+        self.batch_touch_stakes = batch_touch_stakes
         self.init(**self.get_init_storage())
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
@@ -900,26 +904,39 @@ class AsyncTokenTrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def internal_touch(self, addresses):
-        """triggers the contract to update the accrual
-        Post: update_accrual()
+        """updates the stakes of the given vaults at the fetched target price. With batch_touch_stakes all stakes are sent
+        in a single "update_stakes" call.
+        Post: update_governance_stake(stake) for every vault allowing settlement
         """
         sp.set_type(addresses, sp.TList(sp.TAddress))
         self.verify_internal(sp.unit)
 
+        stakes = sp.local("stakes", sp.list([], t=Stake.get_type()))
         with sp.for_("address", addresses) as address:
             with sp.if_(self.data.vault_contexts[address].allows_settlement):
-                self.update_governance_stake(
-                    sp.record(
-                        address=address,
-                        amount=self.data.vault_contexts[address].minted
-                        * self.data.compound_interest_rate
-                        * self.data.target_price
-                        // (
-                            Constants.PRECISION_FACTOR
-                            * self.price_extra_precision_factor
-                        ),
-                    )
+                stake = Stake.make(
+                    address,
+                    self.data.vault_contexts[address].minted
+                    * self.data.compound_interest_rate
+                    * self.data.target_price
+                    // (
+                        Constants.PRECISION_FACTOR
+                        * self.price_extra_precision_factor
+                    ),
                 )
+                if self.batch_touch_stakes:
+                    stakes.value.push(stake)
+                else:
+                    self.update_governance_stake(stake)
+
+        if self.batch_touch_stakes:
+            with sp.if_(sp.len(stakes.value) > 0):
+                governance_token_contract = sp.contract(
+                    sp.TList(Stake.get_type()),
+                    self.data.governance_token_contract,
+                    entry_point="update_stakes",
+                ).open_some()
+                sp.transfer(stakes.value.rev(), sp.mutez(0), governance_token_contract)
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def update(self):
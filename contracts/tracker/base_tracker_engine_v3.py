@@ -7,6 +7,7 @@ from utils.fa2 import AdministrableMixin, LedgerKey
 from contracts.tracker.vault import Vault, TransferAmount
 
 from contracts.tracker.governance_token import Stake
+from contracts.tracker.interest_rate_updater import ReferenceInterestRate
 
 class Settlement:
     """Parameter used in settle_with_vault"""
@@ -114,6 +115,64 @@ class Liquidation:
         )
 
 
+class VaultAction:
+    """Parameter used in manage_vault"""
+
+    def get_type():
+        """Returns a single VaultAction type, layouted
+
+        Returns:
+            sp.TVariant: the layouted vault action
+        """
+        return sp.TVariant(
+            deposit=sp.TNat, mint=sp.TNat, burn=sp.TNat, withdraw=sp.TNat
+        ).layout((("deposit", "mint"), ("burn", "withdraw")))
+
+    def make(action, token_amount):
+        """Makes an instance of a vault action
+
+        Args:
+            action (str): one of "deposit", "mint", "burn" or "withdraw"
+            token_amount (sp.nat): token_amount
+
+        Returns:
+            VaultAction: the vault action variant
+        """
+        return sp.set_type_expr(
+            sp.variant(action, token_amount), VaultAction.get_type()
+        )
+
+
+class EngineConfig:
+    """Admin set contracts and parameters of the engine, stored nested in the storage"""
+
+    def get_type():
+        """Returns the EngineConfig type, layouted
+
+        Returns:
+            sp.TRecord: the layouted engine config
+        """
+        return sp.TRecord(
+            target_price_oracle=sp.TAddress,
+            reward_pool_contract=sp.TAddress,
+            savings_pool_contract=sp.TAddress,
+            governance_token_contract=sp.TAddress,
+            options_contract=sp.TAddress,
+            interest_rate_setter_contract=sp.TAddress,
+            token_contract=sp.TAddress,
+            token_id=sp.TNat,
+            collateral_token_contract=sp.TAddress,
+            collateral_token_id=sp.TNat,
+            collateral_ratio=Ratio.get_type(),
+            settlement_ratio=Ratio.get_type(),
+            minting_fee_ratio=Ratio.get_type(),
+            introducer_ratio=Ratio.get_type(),
+            settlement_reward_fee_ratio=Ratio.get_type(),
+            settlement_payout_ratio=Ratio.get_type(),
+            liquidation_payout_ratio=Ratio.get_type(),
+        ).right_comb()
+
+
 def ceil_div(ratio):
     """lambda used to return a rounded up division of the given ratio.
 
@@ -165,26 +224,37 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
         storage["total_supply"] = sp.nat(0)
 
-        storage["target_price_oracle"] = Constants.DEFAULT_ADDRESS
-        storage["reward_pool_contract"] = Constants.DEFAULT_ADDRESS
-        storage["savings_pool_contract"] = Constants.DEFAULT_ADDRESS
-        storage["governance_token_contract"] = Constants.DEFAULT_ADDRESS
-        storage["options_contract"] = Constants.DEFAULT_ADDRESS
-        storage["interest_rate_setter_contract"] = Constants.DEFAULT_ADDRESS
-
-        storage["token_contract"] = self.token_contract
-        storage["token_id"] = self.token_id
-
-        storage["collateral_token_contract"] = self.collateral_token_contract
-        storage["collateral_token_id"] = self.collateral_token_id
-
-        storage["collateral_ratio"] = Ratio.make(2, 1)
-        storage["settlement_ratio"] = Ratio.make(3, 1)
-        storage["minting_fee_ratio"] = Ratio.make(15625, 1000000)  # 1.5625%
-        storage["introducer_ratio"] = Ratio.make(125, 1000)  # 12.5%
-        storage["settlement_reward_fee_ratio"] = Ratio.make(125, 1000)  # 12.5
-        storage["settlement_payout_ratio"] = Ratio.make(9375, 10000)  # 100%-6.25% = 93.75%
-        storage["liquidation_payout_ratio"] = Ratio.make(1125, 1000)
+        # when deferred, accruals are only accounted here and minted in bulk by update
+        storage["deferred_accrual"] = sp.bool(False)
+        storage["pending_asset_accrual"] = sp.nat(0)
+        storage["pending_spread_accrual"] = sp.nat(0)
+
+        # none if disabled, else the target price and the level it was fetched at
+        storage["price_cache"] = sp.none
+
+        # set once the migration of vault contexts from previous engines is done
+        storage["vault_import_locked"] = sp.bool(False)
+
+        # admin set contracts and parameters, kept in a nested record to keep the fields above shallow in the storage
+        storage["config"] = sp.record(
+            target_price_oracle=Constants.DEFAULT_ADDRESS,
+            reward_pool_contract=Constants.DEFAULT_ADDRESS,
+            savings_pool_contract=Constants.DEFAULT_ADDRESS,
+            governance_token_contract=Constants.DEFAULT_ADDRESS,
+            options_contract=Constants.DEFAULT_ADDRESS,
+            interest_rate_setter_contract=Constants.DEFAULT_ADDRESS,
+            token_contract=self.token_contract,
+            token_id=self.token_id,
+            collateral_token_contract=self.collateral_token_contract,
+            collateral_token_id=self.collateral_token_id,
+            collateral_ratio=Ratio.make(2, 1),
+            settlement_ratio=Ratio.make(3, 1),
+            minting_fee_ratio=Ratio.make(15625, 1000000),  # 1.5625%
+            introducer_ratio=Ratio.make(125, 1000),  # 12.5%
+            settlement_reward_fee_ratio=Ratio.make(125, 1000),  # 12.5
+            settlement_payout_ratio=Ratio.make(9375, 10000),  # 100%-6.25% = 93.75%
+            liquidation_payout_ratio=Ratio.make(1125, 1000),
+        )
 
         return storage
 
@@ -198,6 +268,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         collateral_token_decimals = 6,
         token_decimals = 12,
         administrators={},
+        pull_reference_interest_rate=False,
     ):
         """init to set the token and administrators, in order to be fully operational set_contracts
         need to be called first.
@@ -206,6 +277,8 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict): the administrators allowed to set the contracts. Defaults to {}.
+            pull_reference_interest_rate (bool, optional): read the reference interest rates from the get_reference_interest_rates view
+                of the interest rate setter in update_accrual instead of receiving set_reference_interest_rate. Defaults to False.
         """
         self.token_contract = token_contract
         self.token_id = token_id
@@ -215,21 +288,179 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         self.price_extra_precision_factor = price_extra_precision_factor
         self.collateral_token_decimals = collateral_token_decimals
         self.token_decimals = token_decimals
+        self.pull_reference_interest_rate = pull_reference_interest_rate
 
         self.init(**self.get_init_storage())
-    
-    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
-    def update_accrual(self, unit):
-        """lambda used to update the accrual based on the interest rate and timedelta.
 
-        Post: storage.accrual_update_timestamp = sp.now
+    def get_vault_context_type(self):
+        """Returns the vault context type of the engine, layouted
+
+        Returns:
+            sp.TRecord: the layouted vault context
+        """
+        if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+            return sp.TRecord(
+                address=sp.TAddress,
+                minted=sp.TNat,
+                balance=sp.TNat,
+                introducer=sp.TOption(sp.TAddress),
+            ).right_comb()
+        return sp.TRecord(
+            minted=sp.TNat, balance=sp.TNat, introducer=sp.TOption(sp.TAddress)
+        ).right_comb()
+
+    def get_vault_import_type(self):
+        """Returns the type of an imported vault context (see import_vault_contexts), layouted. The tez engine originates
+        the vault itself, hence no vault address is imported.
+
+        Returns:
+            sp.TRecord: the layouted vault import
+        """
+        return sp.TRecord(
+            minted=sp.TNat, balance=sp.TNat, introducer=sp.TOption(sp.TAddress)
+        ).right_comb()
+
+    def import_vault_context(self, owner, vault_import):
+        """Stores an imported vault context, the collateral is transferred to the engine by import_vault_contexts. The tez
+        engine overrides this to originate the vault holding the collateral.
 
         Args:
-            unit (sp.unit): nothing
+            owner (sp.TAddress): the owner of the imported vault context
+            vault_import (sp.TRecord): the imported vault context, see get_vault_import_type
+        """
+        self.data.vault_contexts[owner] = vault_import
+
+    def sync_vault_balance(self, vault_owner):
+        """Called before the balance of a vault context is used by an entrypoint. The balance is kept up to date
+        by the engine itself (or by the vault callbacks), engines reading the balance lazily override this.
+
+        Args:
+            vault_owner (sp.TAddress): the owner of the vault context about to be read
+        """
+        pass
+
+    def get_vault_balance(self, vault_context):
+        """Returns the collateral balance of a vault context as used by the entrypoints after sync_vault_balance. The
+        stored balance is up to date, engines reading the balance lazily override this.
+
+        Args:
+            vault_context (sp.TRecord): the vault context
+
+        Returns:
+            sp.TNat: the collateral balance
+        """
+        return vault_context.balance
+
+    def compound(self, compound_interest_rate, reference_interest_rate, timedelta):
+        """Returns the compound interest rate after accruing the given period at the given reference interest rate
+        and storage.spread_rate.
+
+        Args:
+            compound_interest_rate (sp.TNat): the compound interest rate at the start of the period
+            reference_interest_rate (sp.TNat): the reference interest rate effective during the period
+            timedelta (sp.TNat): the length of the period in seconds
+
+        Returns:
+            sp.TNat: the compound interest rate at the end of the period
+        """
+        return (
+            compound_interest_rate
+            * (
+                Constants.PRECISION_FACTOR
+                + (reference_interest_rate + self.data.spread_rate) * timedelta
+            )
+            / Constants.PRECISION_FACTOR
+        )
+
+    def get_current_compound_interest_rate(self):
+        """Returns the compound interest rate update_accrual would set at sp.now without updating the storage, used by
+        the views. Engines pulling the reference interest rate project every period at its own rate as update_accrual does.
+
+        Returns:
+            sp.TNat: the compound interest rate at sp.now
+        """
+        compound_interest_rate = sp.local(
+            "current_compound_interest_rate", self.data.compound_interest_rate
+        )
+        period_start = sp.local("period_start", self.data.accrual_update_timestamp)
+        period_reference_interest_rate = sp.local(
+            "period_reference_interest_rate", self.data.reference_interest_rate
+        )
+
+        if self.pull_reference_interest_rate:
+            with sp.for_(
+                "reference_interest_rate", self.get_reference_interest_rates()
+            ) as reference_interest_rate:
+                with sp.if_(
+                    reference_interest_rate.effective_timestamp > period_start.value
+                ):
+                    compound_interest_rate.value = self.compound(
+                        compound_interest_rate.value,
+                        period_reference_interest_rate.value,
+                        sp.as_nat(
+                            reference_interest_rate.effective_timestamp
+                            - period_start.value
+                        ),
+                    )
+                    period_start.value = reference_interest_rate.effective_timestamp
+                period_reference_interest_rate.value = (
+                    reference_interest_rate.reference_interest_rate
+                )
+
+        compound_interest_rate.value = self.compound(
+            compound_interest_rate.value,
+            period_reference_interest_rate.value,
+            sp.as_nat(sp.now - period_start.value),
+        )
+        return compound_interest_rate.value
+
+    def ceil_minted_token_amount(self, minted, compound_interest_rate):
+        """Returns the token amount of a normalised minted amount at the given compound interest rate, rounded up.
+
+        Args:
+            minted (sp.TNat): the normalised minted amount of the vault context
+            compound_interest_rate (sp.TNat): the compound interest rate
+
+        Returns:
+            sp.TNat: ceil(minted * compound_interest_rate / 10**12)
+        """
+        return (
+            minted * compound_interest_rate + (Constants.PRECISION_FACTOR - 1)
+        ) // Constants.PRECISION_FACTOR
+
+    def get_required_balance(self, minted_token_amount, target_price):
+        """Returns the collateral value required for the minted token amount at the given target price times
+        storage.collateral_ratio, in the price precision and token decimals (see verify_collateral).
+
+        Args:
+            minted_token_amount (sp.TNat): the current minted token amount
+            target_price (sp.TNat): the target price
+
+        Returns:
+            sp.TNat: the required collateral value
+        """
+        market_price_amount = (
+            minted_token_amount * target_price
+        ) // self.price_extra_precision_factor
+        return (
+            market_price_amount
+            * self.data.config.collateral_ratio.numerator
+            // self.data.config.collateral_ratio.denominator
+        )
+
+    def accrue(self, accrual, until):
+        """Accrues the interest from storage.accrual_update_timestamp until the given timestamp at the current reference interest rate.
+        The accrued amounts are added to the given accrual locals, minting is left to the caller.
+
+        Post: storage.accrual_update_timestamp = until
+
+        Args:
+            accrual (sp.local): record of the asset and spread accrual collected so far
+            until (sp.TTimestamp): the end of the period to accrue
         """
         timedelta_since_last_update = sp.local(
             "timedelta_since_last_update",
-            sp.as_nat(sp.now - self.data.accrual_update_timestamp),
+            sp.as_nat(until - self.data.accrual_update_timestamp),
         )
         with sp.if_(timedelta_since_last_update.value > 0):
             asset_accrual = sp.local(
@@ -251,51 +482,160 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
                 / Constants.PRECISION_FACTOR,
             )
 
-            compound_interest_rate = (
-                Constants.PRECISION_FACTOR
-                + (self.data.reference_interest_rate + self.data.spread_rate)
-                * timedelta_since_last_update.value
+            self.data.compound_interest_rate = self.compound(
+                self.data.compound_interest_rate,
+                self.data.reference_interest_rate,
+                timedelta_since_last_update.value,
             )
 
-            self.data.compound_interest_rate = (
-                self.data.compound_interest_rate
-                * compound_interest_rate
-                / Constants.PRECISION_FACTOR
-            )
+            accrual.value.asset_accrual += asset_accrual.value
+            accrual.value.spread_accrual += spread_accrual.value
+            self.data.total_supply += asset_accrual.value + spread_accrual.value
+
+            self.data.accrual_update_timestamp = until
 
+    def get_reference_interest_rates(self):
+        """Reads the reference interest rates effective since storage.accrual_update_timestamp from the interest rate setter,
+        used by the engines pulling the reference interest rate.
+
+        Returns:
+            sp.TList(ReferenceInterestRate): the rate effective at storage.accrual_update_timestamp followed by the later ones, oldest first
+        """
+        return sp.view(
+            "get_reference_interest_rates",
+            self.data.config.interest_rate_setter_contract,
+            self.data.accrual_update_timestamp,
+            t=sp.TList(ReferenceInterestRate.get_type()),
+        ).open_some(Errors.INVALID_VIEW)
+
+    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
+    def update_accrual(self, unit):
+        """lambda used to update the accrual based on the interest rate and timedelta. If the accrual
+        is deferred the accrued amounts are only added to the pending counters instead of being minted.
+        Engines pulling the reference interest rate read the rates effective since the last update from the
+        interest rate setter first, every period is accrued at the rate that was effective during it.
+
+        Post: storage.accrual_update_timestamp = sp.now
+
+        Args:
+            unit (sp.unit): nothing
+        """
+        accrual = sp.local(
+            "accrual", sp.record(asset_accrual=sp.nat(0), spread_accrual=sp.nat(0))
+        )
+        accrual_due = sp.local(
+            "accrual_due", sp.now > self.data.accrual_update_timestamp
+        )
+
+        if self.pull_reference_interest_rate:
+            with sp.for_(
+                "reference_interest_rate", self.get_reference_interest_rates()
+            ) as reference_interest_rate:
+                with sp.if_(
+                    reference_interest_rate.effective_timestamp
+                    > self.data.accrual_update_timestamp
+                ):
+                    self.accrue(accrual, reference_interest_rate.effective_timestamp)
+                self.data.reference_interest_rate = (
+                    reference_interest_rate.reference_interest_rate
+                )
+
+        self.accrue(accrual, sp.now)
+
+        with sp.if_(accrual_due.value):
+            with sp.if_(self.data.deferred_accrual):
+                self.data.pending_asset_accrual += accrual.value.asset_accrual
+                self.data.pending_spread_accrual += accrual.value.spread_accrual
+            with sp.else_():
+                Utils.execute_token_mint(
+                    self.data.config.token_contract,
+                    self.data.config.savings_pool_contract,
+                    self.data.config.token_id,
+                    accrual.value.asset_accrual,
+                )
+                Utils.execute_token_mint(
+                    self.data.config.token_contract,
+                    self.data.config.reward_pool_contract,
+                    self.data.config.token_id,
+                    accrual.value.spread_accrual,
+                )
+
+    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
+    def mint_pending_accrual(self, unit):
+        """lambda used to mint the accrual accumulated while the accrual was deferred to the savings
+        and reward pool.
+
+        Post: storage.pending_asset_accrual = 0
+        Post: storage.pending_spread_accrual = 0
+
+        Args:
+            unit (sp.unit): nothing
+        """
+        with sp.if_(self.data.pending_asset_accrual > 0):
             Utils.execute_token_mint(
-                self.data.token_contract,
-                self.data.savings_pool_contract,
-                self.data.token_id,
-                asset_accrual.value,
+                self.data.config.token_contract,
+                self.data.config.savings_pool_contract,
+                self.data.config.token_id,
+                self.data.pending_asset_accrual,
             )
+            self.data.pending_asset_accrual = sp.nat(0)
+        with sp.if_(self.data.pending_spread_accrual > 0):
             Utils.execute_token_mint(
-                self.data.token_contract,
-                self.data.reward_pool_contract,
-                self.data.token_id,
-                spread_accrual.value,
+                self.data.config.token_contract,
+                self.data.config.reward_pool_contract,
+                self.data.config.token_id,
+                self.data.pending_spread_accrual,
             )
+            self.data.pending_spread_accrual = sp.nat(0)
 
-            self.data.total_supply += asset_accrual.value + spread_accrual.value
+    @sp.private_lambda(with_storage="read-only", with_operations=False, wrap_call=True)
+    def add_vault_stakes(self, params):
+        """lambda used to push the governance stake of a vault owner and, if any, of its introducer onto the given list of stakes.
+
+        Args:
+            params (sp.TPair(sp.TList(Stake), sp.TAddress)): the stakes collected so far and the vault owner
 
-            self.data.accrual_update_timestamp = sp.now
+        Returns:
+            sp.TList(Stake): the stakes including the ones of the vault, most recent first
+        """
+        sp.set_type(params, sp.TPair(sp.TList(Stake.get_type()), sp.TAddress))
+        (stakes, vault_owner) = sp.match_pair(params)
+
+        result = sp.local("result", stakes)
+        vault_context = sp.local("vault_context", self.data.vault_contexts[vault_owner])
+        result.value.push(Stake.make(vault_owner, vault_context.value.minted))
+        with sp.if_(vault_context.value.introducer.is_some()):
+            result.value.push(
+                Stake.make(
+                    vault_context.value.introducer.open_some(
+                        message=Errors.NO_INTRODUCER
+                    ),
+                    vault_context.value.minted
+                    * self.data.config.introducer_ratio.numerator
+                    // self.data.config.introducer_ratio.denominator,
+                )
+            )
+        sp.result(result.value)
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
-    def update_governance_stake(self, stake):
-        """sub entrypoint to call "update_stake" on the governance token contract
+    def update_governance_stakes(self, stakes):
+        """sub entrypoint to call "update_stakes" on the governance token contract (or stake manager) with all collected stakes in a
+        single operation. The stakes are expected most recent first (as built by add_vault_stakes) and are sent in the order they were
+        collected.
 
-        Post: governance_token.update_stake(stake)
+        Post: governance_token.update_stakes(stakes.rev())
 
         Args:
-            stake (Stake): Address and amount
+            stakes (sp.TList(Stake)): Addresses and amounts
         """
-        sp.set_type(stake, Stake.get_type())
-        governance_token_contract = sp.contract(
-            Stake.get_type(),
-            self.data.governance_token_contract,
-            entry_point="update_stake",
-        ).open_some()
-        sp.transfer(stake, sp.mutez(0), governance_token_contract)
+        sp.set_type(stakes, sp.TList(Stake.get_type()))
+        with sp.if_(sp.len(stakes) > 0):
+            governance_token_contract = sp.contract(
+                sp.TList(Stake.get_type()),
+                self.data.config.governance_token_contract,
+                entry_point="update_stakes",
+            ).open_some()
+            sp.transfer(stakes.rev(), sp.mutez(0), governance_token_contract)
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_contracts(
@@ -318,36 +658,163 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             options_contract (sp.address): options listing contract
         """
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.target_price_oracle = target_price_oracle
-        self.data.reward_pool_contract = reward_pool_contract
-        self.data.savings_pool_contract = savings_pool_contract
-        self.data.governance_token_contract = governance_token_contract
-        self.data.options_contract = options_contract
-        self.data.interest_rate_setter_contract = interest_rate_setter_contract
+        self.data.config.target_price_oracle = target_price_oracle
+        self.data.config.reward_pool_contract = reward_pool_contract
+        self.data.config.savings_pool_contract = savings_pool_contract
+        self.data.config.governance_token_contract = governance_token_contract
+        self.data.config.options_contract = options_contract
+        self.data.config.interest_rate_setter_contract = interest_rate_setter_contract
 
-    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
-    def internal_settle_with_vault(self, settlement):
-        """Used by liquidate and settle_with_vault entrypoint. Internally checks if the vault can
-        be settled and if yes settles the vault by burning from sp.sender and sending the payout
-        to recipient.
+    @sp.private_lambda(with_storage="read-only", with_operations=False, wrap_call=True)
+    def get_minted_token_amount(self, minted):
+        """Returns the current token amount of a vault given its normalised minted amount, rounded up.
+
+        Args:
+            minted (sp.TNat): the normalised minted amount of the vault context
+
+        Returns:
+            sp.TNat: ceil(minted * storage.compound_interest_rate / 10**12)
         """
-        sp.set_type(settlement, Settlement.get_internal_type())
+        sp.set_type(minted, sp.TNat)
+        sp.result(
+            self.ceil_minted_token_amount(minted, self.data.compound_interest_rate)
+        )
 
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+    @sp.private_lambda(with_storage="read-only", with_operations=False, wrap_call=True)
+    def get_normalised_minted_amount(self, token_amount):
+        """Returns the normalised minted amount to store in a vault context for a token amount, rounded up.
+
+        Args:
+            token_amount (sp.TNat): the current token amount
+
+        Returns:
+            sp.TNat: ceil(token_amount * 10**12 / storage.compound_interest_rate)
+        """
+        sp.set_type(token_amount, sp.TNat)
+        unnormalized_minted_amount = sp.compute(token_amount * Constants.PRECISION_FACTOR)
+        with sp.if_(unnormalized_minted_amount % self.data.compound_interest_rate == 0):
+            sp.result(unnormalized_minted_amount // self.data.compound_interest_rate)
+        with sp.else_():
+            sp.result(unnormalized_minted_amount // self.data.compound_interest_rate + 1)
+
+    @sp.private_lambda(with_storage="read-only", with_operations=False, wrap_call=True)
+    def verify_collateral(self, params):
+        """Verifies that the collateral balance covers the minted token amount at the given target price
+        times storage.collateral_ratio. The price precision and the decimals of token and collateral are
+        normalised here only.
+
+        Args:
+            params (sp.TRecord): the collateral balance, the current minted token amount and the target price
+        """
+        sp.set_type(
+            params,
+            sp.TRecord(balance=sp.TNat, minted_token_amount=sp.TNat, target_price=sp.TNat),
+        )
+        required_balance = self.get_required_balance(
+            params.minted_token_amount, params.target_price
+        )
+        sp.verify(
+            params.balance * Constants.PRICE_PRECISION_FACTOR * 10**self.token_decimals
+            >= required_balance * 10**self.collateral_token_decimals,
+            message=Errors.NOT_ENOUGH_COLLATERAL,
+        )  # because we want to avoid divisions we multiply the "other side" instead
+        sp.result(sp.unit)
+
+    @sp.private_lambda(with_storage="read-only", with_operations=False, wrap_call=True)
+    def verify_withdraw_collateral(self, params):
+        """Verifies that the collateral balance left after a withdrawal covers the minted amount at the given target
+        price times storage.collateral_ratio. Unlike verify_collateral the minted amount is neither rounded nor are the
+        price and ratio divided, both sides are cross-multiplied such that the comparison is exact.
+
+        Args:
+            params (sp.TRecord): the collateral balance, the normalised minted amount of the vault context and the target price
+        """
+        sp.set_type(
+            params,
+            sp.TRecord(balance=sp.TNat, minted=sp.TNat, target_price=sp.TNat),
+        )
+        sp.verify(
+            params.balance
+            * Constants.PRECISION_FACTOR
+            * Constants.PRICE_PRECISION_FACTOR
+            * self.price_extra_precision_factor
+            * 10**self.token_decimals
+            * self.data.config.collateral_ratio.denominator
+            >= params.minted
+            * self.data.compound_interest_rate
+            * params.target_price
+            * self.data.config.collateral_ratio.numerator
+            * 10**self.collateral_token_decimals,
+            message=Errors.NOT_ENOUGH_COLLATERAL,
+        )  # because we want to avoid divisions we multiply the "other side" instead
+        sp.result(sp.unit)
+
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def get_target_price(self, unit):
+        """lambda used to fetch the target price. If the price cache is enabled the price is only fetched from
+        the target price oracle once per level, later calls in the same level return the cached price.
+
+        The cache is keyed on the level only, the get_price view of the oracle returns no timestamp to key it on. If the
+        oracle is updated later in the same level (e.g. an oracle update batched behind an engine call), every following
+        call in that level still uses the price fetched before the update. The stale price is at most one level old and
+        the next level fetches the new price, enable the cache only for oracles for which that delay is acceptable.
+
+        Cost: a cache hit reads and compares storage.price_cache and executes no view, i.e. the whole view chain of the
+        oracle (e.g. an EngineOracle walking its aggregation path) is saved. A cache miss executes the view chain as
+        without the cache plus the comparison and one write of storage.price_cache. The write does not grow the storage,
+        price_cache is already set while the cache is enabled, so a miss costs a few gas units more than no cache at all.
+
+        Post: storage.price_cache = sp.some(sp.record(price=target_price, level=sp.level)) if the cache is enabled
+
+        Args:
+            unit (sp.unit): nothing
+
+        Returns:
+            sp.TNat: the target price
+        """
+        with sp.if_(self.data.price_cache.is_some() & (self.data.price_cache.open_some().level == sp.level)):
+            sp.result(self.data.price_cache.open_some().price)
+        with sp.else_():
+            target_price = sp.compute(
+                sp.view(
+                    "get_price", self.data.config.target_price_oracle, sp.unit, t=sp.TNat
+                ).open_some(Errors.INVALID_VIEW)
+            )
+            with sp.if_(self.data.price_cache.is_some()):
+                self.data.price_cache = sp.some(sp.record(price=target_price, level=sp.level))
+            sp.result(target_price)
+
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def compute_settlement(self, params):
+        """Checks if the vault can be settled at the given target price and if yes updates the
+        vault context and the total supply. No operations are emitted, the caller is responsible
+        for burning the settled tokens and paying out the returned amounts.
+
+        Args:
+            params (sp.TRecord): the internal settlement, the current minted token amount of the vault (see get_minted_token_amount)
+                and the target price to settle at
+
+        Returns:
+            sp.TRecord: the payout amount (including the reward) and the reward amount
+        """
+        sp.set_type(
+            params,
+            sp.TRecord(
+                settlement=Settlement.get_internal_type(),
+                minted_token_amount=sp.TNat,
+                target_price=sp.TNat,
+            ),
+        )
+        settlement = params.settlement
+        target_price = params.target_price
 
         vault_context = sp.local(
             "vault_context", self.data.vault_contexts[settlement.vault_owner]
         )
         balance_as_nat = sp.local("balance_as_nat", vault_context.value.balance)
-        unnormalized_minted_amount = sp.local(
-            "unnormalized_minted_amount", 
-            vault_context.value.minted * self.data.compound_interest_rate)
-        ceil_div_lambda = sp.compute(sp.build_lambda(ceil_div))
         current_minted_token_amount = sp.local(
-            "current_minted_token_amount",
-            ceil_div_lambda(sp.pair(unnormalized_minted_amount.value, Constants.PRECISION_FACTOR)))
+            "current_minted_token_amount", params.minted_token_amount
+        )
 
         normalised_individual_collateral_numerator = (
             balance_as_nat.value
@@ -395,8 +862,8 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         reward_amount = sp.local(
             "reward_amount",
             sp.as_nat(sp.max(0, (payout_amount.value - token_amount_market_value)))
-            * self.data.settlement_reward_fee_ratio.numerator
-            // self.data.settlement_reward_fee_ratio.denominator,
+            * self.data.config.settlement_reward_fee_ratio.numerator
+            // self.data.config.settlement_reward_fee_ratio.denominator,
         )
 
         new_minted_token_amount = sp.local(
@@ -422,13 +889,6 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             message=Errors.AMOUNT_TOO_SMALL,
         )
 
-        Utils.execute_token_burn(
-            self.data.token_contract,
-            sp.sender,
-            self.data.token_id,
-            settlement.token_amount,
-        )
-
         self.data.total_supply = sp.as_nat(
             self.data.total_supply - settlement.token_amount
         )
@@ -444,59 +904,81 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
         self.data.vault_contexts[settlement.vault_owner] = vault_context.value
 
+        sp.result(
+            sp.record(payout_amount=payout_amount.value, reward_amount=reward_amount.value)
+        )
+
+    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
+    def execute_settlement_payout(self, payout):
+        """Sends the settlement payout minus the reward to the recipient and the reward to the
+        reward pool. For tez collateral the payout is withdrawn from the given vault, token
+        collateral is sent from the engine itself (the vault address is ignored).
+
+        Args:
+            payout (sp.TRecord): vault address, recipient, payout amount (including the reward) and reward amount
+        """
+        sp.set_type(
+            payout,
+            sp.TRecord(
+                vault_address=sp.TAddress,
+                recipient=sp.TAddress,
+                payout_amount=sp.TNat,
+                reward_amount=sp.TNat,
+            ),
+        )
         if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
             withdraw_from_vault = sp.contract(
                 TransferAmount.get_type(),
-                vault_context.value.address,
+                payout.vault_address,
                 entry_point="withdraw",
             ).open_some()
             sp.transfer(
                 TransferAmount.make(
-                    settlement.recipient,
-                    sp.utils.nat_to_mutez(sp.as_nat(payout_amount.value - reward_amount.value))),
+                    payout.recipient,
+                    sp.utils.nat_to_mutez(sp.as_nat(payout.payout_amount - payout.reward_amount))),
                 sp.mutez(0),
                 withdraw_from_vault,
             )
             sp.transfer(
                 TransferAmount.make(
-                    self.data.reward_pool_contract,
-                    sp.utils.nat_to_mutez(reward_amount.value)),
+                    self.data.config.reward_pool_contract,
+                    sp.utils.nat_to_mutez(payout.reward_amount)),
                 sp.mutez(0),
                 withdraw_from_vault,
             )
         elif self.collateral_token_type == Constants.TOKEN_TYPE_FA2:
             Utils.execute_fa2_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
-                settlement.recipient,
-                self.data.collateral_token_id,
-                sp.as_nat(payout_amount.value - reward_amount.value),
+                payout.recipient,
+                self.data.config.collateral_token_id,
+                sp.as_nat(payout.payout_amount - payout.reward_amount),
             )
             Utils.execute_fa2_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
-                self.data.reward_pool_contract,
-                self.data.collateral_token_id,
-                reward_amount.value,
+                self.data.config.reward_pool_contract,
+                self.data.config.collateral_token_id,
+                payout.reward_amount,
             )
         elif self.collateral_token_type == Constants.TOKEN_TYPE_FA1:
             Utils.execute_fa1_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
-                settlement.recipient,
-                sp.as_nat(payout_amount.value - reward_amount.value),
+                payout.recipient,
+                sp.as_nat(payout.payout_amount - payout.reward_amount),
             )
             Utils.execute_fa1_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
-                self.data.reward_pool_contract,
-                reward_amount.value,
+                self.data.config.reward_pool_contract,
+                payout.reward_amount,
             )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_reference_interest_rate(self, reference_interest_rate):
         sp.verify(
-            sp.sender == self.data.interest_rate_setter_contract,
+            sp.sender == self.data.config.interest_rate_setter_contract,
             message=Errors.NOT_ADMIN,
         )
         self.update_accrual(sp.unit)
@@ -516,8 +998,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         Post: token.mint(storage.reward_pool, minting_fee)
         Post: storage.total_supply += token_amount
         Post: storage.vault_contexts[storage.sender].minted += token_amount*10**12 / storage.compound_interest_rate
-        Post: update_governance_stake(sender, storage.vault_contexts[sp.sender].minted))
-        Post: update_governance_stake(introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio)) if any.
+        Post: update_governance_stakes([(sender, storage.vault_contexts[sp.sender].minted), (introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio) if any])
 
         Args:
             token_amount (sp.nat): token amoun to mint
@@ -531,42 +1012,27 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             message=Errors.AMOUNT_TOO_SMALL,
         )
 
+        self.sync_vault_balance(sp.sender)
         vault_context = sp.local("vault_context", self.data.vault_contexts[sp.sender])
 
-        balance_as_nat = vault_context.value.balance
-        unnormalized_minted_amount = sp.local(
-            "unnormalized_minted_amount", 
-            vault_context.value.minted * self.data.compound_interest_rate)
-
-        ceil_div_lambda = sp.compute(sp.build_lambda(ceil_div))
         current_minted_token_amount = sp.local(
             "current_minted_token_amount",
-            ceil_div_lambda(sp.pair(unnormalized_minted_amount.value, Constants.PRECISION_FACTOR)))
-
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
-        market_price_amount = sp.local(
-            "market_price_amount",
-            ((current_minted_token_amount.value + token_amount) * target_price)
-            // self.price_extra_precision_factor,
+            self.get_minted_token_amount(vault_context.value.minted),
         )
 
-        required_balance = (
-            market_price_amount.value
-            * self.data.collateral_ratio.numerator
-            // self.data.collateral_ratio.denominator
+        target_price = sp.compute(self.get_target_price(sp.unit))
+        self.verify_collateral(
+            sp.record(
+                balance=vault_context.value.balance,
+                minted_token_amount=current_minted_token_amount.value + token_amount,
+                target_price=target_price,
+            )
         )
-        sp.verify(
-            balance_as_nat * Constants.PRICE_PRECISION_FACTOR * 10**self.token_decimals
-            >= required_balance * 10**self.collateral_token_decimals,
-            message=Errors.NOT_ENOUGH_COLLATERAL,
-        )  # because we want to avoid divisions we multiply the "other side" instead
 
         minting_fee = (
             token_amount
-            * self.data.minting_fee_ratio.numerator
-            // self.data.minting_fee_ratio.denominator
+            * self.data.config.minting_fee_ratio.numerator
+            // self.data.config.minting_fee_ratio.denominator
         )
         owner_amount = sp.as_nat(token_amount - minting_fee)
 
@@ -577,29 +1043,20 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         self.data.vault_contexts[sp.sender] = vault_context.value
 
         Utils.execute_token_mint(
-            self.data.token_contract, sp.sender, self.data.token_id, owner_amount
+            self.data.config.token_contract, sp.sender, self.data.config.token_id, owner_amount
         )
         Utils.execute_token_mint(
-            self.data.token_contract,
-            self.data.reward_pool_contract,
-            self.data.token_id,
+            self.data.config.token_contract,
+            self.data.config.reward_pool_contract,
+            self.data.config.token_id,
             minting_fee,
         )
 
         self.data.total_supply += token_amount
 
-        self.update_governance_stake(Stake.make(sp.sender, vault_context.value.minted))
-        with sp.if_(vault_context.value.introducer.is_some()):
-            self.update_governance_stake(
-                Stake.make(
-                    vault_context.value.introducer.open_some(
-                        message=Errors.NO_INTRODUCER
-                    ),
-                    vault_context.value.minted
-                    * self.data.introducer_ratio.numerator
-                    // self.data.introducer_ratio.denominator,
-                )
-            )
+        self.update_governance_stakes(
+            self.add_vault_stakes(sp.pair(sp.list([], t=Stake.get_type()), sp.sender))
+        )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def burn(self, token_amount):
@@ -612,8 +1069,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
         Post: storage.vault_contexts[storage.sender].minted -= token_amount*10**12/storage.compound_interest_rate
         Post: storage.total_supply -= token_amount
-        Post: update_governance_stake(sender, storage.vault_contexts[sp.sender].minted)
-        Post: update_governance_stake(introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio)
+        Post: update_governance_stakes([(sender, storage.vault_contexts[sp.sender].minted), (introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio) if any])
 
         Args:
             token_amount (sp.nat): token amoun to burn
@@ -628,48 +1084,220 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
         vault_context = sp.local("vault_context", self.data.vault_contexts[sp.sender])
 
-        unnormalized_minted_amount = sp.local(
-            "unnormalized_minted_amount", 
-            vault_context.value.minted * self.data.compound_interest_rate)
-        ceil_div_lambda = sp.compute(sp.build_lambda(ceil_div))
         current_minted_token_amount = sp.local(
             "current_minted_token_amount",
-           ceil_div_lambda(sp.pair(unnormalized_minted_amount.value, Constants.PRECISION_FACTOR)))
-
-        unnormalized_minted_amount_after_burn = sp.local(
-            "unnormalized_minted_amount_after_burn",
-            sp.as_nat(current_minted_token_amount.value - token_amount) * Constants.PRECISION_FACTOR)
-        vault_context.value.minted = ceil_div_lambda(
-            sp.pair(unnormalized_minted_amount_after_burn.value, self.data.compound_interest_rate))
+            self.get_minted_token_amount(vault_context.value.minted),
+        )
+        vault_context.value.minted = self.get_normalised_minted_amount(
+            sp.as_nat(current_minted_token_amount.value - token_amount)
+        )
 
         self.data.vault_contexts[sp.sender] = vault_context.value
 
         Utils.execute_token_burn(
-            self.data.token_contract, sp.sender, self.data.token_id, token_amount
+            self.data.config.token_contract, sp.sender, self.data.config.token_id, token_amount
         )
         self.data.total_supply = sp.as_nat(self.data.total_supply - token_amount)
 
-        self.update_governance_stake(Stake.make(sp.sender, vault_context.value.minted))
-        with sp.if_(vault_context.value.introducer.is_some()):
-            self.update_governance_stake(
-                Stake.make(
-                    vault_context.value.introducer.open_some(
-                        message=Errors.NO_INTRODUCER
+        self.update_governance_stakes(
+            self.add_vault_stakes(sp.pair(sp.list([], t=Stake.get_type()), sp.sender))
+        )
+
+    @sp.entry_point
+    def manage_vault(self, actions):
+        """entrypoint called by a vault owner to apply an ordered list of deposit, mint, burn and withdraw actions on its vault in one
+        operation. The accrual is updated once, the target price is fetched once and the collateral is only checked once after all actions
+        were applied, with the mint check if any mint and with the exact withdraw check if any withdraw happened (see verify_collateral and
+        verify_withdraw_collateral). Mints, burns, deposits and withdrawals are aggregated into one operation each.
+        For tez collateral the sum of the deposits has to be sent along as amount.
+
+        Pre: storage.vault_contexts.contains(sp.sender)
+        Pre: token_amount > 10**6 for every mint and burn
+        Pre: storage.vault_contexts[storage.sender].balance*10**12 * storage.collateral_ratio.denominator >=
+             storage.collateral_ratio.numerator * storage.target_price * storage.vault_contexts[storage.sender].minted*storage.compound_interest_rate/10**12 after all actions
+
+        Post: update_accrual()
+        Post: storage.vault_contexts[storage.sender].balance += deposits - withdrawals
+        Post: storage.vault_contexts[storage.sender].minted += (mints - burns)*10**12 / storage.compound_interest_rate
+        Post: storage.total_supply += mints - burns
+        Post: update_governance_stakes([(sender, storage.vault_contexts[sp.sender].minted), (introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio) if any])
+
+        Args:
+            actions (sp.TList(VaultAction)): the actions to apply in order
+        """
+        sp.set_type(actions, sp.TList(VaultAction.get_type()))
+        if self.collateral_token_type != Constants.TOKEN_TYPE_TEZ:
+            sp.verify(sp.amount == sp.mutez(0), message=Errors.INVALID_PARAMETER)
+
+        self.update_accrual(sp.unit)
+
+        self.sync_vault_balance(sp.sender)
+        vault_context = sp.local("vault_context", self.data.vault_contexts[sp.sender])
+
+        deposit_amount = sp.local("deposit_amount", sp.nat(0))
+        withdraw_amount = sp.local("withdraw_amount", sp.nat(0))
+        mint_amount = sp.local("mint_amount", sp.nat(0))
+        minting_fee = sp.local("minting_fee", sp.nat(0))
+        burn_amount = sp.local("burn_amount", sp.nat(0))
+        requires_collateral_check = sp.local("requires_collateral_check", False)
+        requires_withdraw_collateral_check = sp.local(
+            "requires_withdraw_collateral_check", False
+        )
+
+        with sp.for_("action", actions) as action:
+            with action.match_cases() as arg:
+                with arg.match("deposit") as token_amount:
+                    vault_context.value.balance += token_amount
+                    deposit_amount.value += token_amount
+                with arg.match("mint") as token_amount:
+                    sp.verify(
+                        token_amount >= Constants.MIN_TOKEN_AMOUNT_THRESHOLD,
+                        message=Errors.AMOUNT_TOO_SMALL,
+                    )
+                    vault_context.value.minted += (
+                        token_amount * Constants.PRECISION_FACTOR
+                    ) / self.data.compound_interest_rate
+                    mint_amount.value += token_amount
+                    minting_fee.value += (
+                        token_amount
+                        * self.data.config.minting_fee_ratio.numerator
+                        // self.data.config.minting_fee_ratio.denominator
+                    )
+                    requires_collateral_check.value = True
+                with arg.match("burn") as token_amount:
+                    sp.verify(
+                        token_amount >= Constants.MIN_TOKEN_AMOUNT_THRESHOLD,
+                        message=Errors.AMOUNT_TOO_SMALL,
+                    )
+                    current_minted_token_amount = sp.local(
+                        "current_minted_token_amount",
+                        self.get_minted_token_amount(vault_context.value.minted),
+                    )
+                    vault_context.value.minted = self.get_normalised_minted_amount(
+                        sp.as_nat(current_minted_token_amount.value - token_amount)
+                    )
+                    burn_amount.value += token_amount
+                with arg.match("withdraw") as token_amount:
+                    vault_context.value.balance = sp.as_nat(
+                        vault_context.value.balance - token_amount
+                    )
+                    withdraw_amount.value += token_amount
+                    requires_withdraw_collateral_check.value = True
+
+        with sp.if_(
+            requires_collateral_check.value | requires_withdraw_collateral_check.value
+        ):
+            target_price = sp.compute(self.get_target_price(sp.unit))
+            with sp.if_(requires_collateral_check.value):
+                self.verify_collateral(
+                    sp.record(
+                        balance=vault_context.value.balance,
+                        minted_token_amount=self.get_minted_token_amount(
+                            vault_context.value.minted
+                        ),
+                        target_price=target_price,
+                    )
+                )
+            with sp.if_(requires_withdraw_collateral_check.value):
+                self.verify_withdraw_collateral(
+                    sp.record(
+                        balance=vault_context.value.balance,
+                        minted=vault_context.value.minted,
+                        target_price=target_price,
+                    )
+                )
+
+        self.data.vault_contexts[sp.sender] = vault_context.value
+        self.data.total_supply = sp.as_nat(
+            self.data.total_supply + mint_amount.value - burn_amount.value
+        )
+
+        if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+            sp.verify(
+                sp.utils.nat_to_mutez(deposit_amount.value) == sp.amount,
+                message=Errors.INVALID_PARAMETER,
+            )
+            # the withdrawal has to happen before the deposit, the deposit triggers the vault to set its balance on the engine
+            with sp.if_(withdraw_amount.value > 0):
+                withdraw_from_vault = sp.contract(
+                    TransferAmount.get_type(),
+                    vault_context.value.address,
+                    entry_point="withdraw",
+                ).open_some()
+                sp.transfer(
+                    TransferAmount.make(
+                        sp.sender, sp.utils.nat_to_mutez(withdraw_amount.value)
                     ),
-                    vault_context.value.minted
-                    * self.data.introducer_ratio.numerator
-                    // self.data.introducer_ratio.denominator,
+                    sp.mutez(0),
+                    withdraw_from_vault,
+                )
+            with sp.if_(deposit_amount.value > 0):
+                sp.send(vault_context.value.address, sp.amount)
+        elif self.collateral_token_type == Constants.TOKEN_TYPE_FA2:
+            with sp.if_(deposit_amount.value > 0):
+                Utils.execute_fa2_token_transfer(
+                    self.data.config.collateral_token_contract,
+                    sp.sender,
+                    sp.self_address,
+                    self.data.config.collateral_token_id,
+                    deposit_amount.value,
+                )
+            with sp.if_(withdraw_amount.value > 0):
+                Utils.execute_fa2_token_transfer(
+                    self.data.config.collateral_token_contract,
+                    sp.self_address,
+                    sp.sender,
+                    self.data.config.collateral_token_id,
+                    withdraw_amount.value,
+                )
+        elif self.collateral_token_type == Constants.TOKEN_TYPE_FA1:
+            with sp.if_(deposit_amount.value > 0):
+                Utils.execute_fa1_token_transfer(
+                    self.data.config.collateral_token_contract,
+                    sp.sender,
+                    sp.self_address,
+                    deposit_amount.value,
                 )
+            with sp.if_(withdraw_amount.value > 0):
+                Utils.execute_fa1_token_transfer(
+                    self.data.config.collateral_token_contract,
+                    sp.self_address,
+                    sp.sender,
+                    withdraw_amount.value,
+                )
+
+        with sp.if_(mint_amount.value > 0):
+            Utils.execute_token_mint(
+                self.data.config.token_contract,
+                sp.sender,
+                self.data.config.token_id,
+                sp.as_nat(mint_amount.value - minting_fee.value),
+            )
+            Utils.execute_token_mint(
+                self.data.config.token_contract,
+                self.data.config.reward_pool_contract,
+                self.data.config.token_id,
+                minting_fee.value,
+            )
+        with sp.if_(burn_amount.value > 0):
+            Utils.execute_token_burn(
+                self.data.config.token_contract, sp.sender, self.data.config.token_id, burn_amount.value
+            )
+
+        with sp.if_((mint_amount.value > 0) | (burn_amount.value > 0)):
+            self.update_governance_stakes(
+                self.add_vault_stakes(sp.pair(sp.list([], t=Stake.get_type()), sp.sender))
             )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def liquidate(self, liquidation):
-        """entrypoint that can be called by anyone to liquidate a vault with too little collateral. The actual logic can be found in internal_settle_with_vault.
+        """entrypoint that can be called by anyone to liquidate a vault with too little collateral. The actual logic can be found in compute_settlement.
 
         Post: update_accrual()
-        Post: internal_settle_with_vault()
-        Post: update_governance_stake(sender, storage.vault_contexts[sp.sender].minted)
-        Post: update_governance_stake(introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio)
+        Post: compute_settlement()
+        Post: token.burn(storage.sender, liquidation.token_amount)
+        Post: execute_settlement_payout()
+        Post: update_governance_stakes([(sender, storage.vault_contexts[sp.sender].minted), (introducer, storage.vault_contexts[sp.sender].minted * introducer_ratio) if any])
 
         Args:
             liquidation (Liquidation): liquidation parameter include address and amount to liquidate
@@ -678,31 +1306,138 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(liquidation, Liquidation.get_type())
         self.update_accrual(sp.unit)
 
-        self.internal_settle_with_vault(
-            Settlement.make_internal(
-                liquidation.vault_owner,
-                liquidation.token_amount,
-                sp.sender,
-                self.data.collateral_ratio,
-                self.data.liquidation_payout_ratio,
+        target_price = sp.compute(self.get_target_price(sp.unit))
+
+        self.sync_vault_balance(liquidation.vault_owner)
+        settlement_result = sp.local(
+            "settlement_result",
+            self.compute_settlement(
+                sp.record(
+                    settlement=Settlement.make_internal(
+                        liquidation.vault_owner,
+                        liquidation.token_amount,
+                        sp.sender,
+                        self.data.config.collateral_ratio,
+                        self.data.config.liquidation_payout_ratio,
+                    ),
+                    minted_token_amount=self.get_minted_token_amount(
+                        self.data.vault_contexts[liquidation.vault_owner].minted
+                    ),
+                    target_price=target_price,
+                )
+            ),
+        )
+
+        Utils.execute_token_burn(
+            self.data.config.token_contract,
+            sp.sender,
+            self.data.config.token_id,
+            liquidation.token_amount,
+        )
+
+        vault_address = sp.self_address
+        if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+            vault_address = self.data.vault_contexts[liquidation.vault_owner].address
+
+        self.execute_settlement_payout(
+            sp.record(
+                vault_address=vault_address,
+                recipient=sp.sender,
+                payout_amount=settlement_result.value.payout_amount,
+                reward_amount=settlement_result.value.reward_amount,
             )
         )
 
-        vault_context = sp.local(
-            "vault_context", self.data.vault_contexts[liquidation.vault_owner]
+        self.update_governance_stakes(
+            self.add_vault_stakes(sp.pair(sp.list([], t=Stake.get_type()), liquidation.vault_owner))
         )
-        self.update_governance_stake(
-            Stake.make(liquidation.vault_owner, vault_context.value.minted)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def liquidate_many(self, liquidations):
+        """entrypoint that can be called by anyone to liquidate multiple vaults with too little collateral in one operation. The accrual
+        and the target price are only updated/fetched once and the settled tokens are burned in a single burn. For token collateral the
+        payouts are aggregated into one transfer to the sender and one to the reward pool, tez collateral is withdrawn from every vault.
+
+        Post: update_accrual()
+        Post: compute_settlement() for every liquidation
+        Post: token.burn(storage.sender, sum(liquidation.token_amount))
+        Post: update_governance_stakes(stakes of every liquidated vault owner and introducer)
+
+        Args:
+            liquidations (sp.TList(Liquidation)): the liquidations including address and amount to liquidate
+        """
+        sp.set_type(liquidations, sp.TList(Liquidation.get_type()))
+        self.update_accrual(sp.unit)
+
+        target_price = sp.local(
+            "target_price",
+            self.get_target_price(sp.unit),
         )
-        with sp.if_(vault_context.value.introducer.is_some()):
-            self.update_governance_stake(
-                Stake.make(
-                    vault_context.value.introducer.open_some(
-                        message=Errors.NO_INTRODUCER
-                    ),
-                    vault_context.value.minted
-                    * self.data.introducer_ratio.numerator
-                    // self.data.introducer_ratio.denominator,
+
+        total_token_amount = sp.local("total_token_amount", sp.nat(0))
+        total_payout_amount = sp.local("total_payout_amount", sp.nat(0))
+        total_reward_amount = sp.local("total_reward_amount", sp.nat(0))
+        stakes = sp.local("stakes", sp.list([], t=Stake.get_type()))
+
+        with sp.for_("liquidation", liquidations) as liquidation:
+            self.sync_vault_balance(liquidation.vault_owner)
+            settlement_result = sp.local(
+                "settlement_result",
+                self.compute_settlement(
+                    sp.record(
+                        settlement=Settlement.make_internal(
+                            liquidation.vault_owner,
+                            liquidation.token_amount,
+                            sp.sender,
+                            self.data.config.collateral_ratio,
+                            self.data.config.liquidation_payout_ratio,
+                        ),
+                        minted_token_amount=self.get_minted_token_amount(
+                            self.data.vault_contexts[liquidation.vault_owner].minted
+                        ),
+                        target_price=target_price.value,
+                    )
+                ),
+            )
+            total_token_amount.value += liquidation.token_amount
+
+            vault_context = sp.local(
+                "vault_context", self.data.vault_contexts[liquidation.vault_owner]
+            )
+            if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+                self.execute_settlement_payout(
+                    sp.record(
+                        vault_address=vault_context.value.address,
+                        recipient=sp.sender,
+                        payout_amount=settlement_result.value.payout_amount,
+                        reward_amount=settlement_result.value.reward_amount,
+                    )
+                )
+            else:
+                total_payout_amount.value += settlement_result.value.payout_amount
+                total_reward_amount.value += settlement_result.value.reward_amount
+
+            stakes.value = self.add_vault_stakes(
+                sp.pair(stakes.value, liquidation.vault_owner)
+            )
+
+        self.update_governance_stakes(stakes.value)
+
+        with sp.if_(total_token_amount.value > 0):
+            Utils.execute_token_burn(
+                self.data.config.token_contract,
+                sp.sender,
+                self.data.config.token_id,
+                total_token_amount.value,
+            )
+
+        if self.collateral_token_type != Constants.TOKEN_TYPE_TEZ:
+            self.execute_settlement_payout(
+                sp.record(
+                    vault_address=sp.self_address,
+                    recipient=sp.sender,
+                    payout_amount=total_payout_amount.value,
+                    reward_amount=total_reward_amount.value,
                 )
             )
 
@@ -719,43 +1454,61 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         Post: token.burn(storage.sender, settlement.token_amount)
         Post: storage.total_supply -= settlement.token_amount
 
-        Post: update_governance_stake(settlement.vault_owner, storage.target_price * ((storage.vault_contexts[settlement.vault_owner].minted*storage.compound_interest_rate/10**12)-settlement.token_amount))
+        Post: update_governance_stakes(settlement.vault_owner, storage.target_price * ((storage.vault_contexts[settlement.vault_owner].minted*storage.compound_interest_rate/10**12)-settlement.token_amount))
         Post: vault.withdraw(settlement.vault_owner, settlement.token_amount*storage.target_price * 0.9375/10**12)
 
         Args:
             settlement (Settlement): the settlement includes the vault_owner, the token_amount and the recipient of the tez
         """
         sp.set_type(settlement, Settlement.get_type())
-        sp.verify(sp.sender == self.data.options_contract, message=Errors.NOT_ADMIN)
+        sp.verify(sp.sender == self.data.config.options_contract, message=Errors.NOT_ADMIN)
         self.update_accrual(sp.unit)
 
-        self.internal_settle_with_vault(
-            Settlement.make_internal(
-                settlement.vault_owner,
-                settlement.token_amount,
-                settlement.recipient,
-                self.data.settlement_ratio,
-                self.data.settlement_payout_ratio,
-            )
+        target_price = sp.compute(self.get_target_price(sp.unit))
+
+        self.sync_vault_balance(settlement.vault_owner)
+        settlement_result = sp.local(
+            "settlement_result",
+            self.compute_settlement(
+                sp.record(
+                    settlement=Settlement.make_internal(
+                        settlement.vault_owner,
+                        settlement.token_amount,
+                        settlement.recipient,
+                        self.data.config.settlement_ratio,
+                        self.data.config.settlement_payout_ratio,
+                    ),
+                    minted_token_amount=self.get_minted_token_amount(
+                        self.data.vault_contexts[settlement.vault_owner].minted
+                    ),
+                    target_price=target_price,
+                )
+            ),
         )
 
-        vault_context = sp.local(
-            "vault_context", self.data.vault_contexts[settlement.vault_owner]
-        )
-        self.update_governance_stake(
-            Stake.make(settlement.vault_owner, vault_context.value.minted)
+        Utils.execute_token_burn(
+            self.data.config.token_contract,
+            sp.sender,
+            self.data.config.token_id,
+            settlement.token_amount,
         )
-        with sp.if_(vault_context.value.introducer.is_some()):
-            self.update_governance_stake(
-                Stake.make(
-                    vault_context.value.introducer.open_some(
-                        message=Errors.NO_INTRODUCER
-                    ),
-                    vault_context.value.minted
-                    * self.data.introducer_ratio.numerator
-                    // self.data.introducer_ratio.denominator,
-                )
+
+        vault_address = sp.self_address
+        if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+            vault_address = self.data.vault_contexts[settlement.vault_owner].address
+
+        self.execute_settlement_payout(
+            sp.record(
+                vault_address=vault_address,
+                recipient=settlement.recipient,
+                payout_amount=settlement_result.value.payout_amount,
+                reward_amount=settlement_result.value.reward_amount,
             )
+        )
+
+        self.update_governance_stakes(
+            self.add_vault_stakes(sp.pair(sp.list([], t=Stake.get_type()), settlement.vault_owner))
+        )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self, token_amount):
@@ -775,26 +1528,18 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
         self.update_accrual(sp.unit)
 
+        self.sync_vault_balance(sp.sender)
         vault_context = sp.local("vault_context", self.data.vault_contexts[sp.sender])
 
-        balance_as_nat = sp.as_nat(vault_context.value.balance - token_amount)
-        current_minted_token_amount = (
-            vault_context.value.minted * self.data.compound_interest_rate
-        )
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
-
-        sp.verify(
-            balance_as_nat 
-            * Constants.PRECISION_FACTOR 
-            * Constants.PRICE_PRECISION_FACTOR * self.price_extra_precision_factor
-            * 10**self.token_decimals 
-            * self.data.collateral_ratio.denominator >= current_minted_token_amount
-            * target_price * self.data.collateral_ratio.numerator * 10**self.collateral_token_decimals,
-            message=Errors.NOT_ENOUGH_COLLATERAL,
+        vault_context.value.balance = sp.as_nat(vault_context.value.balance - token_amount)
+        target_price = sp.compute(self.get_target_price(sp.unit))
+        self.verify_withdraw_collateral(
+            sp.record(
+                balance=vault_context.value.balance,
+                minted=vault_context.value.minted,
+                target_price=target_price,
+            )
         )
-        vault_context.value.balance = balance_as_nat
 
         self.data.vault_contexts[sp.sender] = vault_context.value
 
@@ -812,15 +1557,15 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             )
         elif self.collateral_token_type == Constants.TOKEN_TYPE_FA2:
             Utils.execute_fa2_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
                 sp.sender,
-                self.data.collateral_token_id,
+                self.data.config.collateral_token_id,
                 token_amount,
             )
         elif self.collateral_token_type == Constants.TOKEN_TYPE_FA1:
             Utils.execute_fa1_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.self_address,
                 sp.sender,
                 token_amount,
@@ -828,37 +1573,129 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def touch(self, addresses):
-        """triggers the contract to update the minted weight of specified vaults
+        """triggers the contract to update the minted weight of specified vaults. All stake changes are sent in a single "update_stakes" call.
         Post: update_accrual()
+        Post: update_governance_stakes(stakes of all vault owners and introducers)
         """
         sp.set_type(addresses, sp.TList(sp.TAddress))
         self.update_accrual(sp.unit)
 
+        stakes = sp.local("stakes", sp.list([], t=Stake.get_type()))
         with sp.for_("address", addresses) as address:
-            vault_context = sp.local(
-                "vault_context", self.data.vault_contexts[address]
+            stakes.value = self.add_vault_stakes(sp.pair(stakes.value, address))
+
+        self.update_governance_stakes(stakes.value)
+
+    @sp.entry_point
+    def import_vault_contexts(self, vault_imports):
+        """entrypoint used by an admin to migrate vault contexts of previous engines in bulk. The minted amounts have to be normalised
+        to the compound interest rate of this engine (see utils/migration.py), the total supply is increased by the imported token amounts.
+        The imported collateral is taken into custody by this engine: the tez engine originates a vault per owner funded with the imported
+        balance out of sp.amount, the token engines transfer the imported balances from the sender to the engine (the sender has to hold
+        the collateral withdrawn from the previous engine, see contracts/tracker/vault_export.py). Governance stakes are not updated, use
+        touch for the imported owners. Not possible anymore once the import is locked.
+
+        Pre: storage.administrators.contains(sp.sender)
+        Pre: ~storage.vault_import_locked
+        Pre: ~storage.vault_contexts.contains(owner) for every imported vault context
+        Pre: sp.amount == sum(vault_import.balance) for the tez engine, sp.amount == 0 for the token engines
+
+        Post: update_accrual()
+        Post: storage.vault_contexts[owner] = vault_import for every imported vault context
+        Post: storage.total_supply += sum(vault_import.minted*storage.compound_interest_rate/10**12)
+        Post: sum(vault_import.balance) collateral taken into custody
+
+        Args:
+            vault_imports (sp.TList(sp.TRecord(owner, vault_context))): the vault contexts to import with their owners
+        """
+        sp.set_type(
+            vault_imports,
+            sp.TList(
+                sp.TRecord(
+                    owner=sp.TAddress, vault_context=self.get_vault_import_type()
+                ).layout(("owner", "vault_context"))
+            ),
+        )
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        sp.verify(~self.data.vault_import_locked, message=Errors.VAULT_IMPORT_LOCKED)
+        self.update_accrual(sp.unit)
+
+        imported_token_amount = sp.local("imported_token_amount", sp.nat(0))
+        imported_balance = sp.local("imported_balance", sp.nat(0))
+        with sp.for_("vault_import", vault_imports) as vault_import:
+            sp.verify(
+                ~self.data.vault_contexts.contains(vault_import.owner),
+                message=Errors.ALREADY_PRESENT,
             )
-            self.update_governance_stake(
-                Stake.make(address, vault_context.value.minted)
+            self.import_vault_context(vault_import.owner, vault_import.vault_context)
+            imported_token_amount.value += self.get_minted_token_amount(
+                vault_import.vault_context.minted
             )
-            with sp.if_(vault_context.value.introducer.is_some()):
-                self.update_governance_stake(
-                    Stake.make(
-                        vault_context.value.introducer.open_some(
-                            message=Errors.NO_INTRODUCER
-                        ),
-                        vault_context.value.minted
-                        * self.data.introducer_ratio.numerator
-                        // self.data.introducer_ratio.denominator,
-                    )
-                )
+            imported_balance.value += vault_import.vault_context.balance
+
+        self.data.total_supply += imported_token_amount.value
+
+        if self.collateral_token_type == Constants.TOKEN_TYPE_TEZ:
+            sp.verify(
+                sp.utils.nat_to_mutez(imported_balance.value) == sp.amount,
+                message=Errors.INVALID_PARAMETER,
+            )
+        else:
+            sp.verify(sp.amount == sp.mutez(0), message=Errors.INVALID_PARAMETER)
+        if self.collateral_token_type == Constants.TOKEN_TYPE_FA2:
+            Utils.execute_fa2_token_transfer(
+                self.data.config.collateral_token_contract,
+                sp.sender,
+                sp.self_address,
+                self.data.config.collateral_token_id,
+                imported_balance.value,
+            )
+        elif self.collateral_token_type == Constants.TOKEN_TYPE_FA1:
+            Utils.execute_fa1_token_transfer(
+                self.data.config.collateral_token_contract,
+                sp.sender,
+                sp.self_address,
+                imported_balance.value,
+            )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def lock_vault_import(self):
+        """Locks import_vault_contexts for good once the migration is done. Only an admin can call this entrypoint."""
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        self.data.vault_import_locked = True
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def update(self):
-        """triggers the contract to update the accrual
+        """triggers the contract to update the accrual. The pools call this before fetching their
+        balance, hence pending accrual is minted as well. With deferred accrual this flushes the
+        accrual accumulated while deferred in bulk. Anyone can call this.
         Post: update_accrual()
+        Post: mint_pending_accrual()
         """
         self.update_accrual(sp.unit)
+        self.mint_pending_accrual(sp.unit)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_deferred_accrual(self, deferred_accrual):
+        """Enables or disables the deferred accrual minting. Pending accrual is minted when switching.
+        Only an admin can call this entrypoint."""
+        sp.set_type(deferred_accrual, sp.TBool)
+
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        self.update_accrual(sp.unit)
+        self.mint_pending_accrual(sp.unit)
+        self.data.deferred_accrual = deferred_accrual
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_price_cache_enabled(self, price_cache_enabled):
+        """Enables or disables the per level target price cache. Only an admin can call this entrypoint."""
+        sp.set_type(price_cache_enabled, sp.TBool)
+
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        with sp.if_(price_cache_enabled):
+            self.data.price_cache = sp.some(sp.record(price=sp.nat(0), level=sp.nat(0)))
+        with sp.else_():
+            self.data.price_cache = sp.none
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_collateral_ratio(self, ratio):
@@ -866,7 +1703,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.collateral_ratio = ratio
+        self.data.config.collateral_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_settlement_ratio(self, ratio):
@@ -874,7 +1711,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.settlement_ratio = ratio
+        self.data.config.settlement_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_minting_fee_ratio(self, ratio):
@@ -882,7 +1719,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.minting_fee_ratio = ratio
+        self.data.config.minting_fee_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_introducer_ratio(self, ratio):
@@ -890,7 +1727,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.introducer_ratio = ratio
+        self.data.config.introducer_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_settlement_reward_fee_ratio(self, ratio):
@@ -898,7 +1735,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.settlement_reward_fee_ratio = ratio
+        self.data.config.settlement_reward_fee_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_settlement_payout_ratio(self, ratio):
@@ -906,7 +1743,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.settlement_payout_ratio = ratio
+        self.data.config.settlement_payout_ratio = ratio
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_liquidation_payout_ratio(self, ratio):
@@ -914,7 +1751,7 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(ratio, Ratio.get_type())
 
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
-        self.data.liquidation_payout_ratio = ratio
+        self.data.config.liquidation_payout_ratio = ratio
 
     ######################## ON CHAIN VIEWS ########################
     @sp.onchain_view()
@@ -937,73 +1774,93 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
     def total_supply(self):
         sp.result(self.data.total_supply)
 
+    @sp.onchain_view()
+    def deferred_accrual(self):
+        sp.result(self.data.deferred_accrual)
+
+    @sp.onchain_view()
+    def pending_asset_accrual(self):
+        sp.result(self.data.pending_asset_accrual)
+
+    @sp.onchain_view()
+    def pending_spread_accrual(self):
+        sp.result(self.data.pending_spread_accrual)
+
+    @sp.onchain_view()
+    def price_cache(self):
+        sp.result(self.data.price_cache)
+
+    @sp.onchain_view()
+    def vault_import_locked(self):
+        sp.result(self.data.vault_import_locked)
+
     @sp.onchain_view()
     def target_price_oracle(self):
-        sp.result(self.data.target_price_oracle)
+        sp.result(self.data.config.target_price_oracle)
 
     @sp.onchain_view()
     def reward_pool_contract(self):
-        sp.result(self.data.reward_pool_contract)
+        sp.result(self.data.config.reward_pool_contract)
 
     @sp.onchain_view()
     def savings_pool_contract(self):
-        sp.result(self.data.savings_pool_contract)
+        sp.result(self.data.config.savings_pool_contract)
 
     @sp.onchain_view()
     def governance_token_contract(self):
-        sp.result(self.data.governance_token_contract)
+        sp.result(self.data.config.governance_token_contract)
 
     @sp.onchain_view()
     def options_contract(self):
-        sp.result(self.data.options_contract)
+        sp.result(self.data.config.options_contract)
 
     @sp.onchain_view()
     def interest_rate_setter_contract(self):
-        sp.result(self.data.interest_rate_setter_contract)
+        sp.result(self.data.config.interest_rate_setter_contract)
 
     @sp.onchain_view()
     def token_contract(self):
-        sp.result(self.data.token_contract)
+        sp.result(self.data.config.token_contract)
 
     @sp.onchain_view()
     def token_id(self):
-        sp.result(self.data.token_id)
+        sp.result(self.data.config.token_id)
 
     @sp.onchain_view()
     def collateral_token_contract(self):
-        sp.result(self.data.collateral_token_contract)
+        sp.result(self.data.config.collateral_token_contract)
 
     @sp.onchain_view()
     def collateral_token_id(self):
-        sp.result(self.data.collateral_token_id)
+        sp.result(self.data.config.collateral_token_id)
 
     @sp.onchain_view()
     def collateral_ratio(self):
-        sp.result(self.data.collateral_ratio)
+        sp.result(self.data.config.collateral_ratio)
 
     @sp.onchain_view()
     def settlement_ratio(self):
-        sp.result(self.data.settlement_ratio)
+        sp.result(self.data.config.settlement_ratio)
 
     @sp.onchain_view()
     def minting_fee_ratio(self):
-        sp.result(self.data.minting_fee_ratio)
+        sp.result(self.data.config.minting_fee_ratio)
 
     @sp.onchain_view()
     def introducer_ratio(self):
-        sp.result(self.data.introducer_ratio)
+        sp.result(self.data.config.introducer_ratio)
 
     @sp.onchain_view()
     def settlement_reward_fee_ratio(self):
-        sp.result(self.data.settlement_reward_fee_ratio)
+        sp.result(self.data.config.settlement_reward_fee_ratio)
 
     @sp.onchain_view()
     def settlement_payout_ratio(self):
-        sp.result(self.data.settlement_payout_ratio)
+        sp.result(self.data.config.settlement_payout_ratio)
 
     @sp.onchain_view()
     def liquidation_payout_ratio(self):
-        sp.result(self.data.liquidation_payout_ratio)
+        sp.result(self.data.config.liquidation_payout_ratio)
 
     @sp.onchain_view()
     def is_admin(self, ledger_key):
@@ -1018,3 +1875,91 @@ class BaseTrackerEngine(sp.Contract, AdministrableMixin):
             sp.result(sp.some(self.data.vault_contexts[address]))
         with sp.else_():
             sp.result(sp.none)
+
+    @sp.onchain_view()
+    def get_engine_state(self, address):
+        """Returns the accrual state, the price cache, the import lock and the config of the engine as one snapshot. If an address is given, the vault context
+        of that address is included (none if the vault is not present)."""
+        sp.set_type(address, sp.TOption(sp.TAddress))
+
+        vault_context = sp.local("vault_context", sp.none)
+        with sp.if_(address.is_some()):
+            with sp.if_(self.data.vault_contexts.contains(address.open_some())):
+                vault_context.value = sp.some(
+                    self.data.vault_contexts[address.open_some()]
+                )
+
+        sp.result(
+            sp.record(
+                accrual_update_timestamp=self.data.accrual_update_timestamp,
+                reference_interest_rate=self.data.reference_interest_rate,
+                compound_interest_rate=self.data.compound_interest_rate,
+                spread_rate=self.data.spread_rate,
+                total_supply=self.data.total_supply,
+                deferred_accrual=self.data.deferred_accrual,
+                pending_asset_accrual=self.data.pending_asset_accrual,
+                pending_spread_accrual=self.data.pending_spread_accrual,
+                price_cache=self.data.price_cache,
+                vault_import_locked=self.data.vault_import_locked,
+                config=self.data.config,
+                vault_context=vault_context.value,
+            )
+        )
+
+    @sp.onchain_view()
+    def vault_health(self, address):
+        """Returns the health of a vault or none if the vault is not present. The minted amount includes the accrual up to sp.now
+        without updating the storage and the balance is the one the entrypoints use (see get_current_compound_interest_rate and
+        get_vault_balance). The collateral ratio is the ratio of collateral value to minted value (same unit as
+        storage.collateral_ratio, the denominator is 0 if nothing is minted). The liquidation headroom is the collateral amount above
+        the required collateral ratio, a negative headroom means the vault can be liquidated."""
+        sp.set_type(address, sp.TAddress)
+
+        with sp.if_(self.data.vault_contexts.contains(address)):
+            vault_context = sp.local("vault_context", self.data.vault_contexts[address])
+            balance = sp.local("balance", self.get_vault_balance(vault_context.value))
+            current_minted_token_amount = sp.local(
+                "current_minted_token_amount",
+                self.ceil_minted_token_amount(
+                    vault_context.value.minted,
+                    self.get_current_compound_interest_rate(),
+                ),
+            )
+
+            target_price = sp.view(
+                "get_price", self.data.config.target_price_oracle, sp.unit, t=sp.TNat
+            ).open_some(Errors.INVALID_VIEW)
+
+            required_collateral_value = (
+                self.get_required_balance(
+                    current_minted_token_amount.value, target_price
+                )
+                * 10**self.collateral_token_decimals
+            )
+            collateral_value_factor = (
+                Constants.PRICE_PRECISION_FACTOR * 10**self.token_decimals
+            )
+            required_collateral = (
+                required_collateral_value + (collateral_value_factor - 1)
+            ) // collateral_value_factor
+
+            sp.result(
+                sp.some(
+                    sp.record(
+                        minted=current_minted_token_amount.value,
+                        balance=balance.value,
+                        collateral_ratio=Ratio.make(
+                            balance.value
+                            * Constants.PRICE_PRECISION_FACTOR
+                            * self.price_extra_precision_factor
+                            * 10**self.token_decimals,
+                            current_minted_token_amount.value
+                            * target_price
+                            * 10**self.collateral_token_decimals,
+                        ),
+                        liquidation_headroom=balance.value - required_collateral,
+                    )
+                )
+            )
+        with sp.else_():
+            sp.result(sp.none)
@@ -4,6 +4,7 @@ import utils.error_codes as Errors
 import utils.constants as Constants
 
 from utils.administrable_mixin import SingleAdministrableMixin
+from utils.balance_view_mixin import BalanceViewMixin
 from utils.contract_utils import Utils, Ratio
 from utils.fa2 import OperatorKey, BalanceOf, FA2ErrorMessage, UpdateOperator, Transfer, TokenMetadata
 from utils.internal_mixin import InternalMixin
@@ -95,7 +96,19 @@ class Stake:
         )
 
 
-class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
+class Commit:
+    def get_type():
+        return sp.TRecord(
+            amount=sp.TNat,
+            cooldown_duration=sp.TNat,
+            stake_id=sp.TOption(sp.TNat),
+        )
+
+    def get_batch_type():
+        return sp.TList(Commit.get_type())
+
+
+class CommitmentPool(sp.Contract, InternalMixin, BalanceViewMixin, SingleAdministrableMixin):
     """The commitment pool allows a user to stake their tokens and then get YOU rewards. The
     rewards are coming from fees of the other parts of the platform (farms, mint, etc.).
 
@@ -103,6 +116,8 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         (sp.Contract): this is a smartpy contract
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an
             internal call (to process after we received said external data)
+        (BalanceViewMixin): mixin used to read the own token balance through the view of the
+            token contract and execute in the same call
         (SingleAdministrableMixin): mixin used whenever we have a single administrator.
     """
 
@@ -116,6 +131,7 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         token_address=Constants.DEFAULT_ADDRESS,
         allowed_sources=sp.big_map(l={}, tkey=sp.TAddress, tvalue=sp.TUnit),
         token_id=sp.nat(0),
+        use_balance_view=False,
     ):
         """
         Constructor of the commitment contract.
@@ -140,7 +156,12 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             The contract address of the staked token.
         token_id: sp.TNat
             The token id of the staked token.
+        use_balance_view: bool
+            If True, the own token balance is read through the "get_balance" view of the token
+            contract and the actions are executed in the same call. Tokens without the view fall
+            back to the balance_of callback and the internal entrypoints.
         """
+        self.use_balance_view = use_balance_view
         metadata = sp.big_map(
             l={
                 "": sp.bytes("0x74657a6f732d73746f726167653a64617461"),  # "tezos-storage:data"
@@ -265,7 +286,7 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         Utils.execute_get_own_balance(
             token_address=self.data.token_address,
             token_id=self.data.token_id,
-            setter_entrypoint_name="set_token_balance",
+            setter_entrypoint="set_token_balance",
         )
 
     @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
@@ -318,6 +339,126 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             message="NotAllowedSource",
         )
 
+    def fetch_balance_and_execute(self, internal_entry_point, parameter, execute):
+        """
+        Fetches the token balance and calls the internal entrypoint with the parameter. If
+        use_balance_view is set, the balance is read through the view of the token contract and
+        the action is executed in the same call instead (callback path if the token has no view).
+
+        Parameters
+        ----------
+        internal_entry_point: str
+            The internal entrypoint used by the callback path.
+        parameter: sp.TRecord or sp.TUnit
+            The parameter of the internal entrypoint.
+        execute: function
+            Generates the main logic of the internal entrypoint.
+        """
+
+        def call_internal():
+            self.fetch_token_balance(sp.unit)
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_balance_view:
+            self.execute_with_own_balance(
+                self.data.token_address,
+                self.data.token_id,
+                "current_token_balance",
+                execute,
+                call_internal,
+            )
+        else:
+            call_internal()
+
+    def verify_commit(self, owner, param):
+        """
+        Verifies that the commit of the owner is valid, see commit for the raised errors.
+        """
+        sp.verify(
+            param.cooldown_duration <= self.data.max_cooldown_duration,
+            message="InvalidCooldownDuration",
+        )
+        with sp.if_(param.stake_id.is_some()):
+            stake_id = sp.local("stake_id", param.stake_id.open_some())
+            sp.verify(self.data.stakes.contains(stake_id.value), message="InvalidStakeId")
+            sp.verify(self.data.ledger[stake_id.value] == owner, message="NotOwner")
+            sp.verify(
+                self.data.stakes[stake_id.value].cooldown_duration <= param.cooldown_duration,
+                message="InvalidCooldownDuration",
+            )
+            sp.verify(
+                self.data.stakes[stake_id.value].cooldown_start_timestamp == sp.none,
+                message="InvalidState",
+            )
+        with sp.else_():
+            sp.verify(param.amount >= MIN_STAKE_AMOUNT, message="InsufficientStakedAmount")
+
+    def verify_enter_cooldown(self, owner, stake_id):
+        """
+        Verifies that the owner can start the cooldown of the stake, see enter_cooldown for the
+        raised errors.
+        """
+        sp.verify(
+            self.data.stakes.contains(stake_id),
+            message="InvalidStakeId",
+        )
+        sp.verify(self.data.ledger[stake_id] == owner, message="NotOwner")
+        sp.verify(
+            self.data.stakes[stake_id].cooldown_start_timestamp == sp.none,
+            message="InvalidState",
+        )
+
+    def verify_withdraw(self, owner, stake_id):
+        """
+        Verifies that the owner can withdraw the stake, see withdraw for the raised errors.
+        """
+        sp.verify(
+            self.data.stakes.contains(stake_id),
+            message="InvalidStakeId",
+        )
+        cooldown_stake = sp.local("cooldown_stake", self.data.stakes[stake_id])
+        sp.verify(self.data.ledger[stake_id] == owner, message="NotOwner")
+        sp.verify(cooldown_stake.value.cooldown_start_timestamp.is_some(), message="InvalidState")
+        withdrawl_time = sp.local(
+            "withdrawl_time",
+            cooldown_stake.value.cooldown_start_timestamp.open_some().add_seconds(
+                sp.to_int(cooldown_stake.value.cooldown_duration)
+            ),
+        )
+        sp.verify(sp.now >= withdrawl_time.value, message="NotAllowed")
+
+    def verify_kickout(self, stake_id):
+        """
+        Verifies that the stake can be kicked out, see kickout for the raised errors.
+        """
+        sp.verify(
+            self.data.stakes.contains(stake_id),
+            message="InvalidStakeId",
+        )
+        cooldown_stake = sp.local("cooldown_stake", self.data.stakes[stake_id])
+        sp.verify(cooldown_stake.value.cooldown_start_timestamp.is_some(), message="InvalidState")
+        kickout_time = sp.local(
+            "kickout_time",
+            cooldown_stake.value.cooldown_start_timestamp.open_some().add_seconds(
+                sp.to_int(cooldown_stake.value.cooldown_duration + self.data.max_withdraw_delay)
+            ),
+        )
+        sp.verify(sp.now > kickout_time.value, message="NotAllowed")
+
+    def is_kickable(self, stake_id):
+        """
+        Returns whether the stake exists and can be kicked out, the checks of verify_kickout
+        without failing.
+        """
+        kickable = sp.local("kickable", False)
+        with sp.if_(self.data.stakes.contains(stake_id)):
+            kickable_stake = sp.local("kickable_stake", self.data.stakes[stake_id])
+            with sp.if_(kickable_stake.value.cooldown_start_timestamp.is_some()):
+                kickable.value = sp.now > kickable_stake.value.cooldown_start_timestamp.open_some().add_seconds(
+                    sp.to_int(kickable_stake.value.cooldown_duration + self.data.max_withdraw_delay)
+                )
+        return kickable.value
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def commit(self, param):
         """
@@ -354,37 +495,43 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         InsufficientStakedAmount
             If the amount staked is lower than the minimum required (0.1 YOUs)
         """
-        sp.set_type(
-            param,
-            sp.TRecord(
-                amount=sp.TNat, 
-                cooldown_duration=sp.TNat, 
-                stake_id=sp.TOption(sp.TNat))
-        )
-        sp.verify(
-            param.cooldown_duration <= self.data.max_cooldown_duration,
-            message="InvalidCooldownDuration",
-        )
-        with sp.if_(param.stake_id.is_some()):
-            stake_id = sp.local("stake_id", param.stake_id.open_some())
-            sp.verify(self.data.stakes.contains(stake_id.value), message="InvalidStakeId")
-            sp.verify(self.data.ledger[stake_id.value] == sp.sender, message="NotOwner")
-            sp.verify(
-                self.data.stakes[stake_id.value].cooldown_duration <= param.cooldown_duration,
-                message="InvalidCooldownDuration",
-            )
-            sp.verify(
-                self.data.stakes[stake_id.value].cooldown_start_timestamp == sp.none,
-                message="InvalidState",
-            )
-        with sp.else_():
-            sp.verify(param.amount >= MIN_STAKE_AMOUNT, message="InsufficientStakedAmount")
+        sp.set_type(param, Commit.get_type())
+        self.verify_commit(sp.sender, param)
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
+        self.fetch_balance_and_execute(
+            "internal_commit",
             sp.record(owner=sp.sender, param=param),
-            sp.mutez(0),
-            sp.self_entry_point("internal_commit"),
+            lambda: self.execute_commit(sp.sender, param),
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def commit_many(self, params):
+        """
+        Creates and/or updates several stakes of the caller at once, each element is handled like
+        the parameter of commit. The reward factor is updated once and the total amount is
+        transfered with a single FA2 transfer.
+        The main logic can be found in the associated internal entrypoint.
+
+        Parameters
+        ----------
+        params: sp.TList(sp.TRecord(
+            amount=sp.TNat,
+            cooldown_duration=sp.TNat,
+            stake_id=sp.TOption(sp.TNat),
+        ))
+            The commits, applied in order.
+
+        Raises
+        ------
+        Same as commit, the commits are verified in order such that several updates of the same
+        stake cannot decrease its cooldown duration.
+        """
+        sp.set_type(params, Commit.get_batch_type())
+
+        self.fetch_balance_and_execute(
+            "internal_commit_many",
+            sp.record(owner=sp.sender, params=params),
+            lambda: self.execute_commit_many(sp.sender, params),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -415,11 +562,10 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             message="InvalidState",
         )
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
+        self.fetch_balance_and_execute(
+            "internal_recommit",
             sp.record(owner=sp.sender, stake_id=stake_id),
-            sp.mutez(0),
-            sp.self_entry_point("internal_recommit"),
+            lambda: self.execute_recommit(sp.sender, stake_id),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -447,21 +593,36 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             If the stake does not exist.
         """
         sp.set_type(stake_id, sp.TNat)
-        sp.verify(
-            self.data.stakes.contains(stake_id),
-            message="InvalidStakeId",
-        )
-        sp.verify(self.data.ledger[stake_id] == sp.sender, message="NotOwner")
-        sp.verify(
-            self.data.stakes[stake_id].cooldown_start_timestamp == sp.none,
-            message="InvalidState",
-        )
+        self.verify_enter_cooldown(sp.sender, stake_id)
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
+        self.fetch_balance_and_execute(
+            "internal_enter_cooldown",
             sp.record(owner=sp.sender, stake_id=stake_id),
-            sp.mutez(0),
-            sp.self_entry_point("internal_enter_cooldown"),
+            lambda: self.execute_enter_cooldown(sp.sender, stake_id),
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def enter_cooldown_many(self, stake_ids):
+        """
+        Starts the cooldown period for several stakes of the caller at once, with a single update
+        of the reward factor.
+        The main logic can be found in the associated internal entrypoint.
+
+        Parameters
+        ----------
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to enter cooldown period.
+
+        Raises
+        ------
+        Same as enter_cooldown, a stake id given twice fails with InvalidState.
+        """
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.fetch_balance_and_execute(
+            "internal_enter_cooldown_many",
+            sp.record(owner=sp.sender, stake_ids=stake_ids),
+            lambda: self.execute_enter_cooldown_many(sp.sender, stake_ids),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -493,26 +654,36 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             If the stake to be withdrawn does not exist.
         """
         sp.set_type(stake_id, sp.TNat)
-        sp.verify(
-            self.data.stakes.contains(stake_id),
-            message="InvalidStakeId",
-        )
-        stake = sp.local("stake", self.data.stakes[stake_id])
-        sp.verify(self.data.ledger[stake_id] == sp.sender, message="NotOwner")
-        sp.verify(stake.value.cooldown_start_timestamp.is_some(), message="InvalidState")
-        withdrawl_time = sp.local(
-            "withdrawl_time",
-            stake.value.cooldown_start_timestamp.open_some().add_seconds(
-                sp.to_int(stake.value.cooldown_duration)
-            ),
-        )
-        sp.verify(sp.now >= withdrawl_time.value, message="NotAllowed")
+        self.verify_withdraw(sp.sender, stake_id)
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
+        self.fetch_balance_and_execute(
+            "internal_withdraw",
             sp.record(owner=sp.sender, stake_id=stake_id),
-            sp.mutez(0),
-            sp.self_entry_point("internal_withdraw"),
+            lambda: self.execute_withdraw(sp.sender, stake_id),
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def withdraw_many(self, stake_ids):
+        """
+        Withdraws several stakes of the caller at once. The reward factor is updated once and the
+        withdrawn amounts are paid out with a single FA2 transfer.
+        The main logic can be found in the associated internal entrypoint.
+
+        Parameters
+        ----------
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to be withdrawn.
+
+        Raises
+        ------
+        Same as withdraw, a stake id given twice fails with InvalidStakeId.
+        """
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.fetch_balance_and_execute(
+            "internal_withdraw_many",
+            sp.record(owner=sp.sender, stake_ids=stake_ids),
+            lambda: self.execute_withdraw_many(sp.sender, stake_ids),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -540,25 +711,39 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             If the stake to be withdrawn does not exist.
         """
         sp.set_type(stake_id, sp.TNat)
-        sp.verify(
-            self.data.stakes.contains(stake_id),
-            message="InvalidStakeId",
-        )
-        stake = sp.local("stake", self.data.stakes[stake_id])
-        sp.verify(stake.value.cooldown_start_timestamp.is_some(), message="InvalidState")
-        kickout_time = sp.local(
-            "kickout_time",
-            stake.value.cooldown_start_timestamp.open_some().add_seconds(
-                sp.to_int(stake.value.cooldown_duration + self.data.max_withdraw_delay)
-            ),
+        self.verify_kickout(stake_id)
+
+        owner = sp.local("owner", self.data.ledger[stake_id])
+        self.fetch_balance_and_execute(
+            "internal_kickout",
+            sp.record(kicker=sp.sender, owner=owner.value, stake_id=stake_id),
+            lambda: self.execute_kickout(sp.sender, owner.value, stake_id),
         )
-        sp.verify(sp.now > kickout_time.value, message="NotAllowed")
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
-            sp.record(kicker=sp.sender, owner=self.data.ledger[stake_id], stake_id=stake_id),
-            sp.mutez(0),
-            sp.self_entry_point("internal_kickout"),
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def kickout_many(self, stake_ids):
+        """
+        Kicks out several stakes at once, see kickout. The reward factor is updated once and the
+        kicker rewards of all stakes are transfered to the caller with a single FA2 transfer, the
+        owners receive their remaining amounts per stake. The utils.kickout_index module keeps
+        track of the kickable stakes off-chain.
+        The main logic can be found in the associated internal entrypoint.
+
+        Parameters
+        ----------
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to be kicked out.
+
+        Stakes that do not exist (anymore) or cannot be kicked out yet are skipped instead of
+        failing the whole batch, the index of the keeper may lag behind the chain and several
+        keepers can race for the same stakes. A stake id given twice is kicked out once.
+        """
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.fetch_balance_and_execute(
+            "internal_kickout_many",
+            sp.record(kicker=sp.sender, stake_ids=stake_ids),
+            lambda: self.execute_kickout_many(sp.sender, stake_ids),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -590,11 +775,10 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(execution_lambda, sp.TLambda(sp.TNat, sp.TList(sp.TOperation)))
         self.verify_is_admin(sp.unit)
 
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(
+        self.fetch_balance_and_execute(
+            "internal_bailout",
             sp.record(amount=amount, execution_lambda=execution_lambda),
-            sp.mutez(0),
-            sp.self_entry_point("internal_bailout"),
+            lambda: self.execute_bailout(amount, execution_lambda),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -628,8 +812,9 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         where many rewards are transfered to the contract and no staking entrypoints were
         called, having such an entrypoint comes handy.
         """
-        self.fetch_token_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_update_parameters")) 
+        self.fetch_balance_and_execute(
+            "internal_update_parameters", sp.unit, self.execute_update_parameters
+        )
     
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_token_balance(self, balance_of_response):
@@ -963,6 +1148,13 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             If the entrypoint was not called by this contract.
         """
         self.verify_internal(sp.unit)
+        self.execute_update_parameters()
+
+    def execute_update_parameters(self):
+        """
+        Main logic of internal_update_parameters, also executed directly by update_parameters
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -989,14 +1181,15 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             If the entrypoint was not called by this contract.
         """
         sp.set_type(owner, sp.TAddress)
-        sp.set_type(
-            param,
-            sp.TRecord(
-                amount=sp.TNat, 
-                cooldown_duration=sp.TNat, 
-                stake_id=sp.TOption(sp.TNat))
-        )
+        sp.set_type(param, Commit.get_type())
         self.verify_internal(sp.unit)
+        self.execute_commit(owner, param)
+
+    def execute_commit(self, owner, param):
+        """
+        Main logic of internal_commit, also executed directly by commit
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
 
         Utils.execute_fa2_token_transfer(
@@ -1007,7 +1200,61 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             param.amount,
         )
         self.data.previous_token_balance = self.data.previous_token_balance + param.amount
+        self.commit_stake(owner, param)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_commit_many(self, owner, params):
+        """
+        Creates and/or updates several stakes of the owner.
 
+        Parameters
+        ----------
+        owner: sp.TAddress
+            The owner of the stakes
+        params: sp.TList(sp.TRecord(
+            amount=sp.TNat,
+            cooldown_duration=sp.TNat,
+            stake_id=sp.TOption(sp.TNat)
+        ))
+            The commits, applied in order.
+
+        Raises
+        ------
+        NotInternal
+            If the entrypoint was not called by this contract.
+        """
+        sp.set_type(owner, sp.TAddress)
+        sp.set_type(params, Commit.get_batch_type())
+        self.verify_internal(sp.unit)
+        self.execute_commit_many(owner, params)
+
+    def execute_commit_many(self, owner, params):
+        """
+        Main logic of internal_commit_many, also executed directly by commit_many
+        when the token balance was read through the balance view.
+        """
+        self.update_reward_factor(sp.unit)
+
+        total_amount = sp.local("total_amount", sp.nat(0))
+        with sp.for_("param", params) as param:
+            self.verify_commit(owner, param)
+            self.commit_stake(owner, param)
+            total_amount.value += param.amount
+
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            owner,
+            sp.self_address,
+            self.data.token_id,
+            total_amount.value,
+        )
+        self.data.previous_token_balance = self.data.previous_token_balance + total_amount.value
+
+    def commit_stake(self, owner, param):
+        """
+        Creates or updates the stake with the current reward and bailout factors, the token
+        transfer and the previous_token_balance are handled by the caller.
+        """
         with sp.if_(param.stake_id.is_none()):
             stake_id = sp.local("stake_id", self.data.stake_id_counter)
             weight = sp.local("weight", (param.amount * param.cooldown_duration) // self.data.max_cooldown_duration)
@@ -1099,6 +1346,13 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(stake_id, sp.TNat)
 
         self.verify_internal(sp.unit)
+        self.execute_recommit(owner, stake_id)
+
+    def execute_recommit(self, owner, stake_id):
+        """
+        Main logic of internal_recommit, also executed directly by recommit
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
 
         stake = sp.local("stake", self.data.stakes[stake_id])
@@ -1155,8 +1409,54 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(stake_id, sp.TNat)
 
         self.verify_internal(sp.unit)
+        self.execute_enter_cooldown(owner, stake_id)
+
+    def execute_enter_cooldown(self, owner, stake_id):
+        """
+        Main logic of internal_enter_cooldown, also executed directly by enter_cooldown
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
+        self.enter_cooldown_stake(stake_id)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_enter_cooldown_many(self, owner, stake_ids):
+        """
+        Starts the cooldown period for several stakes of the owner.
 
+        Parameters
+        ----------
+        owner: sp.TAddress
+            The owner of the stakes
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to enter cooldown period.
+
+        Raises
+        ------
+        NotInternal
+            If the entrypoint was not called by this contract.
+        """
+        sp.set_type(owner, sp.TAddress)
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.verify_internal(sp.unit)
+        self.execute_enter_cooldown_many(owner, stake_ids)
+
+    def execute_enter_cooldown_many(self, owner, stake_ids):
+        """
+        Main logic of internal_enter_cooldown_many, also executed directly by enter_cooldown_many
+        when the token balance was read through the balance view.
+        """
+        self.update_reward_factor(sp.unit)
+        with sp.for_("stake_id", stake_ids) as stake_id:
+            self.verify_enter_cooldown(owner, stake_id)
+            self.enter_cooldown_stake(stake_id)
+
+    def enter_cooldown_stake(self, stake_id):
+        """
+        Settles the stake with the current reward and bailout factors and halves its reward
+        weight.
+        """
         stake = sp.local("stake", self.data.stakes[stake_id])
         stake.value.accumulated_rewards += (
             (sp.as_nat(self.data.reward_factor - stake.value.reward_factor)
@@ -1213,8 +1513,77 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(stake_id, sp.TNat)
 
         self.verify_internal(sp.unit)
+        self.execute_withdraw(owner, stake_id)
+
+    def execute_withdraw(self, owner, stake_id):
+        """
+        Main logic of internal_withdraw, also executed directly by withdraw
+        when the token balance was read through the balance view.
+        """
+        self.update_reward_factor(sp.unit)
+
+        exit_amount = self.withdraw_stake(stake_id)
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            sp.self_address,
+            owner,
+            self.data.token_id,
+            exit_amount,
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_withdraw_many(self, owner, stake_ids):
+        """
+        Withdraws several stakes of the owner and transfers the summed up withdrawn amounts to the
+        owner.
+
+        Parameters
+        ----------
+        owner: sp.TAddress
+            The owner of the stakes.
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to be withdrawn.
+
+        Raises
+        ------
+        NotInternal
+            If the entrypoint was not called by this contract.
+        """
+        sp.set_type(owner, sp.TAddress)
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.verify_internal(sp.unit)
+        self.execute_withdraw_many(owner, stake_ids)
+
+    def execute_withdraw_many(self, owner, stake_ids):
+        """
+        Main logic of internal_withdraw_many, also executed directly by withdraw_many
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
 
+        total_exit_amount = sp.local("total_exit_amount", sp.nat(0))
+        with sp.for_("stake_id", stake_ids) as stake_id:
+            self.verify_withdraw(owner, stake_id)
+            total_exit_amount.value += self.withdraw_stake(stake_id)
+
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            sp.self_address,
+            owner,
+            self.data.token_id,
+            total_exit_amount.value,
+        )
+
+    def withdraw_stake(self, stake_id):
+        """
+        Settles and removes the stake, the payout is left to the caller.
+
+        Returns
+        -------
+        sp.TNat
+            The amount to be transfered to the owner.
+        """
         stake = sp.local("stake", self.data.stakes[stake_id])
         stake.value.accumulated_rewards += (
             (sp.as_nat(self.data.reward_factor - stake.value.reward_factor)
@@ -1242,16 +1611,10 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             self.data.previous_token_balance - exit_amount.value
         )
 
-        Utils.execute_fa2_token_transfer(
-            self.data.token_address,
-            sp.self_address,
-            owner,
-            self.data.token_id,
-            exit_amount.value,
-        )
         del self.data.stakes[stake_id]
         del self.data.ledger[stake_id]
         del self.data.token_metadata[stake_id]
+        return exit_amount.value
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def internal_kickout(self, kicker, owner, stake_id):
@@ -1284,8 +1647,93 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(stake_id, sp.TNat)
 
         self.verify_internal(sp.unit)
+        self.execute_kickout(kicker, owner, stake_id)
+
+    def execute_kickout(self, kicker, owner, stake_id):
+        """
+        Main logic of internal_kickout, also executed directly by kickout
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
 
+        kickout_amounts = self.kickout_stake(stake_id)
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            sp.self_address,
+            kicker,
+            self.data.token_id,
+            sp.fst(kickout_amounts),
+        )
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            sp.self_address,
+            owner,
+            self.data.token_id,
+            sp.snd(kickout_amounts),
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_kickout_many(self, kicker, stake_ids):
+        """
+        Kicks out several stakes, the summed up kicker rewards are transfered to the kicker and
+        the remaining amounts to the owners of the stakes.
+
+        Parameters
+        ----------
+        kicker: sp.TAddress
+            The kicker who is entitled to the rewards.
+        stake_ids: sp.TList(sp.TNat)
+            The stake ids to be kicked out.
+
+        Raises
+        ------
+        NotInternal
+            If the entrypoint was not called by this contract.
+        """
+        sp.set_type(kicker, sp.TAddress)
+        sp.set_type(stake_ids, sp.TList(sp.TNat))
+
+        self.verify_internal(sp.unit)
+        self.execute_kickout_many(kicker, stake_ids)
+
+    def execute_kickout_many(self, kicker, stake_ids):
+        """
+        Main logic of internal_kickout_many, also executed directly by kickout_many
+        when the token balance was read through the balance view.
+        """
+        self.update_reward_factor(sp.unit)
+
+        total_kicker_rewards = sp.local("total_kicker_rewards", sp.nat(0))
+        with sp.for_("stake_id", stake_ids) as stake_id:
+            with sp.if_(self.is_kickable(stake_id)):
+                stake_owner = sp.local("stake_owner", self.data.ledger[stake_id])
+                kickout_amounts = self.kickout_stake(stake_id)
+                total_kicker_rewards.value += sp.fst(kickout_amounts)
+                Utils.execute_fa2_token_transfer(
+                    self.data.token_address,
+                    sp.self_address,
+                    stake_owner.value,
+                    self.data.token_id,
+                    sp.snd(kickout_amounts),
+                )
+
+        Utils.execute_fa2_token_transfer(
+            self.data.token_address,
+            sp.self_address,
+            kicker,
+            self.data.token_id,
+            total_kicker_rewards.value,
+        )
+
+    def kickout_stake(self, stake_id):
+        """
+        Settles and removes the stake, the payouts are left to the caller.
+
+        Returns
+        -------
+        sp.TPair(sp.TNat, sp.TNat)
+            The kicker rewards and the amount to be transfered to the owner.
+        """
         stake = sp.local("stake", self.data.stakes[stake_id])
         stake.value.accumulated_rewards += (
             (sp.as_nat(self.data.reward_factor - stake.value.reward_factor)
@@ -1328,23 +1776,10 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             self.data.previous_token_balance - (exit_amount.value + kicker_rewards.value)
         )
 
-        Utils.execute_fa2_token_transfer(
-            self.data.token_address,
-            sp.self_address,
-            kicker,
-            self.data.token_id,
-            kicker_rewards.value,
-        )
-        Utils.execute_fa2_token_transfer(
-            self.data.token_address,
-            sp.self_address,
-            owner,
-            self.data.token_id,
-            exit_amount.value,
-        )
         del self.data.stakes[stake_id]
         del self.data.ledger[stake_id]
         del self.data.token_metadata[stake_id]
+        return sp.pair(kicker_rewards.value, exit_amount.value)
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def internal_bailout(self, amount, execution_lambda):
@@ -1371,6 +1806,13 @@ class CommitmentPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         sp.set_type(execution_lambda, sp.TLambda(sp.TNat, sp.TList(sp.TOperation)))
 
         self.verify_internal(sp.unit)
+        self.execute_bailout(amount, execution_lambda)
+
+    def execute_bailout(self, amount, execution_lambda):
+        """
+        Main logic of internal_bailout, also executed directly by bailout
+        when the token balance was read through the balance view.
+        """
         self.update_reward_factor(sp.unit)
         self.update_bailout_factor(amount)
 
@@ -3,6 +3,9 @@ import smartpy as sp
 import utils.constants as Constants
 import utils.fa2 as fa2
 
+# the issuance rate is halved every phase, from this phase on it is 0
+ISSUANCE_PHASE_COUNT = Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE.bit_length()
+
 
 class Stake:
     """This type is what is used in the update_stake entrypoint"""
@@ -86,7 +89,8 @@ class GovernanceToken(fa2.BaseFA2, fa2.AdministrableMixin):
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
     def sub_distribute(self, unit):
         """sub entry point that updates the distribution factor based on time. The rule is that we start with ~40k tokens (40k issuance + treasury reward) per week or ~0.066 token per second,
-        every 365 days a new "phase" is started and this issuance number is halved. This method takes care of "cross" phase distribution.
+        every 365 days a new "phase" is started and this issuance number is halved. This method takes care of "cross" phase distribution. The crossed
+        phases are accounted one by one (each with its own rounding) up to ISSUANCE_PHASE_COUNT, the storage is written once.
         Pre: storage.total_stake > 0
         Post: storage.dist_factor += timedelta_since_last_udpate *
         Post: storage.last_update_timestamp = sp.now
@@ -97,57 +101,57 @@ class GovernanceToken(fa2.BaseFA2, fa2.AdministrableMixin):
         """
         sp.set_type(unit, sp.TUnit)
         with sp.if_(self.data.total_stake > 0):
-            start_phase = (
+            start_phase = sp.compute(
                 sp.as_nat(
                     self.data.last_update_timestamp - self.data.epoch_start_timestamp
                 )
                 / Constants.ISSUANCE_PHASE_INTERVAL
             )
-            end_phase = (
+            end_phase = sp.compute(
                 sp.as_nat(sp.now - self.data.epoch_start_timestamp)
                 / Constants.ISSUANCE_PHASE_INTERVAL
             )
-            issuance = sp.local("issuance", 0)
+            last_update_timestamp = sp.local(
+                "last_update_timestamp", self.data.last_update_timestamp
+            )
+            dist_factor = sp.local("dist_factor", self.data.dist_factor)
             treasury_reward = sp.local("treasury_reward", 0)
 
-            with sp.for_("phase", sp.range(start_phase, end_phase)) as phase:
-                phase_end_timestamp = sp.local(
-                    "phase_end_timestamp",
+            # the rate of the phases from ISSUANCE_PHASE_COUNT on is 0, they are skipped
+            with sp.for_(
+                "phase", sp.range(start_phase, sp.min(end_phase, ISSUANCE_PHASE_COUNT))
+            ) as phase:
+                phase_end_timestamp = sp.compute(
                     self.data.epoch_start_timestamp.add_seconds(
                         sp.to_int((phase + 1) * Constants.ISSUANCE_PHASE_INTERVAL)
-                    ),
+                    )
                 )
-                timedelta = sp.as_nat(
-                    phase_end_timestamp.value - self.data.last_update_timestamp
+                issuance = sp.compute(
+                    sp.as_nat(phase_end_timestamp - last_update_timestamp.value)
+                    * (Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> phase)
                 )
-                issuance.value = timedelta * (
-                    Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> phase
-                )
-                treasury_reward.value += (
-                    issuance.value >> Constants.TREASURY_REWARD_BITSHIFT
+                treasury_reward.value += issuance >> Constants.TREASURY_REWARD_BITSHIFT
+                dist_factor.value += (
+                    issuance * Constants.PRECISION_FACTOR / self.data.total_stake
                 )
+                last_update_timestamp.value = phase_end_timestamp
 
-                self.data.dist_factor += (
-                    issuance.value * Constants.PRECISION_FACTOR / self.data.total_stake
+            with sp.if_(end_phase < ISSUANCE_PHASE_COUNT):
+                issuance = sp.compute(
+                    sp.as_nat(sp.now - last_update_timestamp.value)
+                    * (Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> end_phase)
+                )
+                treasury_reward.value += issuance >> Constants.TREASURY_REWARD_BITSHIFT
+                dist_factor.value += (
+                    issuance * Constants.PRECISION_FACTOR / self.data.total_stake
                 )
-                self.data.last_update_timestamp = phase_end_timestamp.value
-
-            timedelta = sp.as_nat(sp.now - self.data.last_update_timestamp)
-            issuance.value = timedelta * (
-                Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> end_phase
-            )
-            treasury_reward.value += (
-                issuance.value >> Constants.TREASURY_REWARD_BITSHIFT
-            )
 
             self.data.ledger[self.data.treasury_ledger_key] += treasury_reward.value
             self.data.total_supply[
                 Constants.GOVERNANCE_TOKEN_ID
             ] += treasury_reward.value
 
-            self.data.dist_factor += (
-                issuance.value * Constants.PRECISION_FACTOR / self.data.total_stake
-            )
+            self.data.dist_factor = dist_factor.value
             self.data.last_update_timestamp = sp.now
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
@@ -215,6 +219,37 @@ class GovernanceToken(fa2.BaseFA2, fa2.AdministrableMixin):
         self.verify_is_admin(Constants.GOVERNANCE_TOKEN_ID)
 
         self.sub_distribute(sp.unit)
+        self.execute_update_stake(stake)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def update_stakes(self, stakes):
+        """Only an admin for token id 0 can call this entrypoint. It will update the stakes of the given addresses in order, after having distributed once
+        and claimed the stakes of every address.
+        Pre: verify_is_admin(0)
+        Pre: sub_distribute()
+        Pre: sub_claim(stake.address) for every stake
+
+        Args:
+            stakes (sp.TList(Stake)): the stakes
+        """
+        sp.set_type(stakes, sp.TList(Stake.get_type()))
+        self.verify_is_admin(Constants.GOVERNANCE_TOKEN_ID)
+
+        self.sub_distribute(sp.unit)
+        with sp.for_("stake", stakes) as stake:
+            self.execute_update_stake(stake)
+
+    def execute_update_stake(self, stake):
+        """claims the due tokens of the stake's address and sets its new stake, shared by update_stake and update_stakes. The distribution
+        factor has to be up to date (sub_distribute).
+
+        Post: sub_claim(stake.address)
+        Post: storage.total_stake += stake.amount - storage.stakes[stake.address]
+        Post: storage.stakes[stake.address] = stake.amount (removed if 0)
+
+        Args:
+            stake (Stake): the stake
+        """
         self.sub_claim(stake.address)
 
         self.data.dist_factors[stake.address] = self.data.dist_factor
@@ -233,3 +268,18 @@ class GovernanceToken(fa2.BaseFA2, fa2.AdministrableMixin):
         """entrypoint that allows a sender to claim it's rewards, it will also force a recalculation of the distribution factor before."""
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.sender)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def claim_for(self, addresses):
+        """entrypoint that allows anyone to claim the rewards of the given addresses, the rewards are minted to the addresses themselves.
+        The distribution factor is only recalculated once for all of them.
+        Post: sub_distribute()
+        Post: sub_claim(address) for every address
+
+        Args:
+            addresses (sp.TList(sp.TAddress)): the addresses to claim for
+        """
+        sp.set_type(addresses, sp.TList(sp.TAddress))
+        self.sub_distribute(sp.unit)
+        with sp.for_("address", addresses) as address:
+            self.sub_claim(address)
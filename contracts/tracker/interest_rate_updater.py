@@ -1,12 +1,27 @@
 import smartpy as sp
 
 import utils.constants as Constants
+import utils.error_codes as Errors
 
 from utils.contract_utils import Utils
 from utils.internal_mixin import InternalMixin
 from utils.administrable_mixin import SingleAdministrableMixin
 
 
+class ReferenceInterestRate:
+    """This type is what is returned by the get_reference_interest_rate view"""
+
+    def get_type():
+        """Returns the reference interest rate type, layouted
+
+        Returns:
+            sp.TRecord: layouted type of the reference interest rate and the timestamp it is effective from
+        """
+        return sp.TRecord(
+            reference_interest_rate=sp.TNat, effective_timestamp=sp.TTimestamp
+        ).layout(("reference_interest_rate", "effective_timestamp"))
+
+
 class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
     """this is the heartpiece of the entire project. The engine that orchestrates all other components. This is also the contract responsible for the interest rate/inflation of the liability/savings rate of the
     synthetic asset. This engine is built to create synthetic asset tokens that by getting data from an oracle the resulting synthetic asset will track that value.
@@ -28,6 +43,17 @@ class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
         storage["reference_interest_rate"] = Constants.SECONDS_INTEREST_MINIMUM
 
         storage["last_update_timestamp"] = sp.timestamp(0)
+        storage["reference_interest_rates"] = sp.big_map(
+            {
+                0: sp.record(
+                    reference_interest_rate=Constants.SECONDS_INTEREST_MINIMUM,
+                    effective_timestamp=sp.timestamp(0),
+                )
+            },
+            tkey=sp.TNat,
+            tvalue=ReferenceInterestRate.get_type(),
+        )
+        storage["reference_interest_rate_count"] = sp.nat(1)
 
         storage["target_price_oracle_address"] = self.target_price_oracle_address
         storage["observed_price_oracle_address"] = self.observed_price_oracle_address
@@ -47,14 +73,22 @@ class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
         target_price_oracle_address,
         observed_price_oracle_address,
         administrators=sp.big_map({}),
+        pull_reference_interest_rate=False,
+        use_price_views=False,
     ):
         """init to set the token and administrators, in order to be fully operational set_contracts need to be called first.
         Args:
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            pull_reference_interest_rate (bool, optional): if set, the engines read the rates through the get_reference_interest_rates
+                view and the update does not call set_reference_interest_rate on every engine. Defaults to False.
+            use_price_views (bool, optional): if set, interest_rate_update reads both prices through the "get_price" views of the
+                oracles and updates the rate in the same execution instead of using callbacks and an internal call. Defaults to False.
         """
         self.engine_addresses = engine_addresses
+        self.pull_reference_interest_rate = pull_reference_interest_rate
+        self.use_price_views = use_price_views
         self.target_price_oracle_address = target_price_oracle_address
         self.observed_price_oracle_address = observed_price_oracle_address
         self.administrators = administrators
@@ -83,6 +117,20 @@ class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
             self.data.observed_price_oracle_address, "get_price", "set_observed_price"
         )
 
+    def fetch_prices_view(self):
+        """reads the target and the observed price with the "get_price" views of the oracles, used instead of fetch_target_price,
+        fetch_observed_price and the internal call when use_price_views is set.
+
+        Post: storage.target_price = target_price_oracle.get_price()
+        Post: storage.observed_price = observed_price_oracle.get_price()
+        """
+        self.data.target_price = sp.view(
+            "get_price", self.data.target_price_oracle_address, sp.unit, t=sp.TNat
+        ).open_some(Errors.INVALID_VIEW)
+        self.data.observed_price = sp.view(
+            "get_price", self.data.observed_price_oracle_address, sp.unit, t=sp.TNat
+        ).open_some(Errors.INVALID_VIEW)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_target_price(self, target_price):
         """entrypoint used by the oracle to set the price
@@ -107,16 +155,21 @@ class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def interest_rate_update(self):
-        """this entrypoint allows anyone to request for a referecne_interest update. Can only be once every week. The actual logic can be found in "internal_interest_rate_update".
+        """this entrypoint allows anyone to request for a referecne_interest update. Can only be once every week. The actual logic can be found in "execute_interest_rate_update".
         Post: fetch_target_price()
         Post: fetch_observed_price
         Post: calls self.internal_interest_rate_update
+        Post (use_price_views): fetch_prices_view() and execute_interest_rate_update() in the same execution
         """
-        self.fetch_target_price(sp.unit)
-        self.fetch_observed_price(sp.unit)
-        sp.transfer(
-            sp.unit, sp.mutez(0), sp.self_entry_point("internal_interest_rate_update")
-        )
+        if self.use_price_views:
+            self.fetch_prices_view()
+            self.execute_interest_rate_update()
+        else:
+            self.fetch_target_price(sp.unit)
+            self.fetch_observed_price(sp.unit)
+            sp.transfer(
+                sp.unit, sp.mutez(0), sp.self_entry_point("internal_interest_rate_update")
+            )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def add_engine(self, engine_address):
@@ -158,7 +211,98 @@ class InterestRateUpdater(sp.Contract, InternalMixin, SingleAdministrableMixin):
         self.verify_is_admin(sp.unit)
         self.data.observed_price_oracle_address = new_observed_price_oracle
 
+    def distribute_reference_interest_rate(self):
+        """Appends the rate to the rate history read by the get_reference_interest_rates view if the engines pull the rate,
+        calls set_reference_interest_rate on every engine otherwise.
+
+        Post: storage.reference_interest_rates[storage.reference_interest_rate_count] = (storage.reference_interest_rate, storage.last_update_timestamp) (pull only)
+        Post: storage.reference_interest_rate_count += 1 (pull only)
+        """
+        if self.pull_reference_interest_rate:
+            self.data.reference_interest_rates[
+                self.data.reference_interest_rate_count
+            ] = sp.record(
+                reference_interest_rate=self.data.reference_interest_rate,
+                effective_timestamp=self.data.last_update_timestamp,
+            )
+            self.data.reference_interest_rate_count += 1
+        else:
+            with sp.for_("engine_addresses", self.data.engine_addresses) as engine_address:
+                engine_set_reference_interest_rate = sp.contract(
+                    sp.TNat, engine_address, entry_point="set_reference_interest_rate"
+                ).open_some()
+                sp.transfer(
+                    self.data.reference_interest_rate,
+                    sp.mutez(0),
+                    engine_set_reference_interest_rate,
+                )
+
+    def execute_interest_rate_update(self):
+        """computes and distributes the new reference interest rate once both prices were received, implemented by the
+        exponential and the linear interest rate updater.
+        """
+        raise NotImplementedError("execute_interest_rate_update is implemented by the subclasses")
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def internal_interest_rate_update(self):
-        print("TODO implement")
-        pass
+        """internal entrypoint called after both prices were received, the actual logic is in "execute_interest_rate_update".
+        Pre: verify_internal()
+        Post: execute_interest_rate_update()
+        """
+        self.verify_internal(sp.unit)
+        self.execute_interest_rate_update()
+
+    @sp.onchain_view()
+    def get_reference_interest_rate(self):
+        """returns the current reference interest rate and the timestamp it is effective from, used by the engines
+        reading the rate lazily.
+
+        Returns:
+            ReferenceInterestRate: the reference interest rate and its effective timestamp
+        """
+        sp.result(
+            sp.set_type_expr(
+                sp.record(
+                    reference_interest_rate=self.data.reference_interest_rate,
+                    effective_timestamp=self.data.last_update_timestamp,
+                ),
+                ReferenceInterestRate.get_type(),
+            )
+        )
+
+    @sp.onchain_view()
+    def get_reference_interest_rates(self, since):
+        """returns the reference interest rates effective from the given timestamp on, oldest first. The first entry is the rate
+        that was effective at the given timestamp, each following one is effective from its timestamp until the next one. Used by
+        the engines reading the rate lazily to accrue every period at its own rate, the history is walked back from the latest
+        rate, i.e. the cost grows with the number of updates since the given timestamp only.
+
+        Args:
+            since (sp.TTimestamp): the timestamp the caller accrued until
+
+        Returns:
+            sp.TList(ReferenceInterestRate): the rates effective at and after the given timestamp
+        """
+        sp.set_type(since, sp.TTimestamp)
+
+        index = sp.local("index", sp.as_nat(self.data.reference_interest_rate_count - 1))
+        reference_interest_rates = sp.local(
+            "reference_interest_rates",
+            sp.list([], t=ReferenceInterestRate.get_type()),
+        )
+        with sp.while_(
+            (index.value > 0)
+            & (
+                self.data.reference_interest_rates[index.value].effective_timestamp
+                > since
+            )
+        ):
+            reference_interest_rates.value.push(
+                self.data.reference_interest_rates[index.value]
+            )
+            index.value = sp.as_nat(index.value - 1)
+        reference_interest_rates.value.push(
+            self.data.reference_interest_rates[index.value]
+        )
+
+        sp.result(reference_interest_rates.value)
@@ -16,19 +16,16 @@ class InterestRateUpdaterLinear(InterestRateUpdater):
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an internal call (to process after we received said external data)
     """
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_interest_rate_update(self):
+    def execute_interest_rate_update(self):
         """updates the reference interest rate if it was not updated yet in this cycle. The minimum and maximum weekly interest rates set the upper and lower boundary of the interest rate.
         Inv: storage.reference_interest_rate >= Constants.SECONDS_INTEREST_MINIMUM
         Inv: storage.reference_interest_rate <= Constants.SECONDS_INTEREST_MAXIMUM
         Pre: sp.now/7days > storage.last_update_timestamp/7days
-        Pre: verify_internal()
         Post: update_accrual()
         Post: storage.last_update_timestamp = sp.now
         Post: storage.reference_interest_rate is set according to documentation based on observed/target price difference.
+        Post: distribute_reference_interest_rate()
         """
-        self.verify_internal(sp.unit)
-
         last_cycle = (
             sp.as_nat(self.data.last_update_timestamp - sp.timestamp(0))
             // Constants.REFERENCE_INTEREST_UPDATE_LINEAR_INTERVAL
@@ -69,12 +66,4 @@ class InterestRateUpdaterLinear(InterestRateUpdater):
         )
         self.data.last_update_timestamp = sp.now
 
-        with sp.for_("engine_addresses", self.data.engine_addresses) as engine_address:
-            engine_set_reference_interest_rate = sp.contract(
-                sp.TNat, engine_address, entry_point="set_reference_interest_rate"
-            ).open_some()
-            sp.transfer(
-                self.data.reference_interest_rate,
-                sp.mutez(0),
-                engine_set_reference_interest_rate,
-            )
+        self.distribute_reference_interest_rate()
@@ -1,6 +1,7 @@
 import smartpy as sp
 
 import utils.constants as Constants
+import utils.error_codes as Errors
 import utils.fa2 as fa2
 
 from utils.contract_utils import Utils
@@ -31,6 +32,9 @@ class LiquidityFarm(sp.Contract, fa2.AdministrableMixin):
 
         storage["stake_manager_address"] = self.stake_manager_address
 
+        storage["synced_stakes"] = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat)
+        storage["stake_sync_threshold"] = sp.nat(0)
+
         storage["administrators"] = sp.set_type_expr(
             self.administrators, sp.TMap(fa2.LedgerKey.get_type(), sp.TUnit)
         )
@@ -38,14 +42,29 @@ class LiquidityFarm(sp.Contract, fa2.AdministrableMixin):
         return storage
 
     def __init__(
-        self, stake_token_address, stake_token_id, stake_manager_address, administrators
+        self,
+        stake_token_address,
+        stake_token_id,
+        stake_manager_address,
+        administrators,
+        deferred_stake_updates=False,
     ):
-        """ """
+        """init to set the stake token, the stake manager and administrators.
+
+        Args:
+            stake_token_address (sp.address): the FA2 contract of the stake token
+            stake_token_id (sp.nat): the token id of the stake token
+            stake_manager_address (sp.address): the stake manager receiving the weights
+            administrators (dict): the administrators of the farm
+            deferred_stake_updates (bool, optional): if set, the weight is only pushed to the stake manager once it moved by more than
+                stake_sync_threshold since the last push (or on sync_stake). Defaults to False.
+        """
 
         self.stake_token_address = stake_token_address
         self.stake_token_id = stake_token_id
         self.stake_manager_address = stake_manager_address
         self.administrators = administrators
+        self.deferred_stake_updates = deferred_stake_updates
 
         self.init(**self.get_init_storage())
 
@@ -66,6 +85,99 @@ class LiquidityFarm(sp.Contract, fa2.AdministrableMixin):
         ).open_some()
         sp.transfer(stake, sp.mutez(0), stake_manager_contract)
 
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def sub_sync_stake(self, stake):
+        """sub entrypoint which decides whether the weight has to be pushed to the stake manager in the deferred mode. This is the case if
+        the weight moved by more than stake_sync_threshold (relative to the last pushed weight) or dropped to 0.
+
+        Post: storage.synced_stakes[stake.address] = stake.amount (if pushed)
+
+        Args:
+            stake (Stake): Address and weight
+
+        Returns:
+            sp.TBool: whether the weight has to be pushed
+        """
+        sp.set_type(stake, Stake.get_type())
+        synced_stake = sp.local(
+            "synced_stake", self.data.synced_stakes.get(stake.address, sp.nat(0))
+        )
+        sync_required = sp.local(
+            "sync_required",
+            (stake.amount == 0)
+            | (
+                abs(stake.amount - synced_stake.value) * Constants.PRECISION_FACTOR
+                > self.data.stake_sync_threshold * synced_stake.value
+            ),
+        )
+
+        with sp.if_(sync_required.value):
+            with sp.if_(stake.amount == 0):
+                del self.data.synced_stakes[stake.address]
+            with sp.else_():
+                self.data.synced_stakes[stake.address] = stake.amount
+
+        sp.result(sync_required.value)
+
+    def get_weight(self, address):
+        """Returns the weight of an address in the governance token distribution.
+
+        Args:
+            address (sp.TAddress): the address
+
+        Returns:
+            Stake: Address and weight
+        """
+        return Stake.make(
+            address,
+            self.data.stakes.get(address, sp.nat(0))
+            * self.data.incentive_factor
+            / Constants.PRECISION_FACTOR,
+        )
+
+    def push_weight(self, address):
+        """Pushes the weight of an address to the stake manager, in the deferred mode only if sub_sync_stake requires it.
+
+        Args:
+            address (sp.TAddress): the address
+        """
+        weight = sp.local("weight", self.get_weight(address))
+        if self.deferred_stake_updates:
+            with sp.if_(self.sub_sync_stake(weight.value)):
+                self.update_stake(weight.value)
+        else:
+            self.update_stake(weight.value)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_stake_sync_threshold(self, stake_sync_threshold):
+        """entrypoint to set the relative change of the weight (precision factor based) after which the weight is pushed to the stake manager
+        in the deferred mode. Only admin can call this
+
+        Args:
+            stake_sync_threshold (sp.nat): the new threshold
+        """
+        sp.set_type(stake_sync_threshold, sp.TNat)
+
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        self.data.stake_sync_threshold = stake_sync_threshold
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def sync_stake(self, address):
+        """external entrypoint to push the current weight of an address to the stake manager, i.e. after small deposits in the deferred mode
+        or after a change of the incentive factor. Anyone can call this.
+
+        Args:
+            address (sp.address): the address to sync
+        """
+        sp.set_type(address, sp.TAddress)
+
+        weight = sp.local("weight", self.get_weight(address))
+        with sp.if_(weight.value.amount == 0):
+            del self.data.synced_stakes[address]
+        with sp.else_():
+            self.data.synced_stakes[address] = weight.value.amount
+        self.update_stake(weight.value)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_incentive_factor(self, incentive_factor):
         """entrypoint to set the incentive factor used for the weight calculation. Only admin can call this
@@ -99,14 +211,7 @@ class LiquidityFarm(sp.Contract, fa2.AdministrableMixin):
         with sp.else_():
             self.data.stakes[sp.sender] = token_amount
 
-        self.update_stake(
-            Stake.make(
-                sp.sender,
-                self.data.stakes[sp.sender]
-                * self.data.incentive_factor
-                / Constants.PRECISION_FACTOR,
-            )
-        )
+        self.push_weight(sp.sender)
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self):
@@ -121,4 +226,35 @@ class LiquidityFarm(sp.Contract, fa2.AdministrableMixin):
 
         del self.data.stakes[sp.sender]
 
-        self.update_stake(Stake.make(sp.sender, 0))
+        self.push_weight(sp.sender)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def partial_withdraw(self, token_amount):
+        """external entrypoint for a user to withdraw a part of her/his stake.
+
+        token_amount (sp.nat): the amount of tokens
+        """
+        sp.set_type(token_amount, sp.TNat)
+
+        remaining_stake = sp.local(
+            "remaining_stake",
+            sp.as_nat(
+                self.data.stakes.get(sp.sender, sp.nat(0)) - token_amount,
+                message=Errors.INSUFFICIENT_TOKEN_AMOUNT,
+            ),
+        )
+
+        Utils.execute_fa2_token_transfer(
+            self.data.stake_token_address,
+            sp.self_address,
+            sp.sender,
+            self.data.stake_token_id,
+            token_amount,
+        )
+
+        with sp.if_(remaining_stake.value == 0):
+            del self.data.stakes[sp.sender]
+        with sp.else_():
+            self.data.stakes[sp.sender] = remaining_stake.value
+
+        self.push_weight(sp.sender)
@@ -4,18 +4,80 @@ import utils.constants as Constants
 import utils.error_codes as Errors
 import utils.fa2 as fa2
 
+from utils.balance_view_mixin import BalanceViewMixin
 from utils.contract_utils import Utils
 from utils.internal_mixin import InternalMixin
 from utils.administrable_mixin import SingleAdministrableMixin
 
 
-class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
+class ClaimEvent:
+    """Payload of the "claim" event, emitted whenever the rewards of a stake are claimed"""
+
+    def get_type():
+        """Returns the claim event type, layouted
+
+        Returns:
+            sp.TRecord: layouted type of a claim event
+        """
+        return sp.TRecord(
+            owner=sp.TAddress,
+            stake=sp.TNat,
+            stake_age=sp.TNat,
+            reward_token_amount=sp.TNat,
+            released_token_amount=sp.TNat,
+            dist_factor=sp.TNat,
+        ).layout(
+            (
+                "owner",
+                (
+                    "stake",
+                    (
+                        "stake_age",
+                        ("reward_token_amount", ("released_token_amount", "dist_factor")),
+                    ),
+                ),
+            )
+        )
+
+    def make(
+        owner, stake, stake_age, reward_token_amount, released_token_amount, dist_factor
+    ):
+        """Creates a typed claim event
+
+        Args:
+            owner (sp.address): owner of the stake
+            stake (sp.nat): stake of the owner
+            stake_age (sp.nat): age of the stake used for the release, at most max_release_period
+            reward_token_amount (sp.nat): rewards of the stake since the last claim
+            released_token_amount (sp.nat): part of the rewards sent to the owner, the rest is redistributed to the pool
+            dist_factor (sp.nat): distribution factor of the pool at the claim
+
+        Returns:
+            sp.record: typed claim event
+        """
+        return sp.set_type_expr(
+            sp.record(
+                owner=owner,
+                stake=stake,
+                stake_age=stake_age,
+                reward_token_amount=reward_token_amount,
+                released_token_amount=released_token_amount,
+                dist_factor=dist_factor,
+            ),
+            ClaimEvent.get_type(),
+        )
+
+
+class LongStakingPool(
+    sp.Contract, InternalMixin, BalanceViewMixin, SingleAdministrableMixin
+):
     """The long staking pool contract follows the same distribution logic as the staking pool. The big difference lies in the release of said rewards. During
     max_release_period the rewards are being distributed linearly. The intuition is that long-term staking is rewarded more that short-term.
 
     Args:
         (sp.Contract): this is a smartpy contract
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an internal call (to process after we received said external data)
+        (BalanceViewMixin): mixin used to read the own balance through the view of the token contract and execute in the same call
     """
 
     def get_init_storage(self):
@@ -63,6 +125,7 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         reward_token_id,
         max_release_period=180 * 24 * 60 * 60,
         administrators=sp.big_map({}),
+        use_balance_view=False,
     ):
         """takes as arguments the engine address (used to call the update function) as well as the staking and reward token.
 
@@ -73,7 +136,10 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             reward_token_address (sp.address): the token to be rewarded
             reward_token_id (sp.nat): the token to be rewarded
             max_release_period (sp.nat): the time on which the rewards are linearly unlocked
+            use_balance_view (bool): if True the own reward balance is read through the "get_balance" view of the reward token and the actions
+                are executed in the same call, tokens without the view fall back to the balance_of callback. Defaults to False.
         """
+        self.use_balance_view = use_balance_view
         self.reward_token_address = reward_token_address
         self.reward_token_id = reward_token_id
         self.stake_token_type = stake_token_type
@@ -122,16 +188,19 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
     def sub_claim(self, unit):
         """sub entrypoint which claims the rewards for the sender stored in "sender". This means this can only be called by "internal_" entrypoints where
         the sender is set correctly. This sub-claim also contains the logic of linear release. Based on the stake age a fraction of the reward is
-        released to the sender, the rest is redistributed among the other pool participants.
+        released to the sender, the rest is redistributed among the other pool participants. The claim is emitted as "claim" event (ClaimEvent).
 
         Args:
             unit (sp.unit): nothing
         """
         with sp.if_(self.data.stakes.contains(self.data.sender)):
             stake = sp.local("stake", self.data.stakes[self.data.sender])
-            stake_age = sp.min(
-                sp.as_nat(sp.now - stake.value.age_timestamp),
-                self.data.max_release_period,
+            stake_age = sp.local(
+                "stake_age",
+                sp.min(
+                    sp.as_nat(sp.now - stake.value.age_timestamp),
+                    self.data.max_release_period,
+                ),
             )
 
             reward_token_amount = sp.local(
@@ -142,16 +211,22 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             )
             timed_reward_token_amount = sp.local(
                 "timed_reward_token_amount",
-                reward_token_amount.value * stake_age // self.data.max_release_period,
+                reward_token_amount.value
+                * stake_age.value
+                // self.data.max_release_period,
             )
 
-            Utils.execute_fa2_token_transfer(
-                self.data.reward_token_address,
-                sp.self_address,
-                sp.self_address,
-                self.data.reward_token_id,
-                sp.as_nat(reward_token_amount.value - timed_reward_token_amount.value),
-            )  # this self-transfer is just for indexing purposes and not required for functionality. It can be removed if gas matters.
+            sp.emit(
+                ClaimEvent.make(
+                    self.data.sender,
+                    stake.value.stake,
+                    stake_age.value,
+                    reward_token_amount.value,
+                    timed_reward_token_amount.value,
+                    self.data.dist_factor,
+                ),
+                tag="claim",
+            )
             Utils.execute_fa2_token_transfer(
                 self.data.reward_token_address,
                 sp.self_address,
@@ -193,33 +268,59 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         self.verify_is_admin()
         self.data.max_release_period = new_max_release_period
 
+    def fetch_balance_and_execute(self, internal_entry_point, parameter, execute):
+        """triggers the own reward balance fetch and calls the internal entrypoint with the parameter. If use_balance_view is set, the balance is
+        read through the view of the reward token and the action is executed in the same call instead (callback path if the token has no view).
+
+        Post: fetch_reward_balance() and call self.internal_entry_point(parameter)
+        Post (use_balance_view): execute_with_own_balance()
+
+        Args:
+            internal_entry_point (str): the internal entrypoint used by the callback path
+            parameter (sp.TNat or sp.TUnit): the parameter of the internal entrypoint
+            execute (function): generates the logic of the internal entrypoint
+        """
+
+        def call_internal():
+            self.fetch_reward_balance(sp.unit)
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_balance_view:
+            self.execute_with_own_balance(
+                self.data.reward_token_address,
+                self.data.reward_token_id,
+                "current_reward_balance",
+                execute,
+                call_internal,
+            )
+        else:
+            call_internal()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def deposit(self, token_amount):
         """external entrypoint to deposit a certain amount of tokens (requires you to have called update_operators to allow this contract first).
-        The actual logic is in internal_deposit.
+        The actual logic is in execute_deposit.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_deposit
+        Post: fetch_balance_and_execute()
 
         Args:
             token_amount (sp.nat): the amount of tokens
         """
         sp.set_type(token_amount, sp.TNat)
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(token_amount, sp.mutez(0), sp.self_entry_point("internal_deposit"))
+        self.fetch_balance_and_execute(
+            "internal_deposit", token_amount, lambda: self.execute_deposit(token_amount)
+        )
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_deposit(self, token_amount):
-        """internal entrypoint to deposit a certain token amount to the contract and calculate the stake and distribution factor. This method also allows
+    def execute_deposit(self, token_amount):
+        """deposits a certain token amount to the contract and calculates the stake and distribution factor. This method also allows
         for increasing an existing deposit. Since an increase in deposit affects also the age, what happens is that based on the age and weight of the existing stake the
         new age is calculated, such that there is no difference if you would have 2 seperate stakes on this aggregated one.
 
         Args:
             token_amount (sp.nat): the amount of tokens
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
 
         if self.stake_token_type == Constants.TOKEN_TYPE_FA2:
@@ -279,54 +380,69 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             )
         self.data.total_stake += token_amount
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_deposit(self, token_amount):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_deposit.
+
+        Pre: verify_internal()
+        Post: execute_deposit(token_amount)
+
+        Args:
+            token_amount (sp.nat): the amount of tokens
+        """
+        self.verify_internal(sp.unit)
+        self.execute_deposit(token_amount)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def claim(self):
-        """external entrypoint for a user to claim her/his rewards. The actual logic is in internal_claim.
+        """external entrypoint for a user to claim her/his rewards. The actual logic is in execute_claim.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_claim
+        Post: fetch_balance_and_execute()
         """
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_claim"))
+        self.fetch_balance_and_execute("internal_claim", sp.unit, self.execute_claim)
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_claim(self):
-        """internal entrypoint to claim a senders rewards.
+    def execute_claim(self):
+        """claims a senders rewards.
 
-        Pre: verify_internal()
         Post: sub_distribute()
         Post: sub_claim()
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.unit)
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_claim(self):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_claim.
+
+        Pre: verify_internal()
+        Post: execute_claim()
+        """
+        self.verify_internal(sp.unit)
+        self.execute_claim()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self):
-        """external entrypoint for a user to claim her/his rewards and withdraw her/his stake. The actual logic is in internal_withdraw.
+        """external entrypoint for a user to claim her/his rewards and withdraw her/his stake. The actual logic is in execute_withdraw.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_withdraw
+        Post: fetch_balance_and_execute()
         """
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_withdraw"))
+        self.fetch_balance_and_execute(
+            "internal_withdraw", sp.unit, self.execute_withdraw
+        )
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_withdraw(self):
-        """internal entrypoint to claim a senders rewards and withdraw the stake.
+    def execute_withdraw(self):
+        """claims a senders rewards and withdraws the stake.
 
-        Pre: verify_internal()
         Post: sub_distribute()
         Post: sub_claim()
         Post: transfer token_amount tokens fron sp.self_address to sp.sender
         Post: storage.total_stake -= storage.stakes[storage.sender]
         Post: del storage.stakes[storage.sender]
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.unit)
 
@@ -348,3 +464,13 @@ class LongStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             )
         self.data.total_stake = sp.as_nat(self.data.total_stake - stake.value.stake)
         del self.data.stakes[self.data.sender]
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_withdraw(self):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_withdraw.
+
+        Pre: verify_internal()
+        Post: execute_withdraw()
+        """
+        self.verify_internal(sp.unit)
+        self.execute_withdraw()
@@ -4,19 +4,21 @@ import utils.constants as Constants
 import utils.error_codes as Errors
 import utils.fa2 as fa2
 
+from utils.balance_view_mixin import BalanceViewMixin
 from utils.contract_utils import Utils
 from utils.internal_mixin import InternalMixin
 
 import contracts.tracker.vester as vester
 
 
-class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
+class SavingsPool(sp.Contract, InternalMixin, BalanceViewMixin, fa2.AdministrableMixin):
     """The savings pool allows a user to lock their tokens and then get a reward on the same token type like was locked. This means that there are compounding
     effects and we cannot "simply" use the method used in "StakingPool". 
 
     Args:
         (sp.Contract): this is a smartpy contract
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an internal call (to process after we received said external data)
+        (BalanceViewMixin): mixin used to read the own balance through the view of the token contract and execute in the same call
     """
 
     def get_init_storage(self):
@@ -50,16 +52,19 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
 
         return storage
 
-    def __init__(self, token_address, token_id, administrators):
+    def __init__(self, token_address, token_id, administrators, use_balance_view=False):
         """specifies the token used for staking and the administrators.
 
         Args:
             token_address (sp.address): token address
             token_id (sp.nat): token id
+            use_balance_view (bool): if True the own balance is read through the "get_balance" view of the token and deposit/withdraw are
+                executed in the same call, tokens without the view fall back to the balance_of callback. Defaults to False.
         """
         self.token_address = token_address
         self.token_id = token_id
         self.administrators = administrators
+        self.use_balance_view = use_balance_view
         self.init(**self.get_init_storage())
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
@@ -111,14 +116,41 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
             )
             self.data.current_balance = matched_balance_of_response.head.balance
 
+    def fetch_balance_and_execute(self, internal_entry_point, parameter, execute):
+        """triggers the own balance fetch and calls the internal entrypoint with the parameter. If use_balance_view is set, the balance is read
+        through the view of the token contract and the action is executed in the same call instead (callback path if the token has no view).
+
+        Post: fetch_reward_balance() and call self.internal_entry_point(parameter)
+        Post (use_balance_view): execute_with_own_balance()
+
+        Args:
+            internal_entry_point (str): the internal entrypoint used by the callback path
+            parameter (sp.TNat or sp.TUnit): the parameter of the internal entrypoint
+            execute (function): generates the logic of the internal entrypoint
+        """
+
+        def call_internal():
+            self.fetch_reward_balance(sp.unit)
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_balance_view:
+            self.execute_with_own_balance(
+                self.data.token_address,
+                self.data.token_id,
+                "current_balance",
+                execute,
+                call_internal,
+            )
+        else:
+            call_internal()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def deposit(self, token_amount):
         """external entrypoint to deposit a certain amount of tokens (requires you to have called update_operators to allow this contract first).
-        The actual logic is in internal_deposit.
+        The actual logic is in execute_deposit.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_deposit
+        Post: fetch_balance_and_execute()
 
         Args:
             token_amount (sp.nat): the amount of tokens
@@ -126,16 +158,15 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
 
         sp.set_type(token_amount, sp.TNat)
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(token_amount, sp.mutez(0), sp.self_entry_point("internal_deposit"))
+        self.fetch_balance_and_execute(
+            "internal_deposit", token_amount, lambda: self.execute_deposit(token_amount)
+        )
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_deposit(self, token_amount):
-        """internal entrypoint to deposit a certain token amount to the contract and calculate the stake and distribution factor.
+    def execute_deposit(self, token_amount):
+        """deposits a certain token amount to the contract and calculates the stake and distribution factor.
         The stakes are discounted to the t=0 point in time, such that we store for every participant the t=0 stake. Also if the
         participant is ellegible for a tez distribution this call will send the ellegible amount to the sender.
 
-        Pre: verify_internal()
         Post: sub_update_factor()
         Post: transfer token_amount tokens fron sp.sender to sp.self_address
         Post: storage.stakes[storage.sender] += token_amount*10**12/storage.disc_factor
@@ -146,8 +177,6 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
         Args:
             token_amount (sp.nat): the amount of tokens
         """
-        sp.set_type(token_amount, sp.TNat)
-        self.verify_internal(sp.unit)
         self.sub_update_factor(sp.unit)
 
         Utils.execute_fa2_token_transfer(
@@ -185,22 +214,34 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
         self.data.total_stake += discounted_amount.value
         self.data.last_balance += token_amount
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_deposit(self, token_amount):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_deposit.
+
+        Pre: verify_internal()
+        Post: execute_deposit(token_amount)
+
+        Args:
+            token_amount (sp.nat): the amount of tokens
+        """
+        sp.set_type(token_amount, sp.TNat)
+        self.verify_internal(sp.unit)
+        self.execute_deposit(token_amount)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self):
-        """withdraws the total stake and reward, if there was a tez payout that as well. The actual logic is in internal_withdraw.
+        """withdraws the total stake and reward, if there was a tez payout that as well. The actual logic is in execute_withdraw.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_withdraw
+        Post: fetch_balance_and_execute()
         """
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_withdraw"))
+        self.fetch_balance_and_execute(
+            "internal_withdraw", sp.unit, self.execute_withdraw
+        )
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_withdraw(self):
-        """internal entrypoint to withdraw the own stake and any distributed tez reward the user is ellegible to receive.
-        Pre: verify_internal()
+    def execute_withdraw(self):
+        """withdraws the own stake and any distributed tez reward the user is ellegible to receive.
         Pre: storage.stake.contains(storage.sender)
         Post: sub_update_factor()
         Post: transfer token_amount tokens fron sp.self_address to sp.sender
@@ -210,7 +251,6 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
         Post: del storage.stakes[storage.sender]
         Post: del storage.dist_factors[storage.sender]
         """
-        self.verify_internal(sp.unit)
         sp.verify(
             self.data.vesting_contract != Constants.DEFAULT_ADDRESS,
             message=Errors.NO_VESTER_SET,
@@ -261,6 +301,16 @@ class SavingsPool(sp.Contract, InternalMixin, fa2.AdministrableMixin):
         del self.data.stakes[self.data.sender]
         del self.data.dist_factors[self.data.sender]
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_withdraw(self):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_withdraw.
+
+        Pre: verify_internal()
+        Post: execute_withdraw()
+        """
+        self.verify_internal(sp.unit)
+        self.execute_withdraw()
+
     @sp.entry_point
     def default(self):
         """entrypoint used to accept tez payments. Will distribute these evenly among the pool using the dist_factor methodology.
@@ -1,6 +1,7 @@
 import smartpy as sp
 
 import utils.constants as Constants
+import utils.error_codes as Errors
 from utils.fa2 import LedgerKey, AdministrableMixin
 
 from contracts.tracker.governance_token import Stake
@@ -22,6 +23,23 @@ class ImportStake:
         )
 
 
+class ImportSession:
+    """This type is used to keep track of a resumable import of stakes"""
+
+    def get_type():
+        """Returns the import session type, layouted
+
+        Returns:
+            sp.TRecord: layouted type of an import session
+        """
+        return sp.TRecord(
+            session_id=sp.TNat,
+            expected_count=sp.TNat,
+            imported_count=sp.TNat,
+            checksum=sp.TBytes,
+        ).layout(("session_id", ("expected_count", ("imported_count", "checksum"))))
+
+
 class StakeManager(sp.Contract, AdministrableMixin):
     """The Stakemanager lives between engine (or other contracts that have the power to set stake) and the governance token
     This allows the stake manager to address shortcomings of the governance token, like i.e. having multiple engines setting
@@ -51,6 +69,13 @@ class StakeManager(sp.Contract, AdministrableMixin):
 
         storage["stake_factors"] = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat)
         storage["fixed_stakes"] = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat)
+        storage["fixed_stake_addresses"] = sp.set(t=sp.TAddress)
+        storage["fixed_stake_refresh_threshold"] = sp.nat(0)
+        storage["fixed_stake_reference"] = sp.nat(0)
+
+        storage["import_session"] = sp.set_type_expr(
+            sp.none, sp.TOption(ImportSession.get_type())
+        )
 
         storage["administrators"] = sp.set_type_expr(
             self.administrators, sp.TBigMap(LedgerKey.get_type(), sp.TUnit)
@@ -58,14 +83,22 @@ class StakeManager(sp.Contract, AdministrableMixin):
 
         return storage
 
-    def __init__(self, governance_token_contract, administrators={}):
+    def __init__(
+        self,
+        governance_token_contract,
+        administrators={},
+        auto_refresh_fixed_stakes=False,
+    ):
         """init to set the token and administrators.
         Args:
             governance_token_contract (sp.address): the actual governance token address
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            auto_refresh_fixed_stakes (bool, optional): if set, update_stake and update_stakes refresh all fixed stakes once total_stake
+                moved by more than fixed_stake_refresh_threshold since the last refresh. Defaults to False.
         """
         self.governance_token_contract = governance_token_contract
         self.administrators = administrators
+        self.auto_refresh_fixed_stakes = auto_refresh_fixed_stakes
         self.init(**self.get_init_storage())
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
@@ -85,13 +118,83 @@ class StakeManager(sp.Contract, AdministrableMixin):
         ).open_some()
         sp.transfer(stake, sp.mutez(0), governance_token_contract)
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def update_stake(self, stake):
-        """this entrypoint is called by an admin (i.e. engine) and sets the stake. If the local stake of that source is already available
-        it will overwrite the stake amount, if it's not available yet it will add to the existing stake_amount for that user.  Only admin can call this.
+    @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
+    def update_governance_stakes(self, stakes):
+        """sub entrypoint to call "update_stakes" on the governance token contract
+
+        Post: governance_token.update_stakes(stakes)
+
+        Args:
+            stakes (sp.TList(Stake)): Addresses and amounts
+        """
+        sp.set_type(stakes, sp.TList(Stake.get_type()))
+        governance_token_contract = sp.contract(
+            sp.TList(Stake.get_type()),
+            self.data.governance_token_contract,
+            entry_point="update_stakes",
+        ).open_some()
+        sp.transfer(stakes, sp.mutez(0), governance_token_contract)
+
+    def get_fixed_stake(self, address):
+        """Returns the stake of a fixed stake address, its ratio applied to the current total stake.
+
+        Args:
+            address (sp.TAddress): the fixed stake address
+
+        Returns:
+            Stake: Address and amount to set on the governance token
+        """
+        return Stake.make(
+            address,
+            self.data.total_stake
+            * self.data.fixed_stakes[address]
+            // Constants.PRECISION_FACTOR,
+        )
+
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def refresh_fixed_stakes(self, unit):
+        """sub entrypoint which returns the stakes of all fixed stake addresses if total_stake moved by more than the
+        fixed_stake_refresh_threshold (relative to the total_stake of the last refresh), otherwise an empty list.
+        A threshold of 0 disables the refresh.
+
+        Post: storage.fixed_stake_reference = storage.total_stake (if refreshed)
+
+        Returns:
+            sp.TList(Stake): Addresses and amounts to set on the governance token
+        """
+        sp.set_type(unit, sp.TUnit)
+        fixed_stakes = sp.local("fixed_stakes", sp.list([], t=Stake.get_type()))
+        stake_delta = sp.local(
+            "stake_delta",
+            abs(self.data.total_stake - self.data.fixed_stake_reference),
+        )
+
+        with sp.if_(
+            (self.data.fixed_stake_refresh_threshold != 0)
+            & (
+                stake_delta.value * Constants.PRECISION_FACTOR
+                > self.data.fixed_stake_refresh_threshold
+                * self.data.fixed_stake_reference
+            )
+        ):
+            with sp.for_("address", self.data.fixed_stake_addresses.elements()) as address:
+                fixed_stakes.value.push(self.get_fixed_stake(address))
+            self.data.fixed_stake_reference = self.data.total_stake
+
+        sp.result(fixed_stakes.value)
+
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def sub_update_stake(self, stake):
+        """sub entrypoint which sets the local stake of the sender and returns the resulting global stake. If the local stake of that source is already
+        available it will overwrite the stake amount, if it's not available yet it will add to the existing stake_amount for that user.
+
+        Args:
+            stake (Stake): Address and amount
+
+        Returns:
+            Stake: Address and global amount to set on the governance token
         """
         sp.set_type(stake, Stake.get_type())
-        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
 
         local_stake_key = sp.local("stake_key", sp.pair(sp.sender, stake.address))
         local_stake = sp.local("local_stake", self.data.local_stakes.get(local_stake_key.value, sp.nat(0)))
@@ -125,29 +228,79 @@ class StakeManager(sp.Contract, AdministrableMixin):
         with sp.else_():
             del self.data.local_stakes[local_stake_key.value]
 
-        self.update_governance_stake(Stake.make(stake.address, global_stake.value))
+        sp.result(Stake.make(stake.address, global_stake.value))
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def update_stake(self, stake):
+        """this entrypoint is called by an admin (i.e. engine) and sets the stake. If the local stake of that source is already available
+        it will overwrite the stake amount, if it's not available yet it will add to the existing stake_amount for that user.  Only admin can call this.
+        """
+        sp.set_type(stake, Stake.get_type())
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+
+        global_stake = sp.local("global_stake", self.sub_update_stake(stake))
+        if self.auto_refresh_fixed_stakes:
+            fixed_stakes = sp.local(
+                "fixed_stakes", self.refresh_fixed_stakes(sp.unit)
+            )
+            with sp.if_(sp.len(fixed_stakes.value) == 0):
+                self.update_governance_stake(global_stake.value)
+            with sp.else_():
+                fixed_stakes.value.push(global_stake.value)
+                self.update_governance_stakes(fixed_stakes.value)
+        else:
+            self.update_governance_stake(global_stake.value)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def update_stakes(self, stakes):
+        """this entrypoint is called by an admin (i.e. engine) and sets multiple stakes in order, the resulting global stakes are forwarded to the
+        governance token in a single "update_stakes" call. Only admin can call this.
+        """
+        sp.set_type(stakes, sp.TList(Stake.get_type()))
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+
+        global_stakes = sp.local("global_stakes", sp.list([], t=Stake.get_type()))
+        with sp.for_("stake", stakes) as stake:
+            global_stakes.value.push(self.sub_update_stake(stake))
+
+        if self.auto_refresh_fixed_stakes:
+            with sp.for_("fixed_stake", self.refresh_fixed_stakes(sp.unit)) as fixed_stake:
+                global_stakes.value.push(fixed_stake)
+
+        self.update_governance_stakes(global_stakes.value.rev())
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def update_fixed_stakes(self, addresses):
         """entrypoint used for "touching"/updating the fixed stakes. This is done here because we did not want to impact the gas cost of
-        the update_stake method by sending "update_governance_stake" twice per "update_stake". Anyone can call this.
+        the update_stake method by sending "update_governance_stake" twice per "update_stake". The stakes are forwarded to the governance
+        token in a single "update_stakes" call. Anyone can call this.
         """
         sp.set_type(addresses, sp.TList(sp.TAddress))
+        fixed_stakes = sp.local("fixed_stakes", sp.list([], t=Stake.get_type()))
         with sp.for_("address", addresses) as address:
-            self.update_governance_stake(
-                sp.record(
-                    address=address,
-                    amount=self.data.total_stake
-                    * self.data.fixed_stakes[address]
-                    // Constants.PRECISION_FACTOR,
-                )
-            )
+            fixed_stakes.value.push(self.get_fixed_stake(address))
+        self.update_governance_stakes(fixed_stakes.value.rev())
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_fixed_stake(self, address, ratio):
-        """entrypoint used for by an admin to set a fixed stake for a specific address. Only admin can call this."""
+        """entrypoint used for by an admin to set a fixed stake for a specific address. Addresses with a ratio of 0 are no longer refreshed
+        automatically, their governance stake has to be touched once with update_fixed_stakes. Only admin can call this."""
+        sp.set_type(address, sp.TAddress)
+        sp.set_type(ratio, sp.TNat)
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
         self.data.fixed_stakes[address] = ratio
+        with sp.if_(ratio != 0):
+            self.data.fixed_stake_addresses.add(address)
+        with sp.else_():
+            self.data.fixed_stake_addresses.remove(address)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_fixed_stake_refresh_threshold(self, threshold):
+        """entrypoint used for by an admin to set the relative change of total_stake (precision factor based) after which update_stake
+        refreshes all fixed stakes, 0 disables the refresh. Only has an effect with auto_refresh_fixed_stakes. Only admin can call this."""
+        sp.set_type(threshold, sp.TNat)
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        self.data.fixed_stake_refresh_threshold = threshold
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_stake_factor(self, address, factor):
@@ -161,8 +314,113 @@ class StakeManager(sp.Contract, AdministrableMixin):
         sp.set_type(stakes, ImportStake.get_type())
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
         with sp.for_("stake", stakes) as stake:
-            with sp.if_(~self.data.global_stakes.contains(stake.owner)):
-                local_stake_key = sp.pair(stake.updater, stake.owner)
-                self.data.local_stakes[local_stake_key] = stake.amount
-                self.data.global_stakes[stake.owner] = stake.amount
-                self.data.total_stake += stake.amount
+            self.import_stake(stake)
+
+    def import_stake(self, stake):
+        """Imports a single local stake, owners which already have a global stake are skipped.
+
+        Args:
+            stake (sp.TRecord): updater, owner and amount of the import stake
+        """
+        with sp.if_(~self.data.global_stakes.contains(stake.owner)):
+            local_stake_key = sp.pair(stake.updater, stake.owner)
+            self.data.local_stakes[local_stake_key] = stake.amount
+            self.data.global_stakes[stake.owner] = stake.amount
+            self.data.total_stake += stake.amount
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def start_import_session(self, session_id, expected_count):
+        """entrypoint used by an admin to open a resumable import of expected_count stakes. Only one session can be open at a time.
+        Only admin can call this.
+        """
+        sp.set_type(session_id, sp.TNat)
+        sp.set_type(expected_count, sp.TNat)
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        sp.verify(self.data.import_session.is_none(), message=Errors.ALREADY_PRESENT)
+        self.data.import_session = sp.some(
+            sp.record(
+                session_id=session_id,
+                expected_count=expected_count,
+                imported_count=sp.nat(0),
+                checksum=sp.bytes("0x"),
+            )
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def import_stakes_chunk(self, session_id, offset, stakes):
+        """entrypoint used by an admin to import the next chunk of an open import session. The offset has to match the number of stakes
+        imported so far, which makes re-sent or skipped chunks fail. The checksum is chained over every packed stake,
+        checksum = blake2b(checksum + pack(stake)). Only admin can call this.
+        """
+        sp.set_type(session_id, sp.TNat)
+        sp.set_type(offset, sp.TNat)
+        sp.set_type(stakes, ImportStake.get_type())
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+
+        import_session = sp.local(
+            "import_session",
+            self.data.import_session.open_some(Errors.INVALID_IMPORT_SESSION),
+        )
+        sp.verify(
+            import_session.value.session_id == session_id,
+            message=Errors.INVALID_IMPORT_SESSION,
+        )
+        sp.verify(
+            import_session.value.imported_count == offset,
+            message=Errors.INVALID_IMPORT_OFFSET,
+        )
+
+        with sp.for_("stake", stakes) as stake:
+            self.import_stake(stake)
+            import_session.value.checksum = sp.blake2b(
+                import_session.value.checksum + sp.pack(stake)
+            )
+            import_session.value.imported_count += 1
+
+        sp.verify(
+            import_session.value.imported_count <= import_session.value.expected_count,
+            message=Errors.INVALID_IMPORT_COUNT,
+        )
+        self.data.import_session = sp.some(import_session.value)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def close_import_session(self, session_id, checksum):
+        """entrypoint used by an admin to close an import session once all expected stakes were imported and the checksum matches the
+        one computed off-chain. Only admin can call this.
+        """
+        sp.set_type(session_id, sp.TNat)
+        sp.set_type(checksum, sp.TBytes)
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+
+        import_session = sp.local(
+            "import_session",
+            self.data.import_session.open_some(Errors.INVALID_IMPORT_SESSION),
+        )
+        sp.verify(
+            import_session.value.session_id == session_id,
+            message=Errors.INVALID_IMPORT_SESSION,
+        )
+        sp.verify(
+            import_session.value.imported_count == import_session.value.expected_count,
+            message=Errors.INVALID_IMPORT_COUNT,
+        )
+        sp.verify(
+            import_session.value.checksum == checksum,
+            message=Errors.INVALID_IMPORT_CHECKSUM,
+        )
+        self.data.import_session = sp.none
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def cancel_import_session(self):
+        """entrypoint used by an admin to drop an open import session, stakes imported so far are kept. Only admin can call this."""
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        self.data.import_session = sp.none
+
+    @sp.onchain_view()
+    def import_session(self):
+        """returns the open import session (if any), used to resume an interrupted import at imported_count.
+
+        Returns:
+            sp.TOption(ImportSession): the open import session
+        """
+        sp.result(self.data.import_session)
@@ -5,17 +5,64 @@ import utils.error_codes as Errors
 import utils.fa2 as fa2
 import utils.error_codes as Errors
 
+from utils.balance_view_mixin import BalanceViewMixin
 from utils.contract_utils import Utils
 from utils.internal_mixin import InternalMixin
 
 
-class StakingPool(sp.Contract, InternalMixin):
+class ClaimEvent:
+    """Payload of the "claim" event, emitted whenever the rewards of a stake are claimed"""
+
+    def get_type():
+        """Returns the claim event type, layouted
+
+        Returns:
+            sp.TRecord: layouted type of a claim event
+        """
+        return sp.TRecord(
+            owner=sp.TAddress,
+            stake=sp.TNat,
+            reward_token_amount=sp.TNat,
+            dist_factor=sp.TNat,
+        ).layout(("owner", ("stake", ("reward_token_amount", "dist_factor"))))
+
+    def make(owner, stake, reward_token_amount, dist_factor):
+        """Creates a typed claim event
+
+        Args:
+            owner (sp.address): owner of the stake
+            stake (sp.nat): stake of the owner
+            reward_token_amount (sp.nat): rewards sent to the owner
+            dist_factor (sp.nat): distribution factor of the pool at the claim
+
+        Returns:
+            sp.record: typed claim event
+        """
+        return sp.set_type_expr(
+            sp.record(
+                owner=owner,
+                stake=stake,
+                reward_token_amount=reward_token_amount,
+                dist_factor=dist_factor,
+            ),
+            ClaimEvent.get_type(),
+        )
+
+
+class StakingPool(sp.Contract, InternalMixin, BalanceViewMixin):
     """The staking pool contract allows users to stake a token and then receive rewards in another token. This means that the stake remains always the same regardless of the
     rewards. It's using the same distribution method with "distribution_factors" like the governance token contract and the savings pool contract for the tez distribution.
 
+    With use_balance_view the action is not executed in the external entrypoint as in the other pools: the engine update mints the rewards of the
+    pool only after the external call, a balance read there would miss them. The external entrypoint triggers the engine update and calls the
+    internal entrypoint, which reads the balance through the view of the reward token once. If the token has no view, the internal entrypoint
+    fetches the balance through the balance_of callback and calls itself again with reward_balance_fetched set, which executes without reading
+    the view.
+
     Args:
         (sp.Contract): this is a smartpy contract
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an internal call (to process after we received said external data)
+        (BalanceViewMixin): mixin used to read the own balance through the view of the token contract and execute in the same call
     """
 
     def get_init_storage(self):
@@ -43,6 +90,9 @@ class StakingPool(sp.Contract, InternalMixin):
         storage["last_reward_balance"] = sp.nat(0)
         storage["current_reward_balance"] = sp.nat(0)
 
+        if self.use_balance_view:
+            storage["reward_balance_fetched"] = sp.bool(False)
+
         return storage
 
     def __init__(
@@ -52,6 +102,7 @@ class StakingPool(sp.Contract, InternalMixin):
         stake_token_id,
         reward_token_address,
         reward_token_id,
+        use_balance_view=False,
     ):
         """takes as arguments the engine address (used to call the update function) as well as the staking and reward token.
 
@@ -61,7 +112,11 @@ class StakingPool(sp.Contract, InternalMixin):
             stake_token_id (sp.nat): the token to be staked
             reward_token_address (sp.address): the token to be rewarded
             reward_token_id (sp.nat): the token to be rewarded
+            use_balance_view (bool): if True the own reward balance is read through the "get_balance" view of the reward token instead of
+                the balance_of callback, tokens without the view fall back to the callback. The internal entrypoint is still called after
+                the engine update, such that the rewards minted by the update are accounted before the action. Defaults to False.
         """
+        self.use_balance_view = use_balance_view
         self.engine_address = engine_address
         self.reward_token_address = reward_token_address
         self.reward_token_id = reward_token_id
@@ -113,6 +168,7 @@ class StakingPool(sp.Contract, InternalMixin):
         the sender is set correctly.
 
         Pre: storage.stakes[storage.sender] > 0
+        Post: emit "claim" event (ClaimEvent)
         Post: transfer reward tokens from self_address to storage.sender
         Post: storage.last_reward_balance -= storage.stakes[storage.sender] * (storage.dist_factor-self.data.dist_factors[self.data.sender])/10**12
         Post: storage.dist_factors[storage.sender] = storage.current_reward_balance
@@ -129,6 +185,15 @@ class StakingPool(sp.Contract, InternalMixin):
                 )
                 / Constants.PRECISION_FACTOR,
             )
+            sp.emit(
+                ClaimEvent.make(
+                    self.data.sender,
+                    self.data.stakes[self.data.sender],
+                    reward_token_amount.value,
+                    self.data.dist_factor,
+                ),
+                tag="claim",
+            )
             Utils.execute_fa2_token_transfer(
                 self.data.reward_token_address,
                 sp.self_address,
@@ -158,28 +223,79 @@ class StakingPool(sp.Contract, InternalMixin):
             )
             self.data.current_reward_balance = matched_balance_of_response.head.balance
 
+    def fetch_balance_and_call_internal(self, internal_entry_point, parameter):
+        """triggers the engine update and the own reward balance fetch and calls the internal entrypoint. If use_balance_view is set, only the
+        engine update is triggered, the internal entrypoint reads the balance.
+
+        Post: fetch_reward_balance() and call self.internal_entry_point(parameter)
+        Post (use_balance_view): call update on engine and call self.internal_entry_point(parameter)
+
+        Args:
+            internal_entry_point (str): the internal entrypoint executing the action
+            parameter (sp.TNat or sp.TUnit): the parameter of the internal entrypoint
+        """
+        if self.use_balance_view:
+            Utils.execute_update(self.data.engine_address)
+        else:
+            self.fetch_reward_balance(sp.unit)
+        sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+    def execute_with_reward_balance(self, internal_entry_point, parameter, execute):
+        """executes the action of an internal entrypoint. If use_balance_view is set, the balance is read through the view of the reward token
+        first, if the token has no view the balance is fetched through the callback and the internal entrypoint is called again, which then
+        executes without reading the view.
+
+        Post: execute()
+        Post (use_balance_view): execute_with_own_balance() unless storage.reward_balance_fetched
+
+        Args:
+            internal_entry_point (str): the internal entrypoint executing the action
+            parameter (sp.TNat or sp.TUnit): the parameter of the internal entrypoint
+            execute (function): generates the action
+        """
+
+        def fetch_and_call_internal():
+            self.data.reward_balance_fetched = True
+            Utils.execute_get_own_balance(
+                self.data.reward_token_address,
+                self.data.reward_token_id,
+                "set_reward_balance",
+            )
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_balance_view:
+            with sp.if_(self.data.reward_balance_fetched):
+                self.data.reward_balance_fetched = False
+                execute()
+            with sp.else_():
+                self.execute_with_own_balance(
+                    self.data.reward_token_address,
+                    self.data.reward_token_id,
+                    "current_reward_balance",
+                    execute,
+                    fetch_and_call_internal,
+                )
+        else:
+            execute()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def deposit(self, token_amount):
         """external entrypoint to deposit a certain amount of tokens (requires you to have called update_operators to allow this contract first).
-        The actual logic is in internal_deposit.
+        The actual logic is in execute_deposit.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_deposit
+        Post: fetch_balance_and_call_internal()
 
         Args:
             token_amount (sp.nat): the amount of tokens
         """
         sp.set_type(token_amount, sp.TNat)
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(token_amount, sp.mutez(0), sp.self_entry_point("internal_deposit"))
+        self.fetch_balance_and_call_internal("internal_deposit", token_amount)
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_deposit(self, token_amount):
-        """internal entrypoint to deposit a certain token amount to the contract and calculate the stake and distribution factor.
+    def execute_deposit(self, token_amount):
+        """deposits a certain token amount to the contract and calculates the stake and distribution factor.
 
-        Pre: verify_internal()
         Post: sub_distribute()
         Post: sub_claim()
         Post: transfer token_amount tokens fron sp.sender to sp.self_address
@@ -190,7 +306,6 @@ class StakingPool(sp.Contract, InternalMixin):
         Args:
             token_amount (sp.nat): the amount of tokens
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.unit)
 
@@ -208,47 +323,63 @@ class StakingPool(sp.Contract, InternalMixin):
             self.data.stakes[self.data.sender] = token_amount
         self.data.total_stake += token_amount
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_deposit(self, token_amount):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_deposit.
+
+        Pre: verify_internal()
+        Post: execute_with_reward_balance(execute_deposit(token_amount))
+
+        Args:
+            token_amount (sp.nat): the amount of tokens
+        """
+        self.verify_internal(sp.unit)
+        self.execute_with_reward_balance(
+            "internal_deposit", token_amount, lambda: self.execute_deposit(token_amount)
+        )
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def claim(self):
-        """external entrypoint for a user to claim her/his rewards. The actual logic is in internal_deposit.
+        """external entrypoint for a user to claim her/his rewards. The actual logic is in execute_claim.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_claim
+        Post: fetch_balance_and_call_internal()
         """
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_claim"))
+        self.fetch_balance_and_call_internal("internal_claim", sp.unit)
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_claim(self):
-        """internal entrypoint to claim a senders rewards.
+    def execute_claim(self):
+        """claims a senders rewards.
 
-        Pre: verify_internal()
         Post: sub_distribute()
         Post: sub_claim()
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.unit)
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_claim(self):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_claim.
+
+        Pre: verify_internal()
+        Post: execute_with_reward_balance(execute_claim())
+        """
+        self.verify_internal(sp.unit)
+        self.execute_with_reward_balance("internal_claim", sp.unit, self.execute_claim)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self):
-        """external entrypoint for a user to claim her/his rewards and withdraw her/his stake. The actual logic is in internal_withdraw.
+        """external entrypoint for a user to claim her/his rewards and withdraw her/his stake. The actual logic is in execute_withdraw.
 
         Post: storage.sender = sp.sender
-        Post: fetch_reward_balance()
-        Post: calls self.internal_withdraw
+        Post: fetch_balance_and_call_internal()
         """
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(sp.unit, sp.mutez(0), sp.self_entry_point("internal_withdraw"))
+        self.fetch_balance_and_call_internal("internal_withdraw", sp.unit)
 
-    @sp.entry_point(check_no_incoming_transfer=True)
-    def internal_withdraw(self):
-        """internal entrypoint to claim a senders rewards and withdraw the stake.
+    def execute_withdraw(self):
+        """claims a senders rewards and withdraws the stake.
 
-        Pre: verify_internal()
         Post: sub_distribute()
         Post: sub_claim()
         Post: transfer token_amount tokens fron sp.self_address to sp.sender
@@ -256,7 +387,6 @@ class StakingPool(sp.Contract, InternalMixin):
         Post: del storage.stakes[storage.sender]
         Post: del storage.dist_factors[storage.sender]
         """
-        self.verify_internal(sp.unit)
         self.sub_distribute(sp.unit)
         self.sub_claim(sp.unit)
 
@@ -272,6 +402,18 @@ class StakingPool(sp.Contract, InternalMixin):
         del self.data.stakes[self.data.sender]
         del self.data.dist_factors[self.data.sender]
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def internal_withdraw(self):
+        """internal entrypoint called after the balance was received, the actual logic is in execute_withdraw.
+
+        Pre: verify_internal()
+        Post: execute_with_reward_balance(execute_withdraw())
+        """
+        self.verify_internal(sp.unit)
+        self.execute_with_reward_balance(
+            "internal_withdraw", sp.unit, self.execute_withdraw
+        )
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def default(self, unit):
         sp.set_type(unit, sp.TUnit)
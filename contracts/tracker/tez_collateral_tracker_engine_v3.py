@@ -4,8 +4,8 @@ import utils.error_codes as Errors
 import utils.constants as Constants
 from utils.contract_utils import Ratio, Utils
 from utils.fa2 import AdministrableMixin, LedgerKey
-from contracts.tracker.vault import Vault, TransferAmount
-from contracts.tracker.base_tracker_engine_v3 import BaseTrackerEngine, Settlement, Liquidation
+from contracts.tracker.vault import Vault, LeanVault, TransferAmount
+from contracts.tracker.base_tracker_engine_v3 import BaseTrackerEngine, EngineConfig, Settlement, Liquidation
 
 from contracts.tracker.governance_token import Stake
 
@@ -44,12 +44,18 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
         token_decimals=12,
         collateral_token_decimals=6,
         administrators={},
+        lean_vaults=False,
+        pull_reference_interest_rate=False,
     ):
         """init to set the token and administrators, in order to be fully operational set_contracts need to be called first.
         Args:
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            lean_vaults (bool, optional): originate LeanVaults and read their balance lazily instead of receiving
+                set_vault_balance callbacks. Defaults to False.
+            pull_reference_interest_rate (bool, optional): read the reference interest rates from the get_reference_interest_rates view
+                of the interest rate setter in update_accrual instead of receiving set_reference_interest_rate. Defaults to False.
         """
         self.token_contract = token_contract
         self.token_id = token_id
@@ -60,26 +66,24 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
         self.price_extra_precision_factor = price_extra_precision_factor
         self.collateral_token_decimals = collateral_token_decimals
         self.token_decimals = token_decimals
-        
+        self.lean_vaults = lean_vaults
+        self.pull_reference_interest_rate = pull_reference_interest_rate
+
 
         self.init_type(
             sp.TRecord(
                 accrual_update_timestamp = sp.TTimestamp,
                 administrators = sp.TBigMap(LedgerKey.get_type(), sp.TUnit),
-                collateral_token_contract = sp.TAddress,
-                collateral_token_id = sp.TNat,
+                config = EngineConfig.get_type(),
                 compound_interest_rate = sp.TNat,
-                governance_token_contract = sp.TAddress,
-                options_contract = sp.TAddress,
                 reference_interest_rate = sp.TNat,
                 spread_rate = sp.TNat,
-                reward_pool_contract = sp.TAddress,
-                savings_pool_contract = sp.TAddress,
-                target_price_oracle = sp.TAddress,
-                interest_rate_setter_contract = sp.TAddress,
-                token_contract = sp.TAddress,
-                token_id = sp.TNat,
                 total_supply = sp.TNat,
+                deferred_accrual = sp.TBool,
+                pending_asset_accrual = sp.TNat,
+                pending_spread_accrual = sp.TNat,
+                price_cache = sp.TOption(sp.TRecord(price=sp.TNat, level=sp.TNat)),
+                vault_import_locked = sp.TBool,
                 vault_contexts = sp.TBigMap(
                     sp.TAddress,
                     sp.TRecord(
@@ -90,17 +94,98 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
                     ).right_comb()
                 ),
                 vault_lookup = sp.TBigMap(sp.TAddress, sp.TAddress),
-                collateral_ratio = Ratio.get_type(),
-                settlement_ratio = Ratio.get_type(),
-                minting_fee_ratio = Ratio.get_type(),
-                introducer_ratio = Ratio.get_type(),
-                settlement_reward_fee_ratio = Ratio.get_type(),
-                settlement_payout_ratio = Ratio.get_type(),
-                liquidation_payout_ratio = Ratio.get_type(),
-            ).right_comb()
+            ).layout(
+                (
+                    (
+                        ("compound_interest_rate", "total_supply"),
+                        ("accrual_update_timestamp", "reference_interest_rate"),
+                    ),
+                    (
+                        ("vault_contexts", "spread_rate"),
+                        (
+                            (
+                                ("deferred_accrual", "price_cache"),
+                                ("pending_asset_accrual", "pending_spread_accrual"),
+                            ),
+                            (
+                                "administrators",
+                                ("vault_lookup", ("vault_import_locked", "config")),
+                            ),
+                        ),
+                    ),
+                )
+            )
         )
         self.init(**self.get_init_storage())
 
+    def get_vault_balance(self, vault_context):
+        """Returns the balance of a lean vault read through its get_balance view, full vaults keep the stored balance up to
+        date through set_vault_balance.
+
+        Args:
+            vault_context (sp.TRecord): the vault context
+
+        Returns:
+            sp.TNat: the collateral balance
+        """
+        if self.lean_vaults:
+            return sp.utils.mutez_to_nat(
+                sp.view(
+                    "get_balance",
+                    vault_context.address,
+                    sp.unit,
+                    t=sp.TMutez,
+                ).open_some(Errors.INVALID_VIEW)
+            )
+        return vault_context.balance
+
+    def sync_vault_balance(self, vault_owner):
+        """Reads the balance of a lean vault through its get_balance view and stores it in the vault context.
+        Full vaults keep the balance up to date through set_vault_balance, nothing is done for them.
+
+        Args:
+            vault_owner (sp.TAddress): the owner of the vault context about to be read
+        """
+        if self.lean_vaults:
+            self.data.vault_contexts[vault_owner].balance = self.get_vault_balance(
+                self.data.vault_contexts[vault_owner]
+            )
+
+    def originate_vault(self, baker, amount):
+        """Originates a vault administrated by the engine, a LeanVault with lean_vaults.
+
+        Args:
+            baker (sp.TOption(sp.TKeyHash)): delegate of the vault
+            amount (sp.TMutez): initial balance of the vault
+
+        Returns:
+            sp.TAddress: the address of the originated vault
+        """
+        if self.lean_vaults:
+            vault_contract = LeanVault(sp.self_address)
+        else:
+            vault_contract = Vault(sp.self_address)
+        return sp.create_contract(vault_contract, amount=amount, baker=baker)
+
+    def import_vault_context(self, owner, vault_import):
+        """Originates a vault funded with the imported balance (out of the amount sent to import_vault_contexts) without
+        delegate and stores the imported vault context with the new vault. The owner sets the delegate with set_vault_delegate.
+
+        Args:
+            owner (sp.TAddress): the owner of the imported vault context
+            vault_import (sp.TRecord): the imported vault context, see get_vault_import_type
+        """
+        vault_contract_address = self.originate_vault(
+            sp.none, sp.utils.nat_to_mutez(vault_import.balance)
+        )
+        self.data.vault_contexts[owner] = sp.record(
+            address=vault_contract_address,
+            minted=vault_import.minted,
+            balance=vault_import.balance,
+            introducer=vault_import.introducer,
+        )
+        self.data.vault_lookup[vault_contract_address] = owner
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_vault_balance(self, vault_balance):
         """entrypoint used by the vault to set its balance
@@ -134,7 +219,8 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
     
     @sp.entry_point
     def create_vault(self, baker, introducer):
-        """originates a new vault for the sender, sets the delegate and an introducer
+        """originates a new vault for the sender, sets the delegate and an introducer. With lean_vaults a LeanVault is
+        originated and tez sent to an existing vault are accounted directly on the vault context.
 
         Args:
             baker (sp.TOption(sp.TKeyHash)): delegate to set
@@ -144,9 +230,7 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
         sp.set_type(introducer, sp.TOption(sp.TAddress))
 
         with sp.if_(~self.data.vault_contexts.contains(sp.sender)):
-            vault_contract_address = sp.create_contract(
-                Vault(sp.self_address), amount=sp.amount, baker=baker
-            )
+            vault_contract_address = self.originate_vault(baker, sp.amount)
             vault_context = sp.record(
                 address=vault_contract_address,
                 minted=sp.nat(0),
@@ -156,6 +240,8 @@ class TezCollateralTrackerEngine(BaseTrackerEngine):
             self.data.vault_contexts[sp.sender] = vault_context
             self.data.vault_lookup[vault_contract_address] = sp.sender
         with sp.else_():
+            if self.lean_vaults:
+                self.data.vault_contexts[sp.sender].balance += sp.utils.mutez_to_nat(sp.amount)
             sp.send(self.data.vault_contexts[sp.sender].address, sp.amount)
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -95,6 +95,11 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
 
         storage["total_supply"] = sp.nat(0)
 
+        # none if disabled, else the target price and the level it was fetched at
+        storage["price_cache"] = sp.set_type_expr(
+            sp.none, sp.TOption(sp.TRecord(price=sp.TNat, level=sp.TNat))
+        )
+
         storage["target_price_oracle"] = Constants.DEFAULT_ADDRESS
         storage["reward_pool_contract"] = Constants.DEFAULT_ADDRESS
         storage["savings_pool_contract"] = Constants.DEFAULT_ADDRESS
@@ -213,6 +218,41 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
 
             self.data.accrual_update_timestamp = sp.now
 
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def get_target_price(self, unit):
+        """lambda used to fetch the target price. If the price cache is enabled the price is only fetched from
+        the target price oracle once per level, later calls in the same level return the cached price.
+
+        The cache is keyed on the level only, the get_price view of the oracle returns no timestamp to key it on. If the
+        oracle is updated later in the same level (e.g. an oracle update batched behind an engine call), every following
+        call in that level still uses the price fetched before the update. The stale price is at most one level old and
+        the next level fetches the new price, enable the cache only for oracles for which that delay is acceptable.
+
+        Cost: a cache hit reads and compares storage.price_cache and executes no view, i.e. the whole view chain of the
+        oracle (e.g. an EngineOracle walking its aggregation path) is saved. A cache miss executes the view chain as
+        without the cache plus the comparison and one write of storage.price_cache. The write does not grow the storage,
+        price_cache is already set while the cache is enabled, so a miss costs a few gas units more than no cache at all.
+
+        Post: storage.price_cache = sp.some(sp.record(price=target_price, level=sp.level)) if the cache is enabled
+
+        Args:
+            unit (sp.unit): nothing
+
+        Returns:
+            sp.TNat: the target price
+        """
+        with sp.if_(self.data.price_cache.is_some() & (self.data.price_cache.open_some().level == sp.level)):
+            sp.result(self.data.price_cache.open_some().price)
+        with sp.else_():
+            target_price = sp.compute(
+                sp.view(
+                    "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
+                ).open_some(Errors.INVALID_VIEW)
+            )
+            with sp.if_(self.data.price_cache.is_some()):
+                self.data.price_cache = sp.some(sp.record(price=target_price, level=sp.level))
+            sp.result(target_price)
+
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
     def update_governance_stake(self, stake):
         """sub entrypoint to call "update_stake" on the governance token contract
@@ -256,6 +296,17 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
         self.data.governance_token_contract = governance_token_contract
         self.data.options_contract = options_contract
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_price_cache_enabled(self, price_cache_enabled):
+        """Enables or disables the per level target price cache. Only an admin can call this entrypoint."""
+        sp.set_type(price_cache_enabled, sp.TBool)
+
+        self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
+        with sp.if_(price_cache_enabled):
+            self.data.price_cache = sp.some(sp.record(price=sp.nat(0), level=sp.nat(0)))
+        with sp.else_():
+            self.data.price_cache = sp.none
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_reference_interest_rate(self, reference_interest_rate):
         self.verify_is_admin(Constants.DEFAULT_TOKEN_ID)
@@ -310,9 +361,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
             / Constants.PRECISION_FACTOR,
         )
 
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
         market_price_amount = sp.local(
             "market_price_amount",
             ((current_token_amount.value + token_amount) * target_price)
@@ -385,9 +434,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
             / Constants.PRECISION_FACTOR,
         )
 
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
         market_price_amount = sp.local(
             "market_price_amount",
             (sp.as_nat(current_token_amount.value - token_amount) * target_price)
@@ -444,9 +491,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
             vault_context.value.minted * self.data.compound_interest_rate
         ) / Constants.PRECISION_FACTOR
 
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
         sp.verify(
             (
                 balance_as_nat.value * Constants.PRICE_PRECISION_FACTOR
@@ -600,9 +645,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
         current_token_amount = (
             vault_context.value.minted * self.data.compound_interest_rate
         )
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
 
         sp.verify(
             balance_as_nat
@@ -667,9 +710,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
         sp.verify(
             vault_context.value.allows_settlement, message=Errors.SETTLEMENT_NOT_ALLOWED
         )
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
 
         market_price_amount = sp.local(
             "market_price_amount",
@@ -750,9 +791,7 @@ class TokenTrackerEngine(sp.Contract, AdministrableMixin):
         sp.set_type(addresses, sp.TList(sp.TAddress))
         self.update_accrual(sp.unit)
 
-        target_price = sp.view(
-            "get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat
-        ).open_some(Errors.INVALID_VIEW)
+        target_price = sp.compute(self.get_target_price(sp.unit))
         with sp.for_("address", addresses) as address:
             with sp.if_(self.data.vault_contexts[address].allows_settlement):
                 self.update_governance_stake(
@@ -5,7 +5,7 @@ import utils.constants as Constants
 from utils.contract_utils import Ratio, Utils
 from utils.fa2 import AdministrableMixin, LedgerKey
 
-from contracts.tracker.base_tracker_engine_v3 import BaseTrackerEngine, Settlement, Liquidation
+from contracts.tracker.base_tracker_engine_v3 import BaseTrackerEngine, EngineConfig, Settlement, Liquidation
 
 from contracts.tracker.governance_token import Stake
 
@@ -46,12 +46,15 @@ class TokenTrackerEngine(BaseTrackerEngine):
         token_decimals=12,
         collateral_token_decimals=12,
         administrators={},
+        pull_reference_interest_rate=False,
     ):
         """init to set the token and administrators, in order to be fully operational set_contracts need to be called first.
         Args:
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            pull_reference_interest_rate (bool, optional): read the reference interest rates from the get_reference_interest_rates view
+                of the interest rate setter in update_accrual instead of receiving set_reference_interest_rate. Defaults to False.
         """
         self.token_contract = token_contract
         self.token_id = token_id
@@ -62,25 +65,22 @@ class TokenTrackerEngine(BaseTrackerEngine):
         self.price_extra_precision_factor = price_extra_precision_factor
         self.collateral_token_decimals = collateral_token_decimals
         self.token_decimals = token_decimals
+        self.pull_reference_interest_rate = pull_reference_interest_rate
 
         self.init_type(
             sp.TRecord(
                 accrual_update_timestamp = sp.TTimestamp,
                 administrators = sp.TBigMap(LedgerKey.get_type(), sp.TUnit),
-                collateral_token_contract = sp.TAddress,
-                collateral_token_id = sp.TNat,
+                config = EngineConfig.get_type(),
                 compound_interest_rate = sp.TNat,
-                governance_token_contract = sp.TAddress,
-                options_contract = sp.TAddress,
                 reference_interest_rate = sp.TNat,
                 spread_rate = sp.TNat,
-                reward_pool_contract = sp.TAddress,
-                savings_pool_contract = sp.TAddress,
-                target_price_oracle = sp.TAddress,
-                interest_rate_setter_contract = sp.TAddress,
-                token_contract = sp.TAddress,
-                token_id = sp.TNat,
                 total_supply = sp.TNat,
+                deferred_accrual = sp.TBool,
+                pending_asset_accrual = sp.TNat,
+                pending_spread_accrual = sp.TNat,
+                price_cache = sp.TOption(sp.TRecord(price=sp.TNat, level=sp.TNat)),
+                vault_import_locked = sp.TBool,
                 vault_contexts = sp.TBigMap(
                     sp.TAddress,
                     sp.TRecord(
@@ -89,14 +89,24 @@ class TokenTrackerEngine(BaseTrackerEngine):
                         introducer=sp.TOption(sp.TAddress)
                     ).right_comb()
                 ),
-                collateral_ratio = Ratio.get_type(),
-                settlement_ratio = Ratio.get_type(),
-                minting_fee_ratio = Ratio.get_type(),
-                introducer_ratio = Ratio.get_type(),
-                settlement_reward_fee_ratio = Ratio.get_type(),
-                settlement_payout_ratio = Ratio.get_type(),
-                liquidation_payout_ratio = Ratio.get_type(),
-            ).right_comb()
+            ).layout(
+                (
+                    (
+                        ("compound_interest_rate", "total_supply"),
+                        ("accrual_update_timestamp", "reference_interest_rate"),
+                    ),
+                    (
+                        ("vault_contexts", "spread_rate"),
+                        (
+                            (
+                                ("deferred_accrual", "price_cache"),
+                                ("pending_asset_accrual", "pending_spread_accrual"),
+                            ),
+                            ("administrators", ("vault_import_locked", "config")),
+                        ),
+                    ),
+                )
+            )
         )
 
         self.init(**self.get_init_storage())
@@ -128,15 +138,15 @@ class TokenTrackerEngine(BaseTrackerEngine):
         sp.set_type(token_amount, sp.TNat)
         if self.collateral_token_type == Constants.TOKEN_TYPE_FA2:
             Utils.execute_fa2_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.sender,
                 sp.self_address,
-                self.data.collateral_token_id,
+                self.data.config.collateral_token_id,
                 token_amount,
             )
         elif self.collateral_token_type == Constants.TOKEN_TYPE_FA1:
             Utils.execute_fa1_token_transfer(
-                self.data.collateral_token_contract,
+                self.data.config.collateral_token_contract,
                 sp.sender,
                 sp.self_address,
                 token_amount,
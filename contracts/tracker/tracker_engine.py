@@ -126,16 +126,22 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
         return storage
 
-    def __init__(self, token_contract, token_id, administrators={}):
+    def __init__(
+        self, token_contract, token_id, administrators={}, use_target_price_view=False
+    ):
         """init to set the token and administrators, in order to be fully operational set_contracts need to be called first.
         Args:
             token_contract (sp.address): token address
             token_id (sp.nat): token id
             administrators (dict, optional): the administrators allowed to set the contracts. Defaults to {}.
+            use_target_price_view (bool, optional): read the target price with the "get_price" view of the oracle and execute
+                mint, burn, liquidate, withdraw and settle_with_vault in one operation instead of the callback and internal call.
+                Oracles without the view fall back to the callback and internal call. Defaults to False.
         """
         self.token_contract = token_contract
         self.token_id = token_id
         self.administrators = administrators
+        self.use_target_price_view = use_target_price_view
         self.init(**self.get_init_storage())
 
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
@@ -149,6 +155,43 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
             self.data.target_price_oracle, "get_price", "set_target_price"
         )
 
+    def fetch_target_price_and_execute(self, internal_entry_point, parameter, execute):
+        """triggers the target price fetch and the accrual update and calls the internal entrypoint. If use_target_price_view is set, the price is
+        read through the "get_price" view of the oracle and the action is executed in the same call instead (callback path if the oracle has no view).
+
+        Post: fetch_target_price()
+        Post: update_accrual()
+        Post: storage.sender = sp.sender
+        Post: call self.internal_entry_point(parameter)
+        Post (use_target_price_view): storage.target_price = target_price_oracle.get_price() and execute()
+
+        Args:
+            internal_entry_point (str): the internal entrypoint used by the callback path
+            parameter: the parameter of the internal entrypoint
+            execute (function): generates the logic of the internal entrypoint
+        """
+
+        def call_internal():
+            self.fetch_target_price(sp.unit)
+            self.update_accrual(sp.unit)
+            self.data.sender = sp.sender
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_target_price_view:
+            target_price = sp.local(
+                "target_price",
+                sp.view("get_price", self.data.target_price_oracle, sp.unit, t=sp.TNat),
+            )
+            with sp.if_(target_price.value.is_some()):
+                self.data.target_price = target_price.value.open_some()
+                self.update_accrual(sp.unit)
+                self.data.sender = sp.sender
+                execute()
+            with sp.else_():
+                call_internal()
+        else:
+            call_internal()
+
     @sp.private_lambda(with_storage="read-write", with_operations=True, wrap_call=True)
     def update_accrual(self, unit):
         """sub entrypoint which updates the accrual based on the interest rate and timedelta.
@@ -340,27 +383,36 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point
     def mint(self, token_amount):
-        """entrypoint called by a vault owner allows to mint new tokens. The actual logic is in "internal_mint".
+        """entrypoint called by a vault owner allows to mint new tokens. The actual logic is in "execute_mint", reached through "internal_mint"
+        after the price callback or directly if the target price is read through the view.
 
-        Post: fetch_target_price()
-        Post: update_accrual()
-        Post: storage.sender = sp.sender
-        Post: call self.internal_mint
+        Post: fetch_target_price_and_execute()
 
         Args:
             token_amount (sp.nat): token amoun to mint
         """
         sp.set_type(token_amount, sp.TNat)
-        self.fetch_target_price(sp.unit)
-        self.update_accrual(sp.unit)
-        self.data.sender = sp.sender
-        sp.transfer(token_amount, sp.mutez(0), sp.self_entry_point("internal_mint"))
+        self.fetch_target_price_and_execute(
+            "internal_mint", token_amount, lambda: self.execute_mint(token_amount)
+        )
 
     @sp.entry_point
     def internal_mint(self, token_amount):
-        """internal entrypoint to mint a certain token amount given the current price and balance of a vault.
+        """internal entrypoint called after the target price was received, the actual logic is in "execute_mint".
 
         Pre: verify_internal()
+        Post: execute_mint(token_amount)
+
+        Args:
+            token_amount (sp.nat): token amoun to mint
+        """
+        sp.set_type(token_amount, sp.TNat)
+        self.verify_internal(sp.unit)
+        self.execute_mint(token_amount)
+
+    def execute_mint(self, token_amount):
+        """helper to mint a certain token amount given the current price and balance of a vault.
+
         Pre: token_amount > 10**9
         Pre: storage.vault_contexts.contains(storage.sender)
         Pre: storage.vault_contexts[storage.sender].balance*10**12 >= 3 * storage.target_price * (token_amount + storage.vault_contexts[storage.sender].minted*storage.compound_interest_rate/10**12)
@@ -373,8 +425,6 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         Args:
             token_amount (sp.nat): token amoun to mint
         """
-        sp.set_type(token_amount, sp.TNat)
-        self.verify_internal(sp.unit)
         sp.verify(
             token_amount >= Constants.MIN_TOKEN_AMOUNT_THRESHOLD,
             message=Errors.AMOUNT_TOO_SMALL,
@@ -430,27 +480,36 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point
     def burn(self, token_amount):
-        """entrypoint called by a vault owner allows to burn tokens. The actual logic is in "internal_burn".
+        """entrypoint called by a vault owner allows to burn tokens. The actual logic is in "execute_burn", reached through "internal_burn"
+        after the price callback or directly if the target price is read through the view.
 
-        Post: fetch_target_price()
-        Post: update_accrual()
-        Post: storage.sender = sp.sender
-        Post: call self.internal_burn
+        Post: fetch_target_price_and_execute()
 
         Args:
             token_amount (sp.nat): token amoun to burn
         """
         sp.set_type(token_amount, sp.TNat)
-        self.fetch_target_price(sp.unit)
-        self.update_accrual(sp.unit)
-        self.data.sender = sp.sender
-        sp.transfer(token_amount, sp.mutez(0), sp.self_entry_point("internal_burn"))
+        self.fetch_target_price_and_execute(
+            "internal_burn", token_amount, lambda: self.execute_burn(token_amount)
+        )
 
     @sp.entry_point
     def internal_burn(self, token_amount):
-        """internal entrypoint to burn a certain token amount given the current price and balance of a vault.
+        """internal entrypoint called after the target price was received, the actual logic is in "execute_burn".
 
         Pre: verify_internal()
+        Post: execute_burn(token_amount)
+
+        Args:
+            token_amount (sp.nat): token amoun to burn
+        """
+        sp.set_type(token_amount, sp.TNat)
+        self.verify_internal(sp.unit)
+        self.execute_burn(token_amount)
+
+    def execute_burn(self, token_amount):
+        """helper to burn a certain token amount given the current price and balance of a vault.
+
         Pre: token_amount > 10**9
         Pre: storage.vault_contexts.contains(storage.sender)
 
@@ -463,8 +522,6 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         Args:
             token_amount (sp.nat): token amoun to burn
         """
-        sp.set_type(token_amount, sp.TNat)
-        self.verify_internal(sp.unit)
         sp.verify(
             token_amount >= Constants.MIN_TOKEN_AMOUNT_THRESHOLD,
             message=Errors.AMOUNT_TOO_SMALL,
@@ -505,30 +562,38 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point
     def liquidate(self, liquidation):
-        """entrypoint that can be called by anyone to liquidate a vault with too little collateral (<2x). The actual logic can be found in internal_liquidate.
+        """entrypoint that can be called by anyone to liquidate a vault with too little collateral (<2x). The actual logic can be found in execute_liquidate, reached through internal_liquidate
+        after the price callback or directly if the target price is read through the view.
 
-        Post: fetch_target_price()
-        Post: update_accrual()
-        Post: storage.sender = sp.sender
-        Post: call self.internal_liquidate
+        Post: fetch_target_price_and_execute()
 
         Args:
             liquidation (Liquidation): liquidation parameter include address and amount to liquidate
         """
 
         sp.set_type(liquidation, Liquidation.get_type())
-        self.fetch_target_price(sp.unit)
-        self.update_accrual(sp.unit)
-        self.data.sender = sp.sender
-
-        sp.transfer(liquidation, sp.mutez(0), sp.self_entry_point("internal_liquidate"))
+        self.fetch_target_price_and_execute(
+            "internal_liquidate", liquidation, lambda: self.execute_liquidate(liquidation)
+        )
 
     @sp.entry_point
     def internal_liquidate(self, liquidation):
-        """internal entrypoint to liquidate a vault back to the target collateralisation level (with a 5% threshold) (3x). Can only be executed if the vault was below
-        emergency collateralisation (2x) or the liquidation started and did not manage to get to >target-5%.
+        """internal entrypoint called after the target price was received, the actual logic is in "execute_liquidate".
 
         Pre: verify_internal()
+        Post: execute_liquidate(liquidation)
+
+        Args:
+            liquidation (Liquidation): liquidation parameter include address and amount to liquidate
+        """
+        sp.set_type(liquidation, Liquidation.get_type())
+        self.verify_internal(sp.unit)
+        self.execute_liquidate(liquidation)
+
+    def execute_liquidate(self, liquidation):
+        """helper to liquidate a vault back to the target collateralisation level (with a 5% threshold) (3x). Can only be executed if the vault was below
+        emergency collateralisation (2x) or the liquidation started and did not manage to get to >target-5%.
+
         Pre: storage.vault_contexts.contains(liquidation.vault_owner)
         Pre: storage.vault_contexts[liquidation.vault_owner].balance*10**12 < 2 * storage.target_price * (token_amount + storage.vault_contexts[liquidation.vault_owner].minted*storage.compound_interest_rate/10**12) || storage.vault_contexts[storage.sender].is_being_liquidated
         Pre: storage.vault_contexts[liquidation.vault_owner].balance - liquidation.token_amount*storage.target_price * 1.125 < 3 * storage.target_price * ((storage.vault_contexts[storage.sender].minted*storage.compound_interest_rate/10**12) - liquidation.token_amount)
@@ -542,9 +607,6 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         Args:
             liquidation (Liquidation): liquidation parameter include address and amount to liquidate
         """
-        sp.set_type(liquidation, Liquidation.get_type())
-        self.verify_internal(sp.unit)
-
         vault_context = sp.local(
             "vault_context", self.data.vault_contexts[liquidation.vault_owner]
         )
@@ -648,40 +710,45 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point
     def withdraw(self, amount):
-        """entrypoint called by a vault owner allows to withdraw excess collateral. The actual logic is in "internal_withdraw".
+        """entrypoint called by a vault owner allows to withdraw excess collateral. The actual logic is in "execute_withdraw", reached through "internal_withdraw"
+        after the price callback or directly if the target price is read through the view.
 
-        Post: fetch_target_price()
-        Post: update_accrual()
-        Post: storage.sender = sp.sender
-        Post: call self.internal_withdraw
+        Post: fetch_target_price_and_execute()
 
         Args:
             amount (sp.mutez): the mutez amount to withdraw
         """
 
         sp.set_type(amount, sp.TMutez)
-        self.fetch_target_price(sp.unit)
-        self.update_accrual(sp.unit)
-        self.data.sender = sp.sender
-
-        sp.transfer(amount, sp.mutez(0), sp.self_entry_point("internal_withdraw"))
+        self.fetch_target_price_and_execute(
+            "internal_withdraw", amount, lambda: self.execute_withdraw(amount)
+        )
 
     @sp.entry_point
     def internal_withdraw(self, amount):
-        """internal entrypoint that allows to withdraw excess collateral. Excess collateral is defined as tez amount which is more than the 3x as the compounded minted
-        liability.
+        """internal entrypoint called after the target price was received, the actual logic is in "execute_withdraw".
 
         Pre: verify_internal()
-        Pre: storage.vault_contexts.contains(storage.sender)
-        Pre: (storage.vault_contexts[storage.sender].balance-amount)*10**12 >= 3 * storage.target_price * (storage.vault_contexts[liquidation.vault_owner].minted*storage.compound_interest_rate/10**12)
-        Post: vault.withdraw(liquidation.vault_owner, amount)
+        Post: execute_withdraw(amount)
 
         Args:
             amount (sp.mutez): the mutez amount to withdraw
         """
         sp.set_type(amount, sp.TMutez)
         self.verify_internal(sp.unit)
+        self.execute_withdraw(amount)
 
+    def execute_withdraw(self, amount):
+        """helper that allows to withdraw excess collateral. Excess collateral is defined as tez amount which is more than the 3x as the compounded minted
+        liability.
+
+        Pre: storage.vault_contexts.contains(storage.sender)
+        Pre: (storage.vault_contexts[storage.sender].balance-amount)*10**12 >= 3 * storage.target_price * (storage.vault_contexts[liquidation.vault_owner].minted*storage.compound_interest_rate/10**12)
+        Post: vault.withdraw(liquidation.vault_owner, amount)
+
+        Args:
+            amount (sp.mutez): the mutez amount to withdraw
+        """
         vault_context = sp.local(
             "vault_context", self.data.vault_contexts[self.data.sender]
         )
@@ -715,31 +782,38 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
 
     @sp.entry_point
     def settle_with_vault(self, settlement):
-        """entrypoint called by the options_contract to execute an intent. The actual logic is in "internal_settle_with_vault".
+        """entrypoint called by the options_contract to execute an intent. The actual logic is in "execute_settle_with_vault", reached through "internal_settle_with_vault"
+        after the price callback or directly if the target price is read through the view.
 
-        Post: fetch_target_price()
-        Post: update_accrual()
-        Post: storage.sender = sp.sender
-        Post: call self.internal_settle_with_vault
+        Post: fetch_target_price_and_execute()
 
         Args:
             settlement (Settlement): the settlement includes the vault_owner, the token_amount and the recipient of the tez
         """
         sp.set_type(settlement, Settlement.get_type())
-        self.fetch_target_price(sp.unit)
-        self.update_accrual(sp.unit)
-        self.data.sender = sp.sender
-
-        sp.transfer(
-            settlement, sp.mutez(0), sp.self_entry_point("internal_settle_with_vault")
+        self.fetch_target_price_and_execute(
+            "internal_settle_with_vault",
+            settlement,
+            lambda: self.execute_settle_with_vault(settlement),
         )
 
     @sp.entry_point
     def internal_settle_with_vault(self, settlement):
-        """internal entrypoint to settle a certain token amount against a vault (at a premium of 6.25%). The tokens are directly burned on the
-        options_contract address.
+        """internal entrypoint called after the target price was received, the actual logic is in "execute_settle_with_vault".
 
         Pre: verify_internal()
+        Post: execute_settle_with_vault(settlement)
+
+        Args:
+            settlement (Settlement): the settlement includes the vault_owner, the token_amount and the recipient of the tez
+        """
+        sp.set_type(settlement, Settlement.get_type())
+        self.verify_internal(sp.unit)
+        self.execute_settle_with_vault(settlement)
+    def execute_settle_with_vault(self, settlement):
+        """helper to settle a certain token amount against a vault (at a premium of 6.25%). The tokens are directly burned on the
+        options_contract address.
+
         Pre: storage.vault_contexts.contains(settlement.vault_owner)
         Pre: storage.sender == storage.options_contract
 
@@ -753,8 +827,6 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         Args:
             settlement (Settlement): the settlement includes the vault_owner, the token_amount and the recipient of the tez
         """
-        sp.set_type(settlement, Settlement.get_type())
-        self.verify_internal(sp.unit)
         sp.verify(
             self.data.sender == self.data.options_contract, message=Errors.NOT_ADMIN
         )
@@ -828,4 +900,4 @@ class TrackerEngine(sp.Contract, AdministrableMixin, InternalMixin):
         )
         self.data.total_supply = sp.as_nat(
             self.data.total_supply - settlement.token_amount
-        )
\ No newline at end of file
+        )
@@ -4,6 +4,7 @@ import utils.error_codes as Errors
 import utils.constants as Constants
 
 from utils.administrable_mixin import SingleAdministrableMixin
+from utils.balance_view_mixin import BalanceViewMixin
 from utils.contract_utils import Utils
 from utils.fa2 import OperatorKey, BalanceOf, FA2ErrorMessage, UpdateOperator, Transfer
 from utils.internal_mixin import InternalMixin
@@ -103,7 +104,79 @@ class TradingWindow:
         )
 
 
-class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
+class OwnerStakeKey:
+    """Key of the owner index, maps (owner, stake_id) to the position of the stake in the owner's list"""
+
+    def get_type():
+        return sp.TRecord(owner=sp.TAddress, stake_id=sp.TNat).layout(
+            ("owner", "stake_id")
+        )
+
+    def make(owner, stake_id):
+        return sp.set_type_expr(
+            sp.record(owner=owner, stake_id=stake_id), OwnerStakeKey.get_type()
+        )
+
+
+class OwnerPositionKey:
+    """Key of the owner list, maps (owner, position) to the stake id, positions are 0 to owner_stake_counts[owner]-1"""
+
+    def get_type():
+        return sp.TRecord(owner=sp.TAddress, position=sp.TNat).layout(
+            ("owner", "position")
+        )
+
+    def make(owner, position):
+        return sp.set_type_expr(
+            sp.record(owner=owner, position=position), OwnerPositionKey.get_type()
+        )
+
+
+class OwnerStakesPage:
+    def get_type():
+        return sp.TRecord(owner=sp.TAddress, offset=sp.TNat, limit=sp.TNat).layout(
+            ("owner", ("offset", "limit"))
+        )
+
+
+class StakeEvent:
+    """Payload of the "deposit" and "withdraw" events, emitted whenever a stake changes"""
+
+    def get_type():
+        return sp.TRecord(
+            stake_id=sp.TNat,
+            owner=sp.TAddress,
+            token_amount=sp.TNat,
+            stake=sp.TNat,
+            payout_amount=sp.TNat,
+            disc_factor=sp.TNat,
+        ).layout(
+            (
+                "stake_id",
+                (
+                    "owner",
+                    ("token_amount", ("stake", ("payout_amount", "disc_factor"))),
+                ),
+            )
+        )
+
+    def make(stake_id, owner, token_amount, stake, payout_amount, disc_factor):
+        return sp.set_type_expr(
+            sp.record(
+                stake_id=stake_id,
+                owner=owner,
+                token_amount=token_amount,
+                stake=stake,
+                payout_amount=payout_amount,
+                disc_factor=disc_factor,
+            ),
+            StakeEvent.get_type(),
+        )
+
+
+class UnifiedStakingPool(
+    sp.Contract, InternalMixin, BalanceViewMixin, SingleAdministrableMixin
+):
     """The unified staking pool allows a user to stake their tokens and then get YOU rewards. The rewards are coming from fees of the other parts
     of the platform (farms, mint, etc.). The rewards are in different tokens and they are swapped to YOU tokens during a trading window. The swap
     is using an oracle to predict the expected amount of YOU tokens received and fails if the minimum received is not respecting the oracle.
@@ -111,9 +184,15 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
     Each stake has an age and once it reaches maturity (180 days) the user can withdraw the entire stake, otherwise only a percentage directly proportional
     to the stake age can be withdrawn.
 
+    The stakes of an owner are indexed per (owner, stake_id) and per (owner, position), such that ownership checks and updates do not depend on the
+    number of stakes an owner holds. Entries of the former stakes_owner_lookup set are moved into the index whenever the owner is touched or through
+    migrate_owner_stakes. Once migrated, view_owner_stakes is deprecated: its cost grows with the number of stakes of the owner, callers check
+    ownership through view_is_stake_owner (as the DAO does) and list the stakes through view_owner_stake_count and view_owner_stakes_page.
+
     Args:
         (sp.Contract): this is a smartpy contract
         (InternalMixin): mixin used whenever we need external data and hence have to trigger an internal call (to process after we received said external data)
+        (BalanceViewMixin): mixin used to read the own balance through the view of the token contract and execute in the same call
         (SingleAdministrableMixin): mixin used whenever we have a single administrator.
     """
 
@@ -132,7 +211,14 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         storage["stakes"] = sp.big_map(tkey=sp.TNat, tvalue=Stake.get_type())
         storage["stakes_owner_lookup"] = sp.big_map(
             tkey=sp.TAddress, tvalue=sp.TSet(sp.TNat)
+        )  # legacy, only emptied through migrate_owner
+        storage["owner_stake_indexes"] = sp.big_map(
+            tkey=OwnerStakeKey.get_type(), tvalue=sp.TNat
+        )
+        storage["owner_stakes"] = sp.big_map(
+            tkey=OwnerPositionKey.get_type(), tvalue=sp.TNat
         )
+        storage["owner_stake_counts"] = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat)
         storage["disc_factor"] = sp.nat(Constants.PRECISION_FACTOR)
         storage["token_address"] = self.token_address
         storage["token_id"] = self.token_id
@@ -149,7 +235,14 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
         return storage
 
-    def __init__(self, token_address, token_id, max_release_period, administrators):
+    def __init__(
+        self,
+        token_address,
+        token_id,
+        max_release_period,
+        administrators,
+        use_balance_view=False,
+    ):
         """Contract initialization with the token contract (YOU), the maximum age of a stake (if a stake has an age greater than
         max_release_period, the age will be considered max_release_period) and the administrator of the contract.
 
@@ -157,7 +250,10 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             engine_address (sp.address): engine address
             token_address (sp.address): token address
             token_id (sp.nat): token id
+            use_balance_view (bool): if True the own balance is read through the "get_balance" view of the token and deposit/withdraw are
+                executed in the same call, tokens without the view fall back to the balance_of callback. Defaults to False.
         """
+        self.use_balance_view = use_balance_view
         self.token_address = token_address
         self.token_id = token_id
         self.max_release_period = max_release_period
@@ -224,6 +320,131 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             )
             self.data.current_token_balance = matched_balance_of_response.head.balance
 
+    def add_owner_stake(self, owner, stake_id):
+        """appends the stake to the owner's list.
+
+        Post: storage.owner_stakes[(owner, count)] = stake_id
+        Post: storage.owner_stake_indexes[(owner, stake_id)] = count
+        Post: storage.owner_stake_counts[owner] = count + 1
+
+        Args:
+            owner (sp.address): the owner of the stake
+            stake_id (sp.nat): the stake id
+        """
+        position = sp.local(
+            "add_position", self.data.owner_stake_counts.get(owner, sp.nat(0))
+        )
+        self.data.owner_stakes[OwnerPositionKey.make(owner, position.value)] = stake_id
+        self.data.owner_stake_indexes[OwnerStakeKey.make(owner, stake_id)] = (
+            position.value
+        )
+        self.data.owner_stake_counts[owner] = position.value + 1
+
+    def remove_owner_stake(self, owner, stake_id):
+        """removes the stake from the owner's list by moving the last stake of the list to its position.
+
+        Pre: storage.owner_stake_indexes.contains((owner, stake_id))
+        Post: storage.owner_stake_counts[owner] -= 1 (deleted once it reaches 0)
+
+        Args:
+            owner (sp.address): the owner of the stake
+            stake_id (sp.nat): the stake id
+        """
+        stake_key = OwnerStakeKey.make(owner, stake_id)
+        position = sp.local("remove_position", self.data.owner_stake_indexes[stake_key])
+        last_position = sp.local(
+            "last_position", sp.as_nat(self.data.owner_stake_counts[owner] - 1)
+        )
+        with sp.if_(position.value != last_position.value):
+            last_stake_id = sp.local(
+                "last_stake_id",
+                self.data.owner_stakes[
+                    OwnerPositionKey.make(owner, last_position.value)
+                ],
+            )
+            self.data.owner_stakes[
+                OwnerPositionKey.make(owner, position.value)
+            ] = last_stake_id.value
+            self.data.owner_stake_indexes[
+                OwnerStakeKey.make(owner, last_stake_id.value)
+            ] = position.value
+        del self.data.owner_stakes[OwnerPositionKey.make(owner, last_position.value)]
+        del self.data.owner_stake_indexes[stake_key]
+        with sp.if_(last_position.value == 0):
+            del self.data.owner_stake_counts[owner]
+        with sp.else_():
+            self.data.owner_stake_counts[owner] = last_position.value
+
+    def migrate_owner(self, owner):
+        """moves the owner's stakes of the legacy stakes_owner_lookup set into the owner index, nothing to do for owners without legacy entry.
+
+        Post: ~storage.stakes_owner_lookup.contains(owner)
+
+        Args:
+            owner (sp.address): the owner to migrate
+        """
+        with sp.if_(self.data.stakes_owner_lookup.contains(owner)):
+            with sp.for_(
+                "legacy_stake_id", self.data.stakes_owner_lookup[owner].elements()
+            ) as legacy_stake_id:
+                self.add_owner_stake(owner, legacy_stake_id)
+            del self.data.stakes_owner_lookup[owner]
+
+    def is_stake_owner(self, owner, stake_id):
+        """returns whether the owner holds the stake, considering the not yet migrated legacy entries (used in views).
+
+        Args:
+            owner (sp.address): the owner
+            stake_id (sp.nat): the stake id
+
+        Returns:
+            sp.bool: True if the owner holds the stake
+        """
+        return self.data.owner_stake_indexes.contains(
+            OwnerStakeKey.make(owner, stake_id)
+        ) | (
+            self.data.stakes_owner_lookup.contains(owner)
+            & self.data.stakes_owner_lookup[owner].contains(stake_id)
+        )
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def migrate_owner_stakes(self, owners):
+        """Moves the legacy stakes_owner_lookup entries of the given owners into the owner index (only an admin can call this entrypoint).
+        Owners are also migrated on their next deposit, withdraw or transfer.
+
+        Args:
+            owners (sp.list(sp.address)): the owners to migrate
+        """
+        sp.set_type(owners, sp.TList(sp.TAddress))
+        self.verify_is_admin()
+        with sp.for_("owner", owners) as owner:
+            self.migrate_owner(owner)
+
+    def fetch_balance_and_execute(self, internal_entry_point, parameter, execute):
+        """triggers the own balance fetch and calls the internal entrypoint with the parameter. If use_balance_view is set, the balance is read
+        through the view of the token contract and the action is executed in the same call instead (callback path if the token has no view).
+
+        Args:
+            internal_entry_point (str): the internal entrypoint used by the callback path
+            parameter (sp.TRecord): the parameter of the internal entrypoint
+            execute (function): generates the logic of the internal entrypoint
+        """
+
+        def call_internal():
+            self.fetch_reward_balance(sp.unit)
+            sp.transfer(parameter, sp.mutez(0), sp.self_entry_point(internal_entry_point))
+
+        if self.use_balance_view:
+            self.execute_with_own_balance(
+                self.data.token_address,
+                self.data.token_id,
+                "current_token_balance",
+                execute,
+                call_internal,
+            )
+        else:
+            call_internal()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def deposit(self, deposit_paramter):
         """ """
@@ -232,10 +453,10 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
 
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-
-        sp.transfer(
-            deposit_paramter, sp.mutez(0), sp.self_entry_point("internal_deposit")
+        self.fetch_balance_and_execute(
+            "internal_deposit",
+            deposit_paramter,
+            lambda: self.execute_deposit(deposit_paramter),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -246,6 +467,10 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
 
         self.verify_internal(sp.unit)
+        self.execute_deposit(deposit_paramter)
+
+    def execute_deposit(self, deposit_paramter):
+        """ """
         self.sub_update_factor(sp.unit)
 
         token_amount = sp.local("token_amount", deposit_paramter.token_amount)
@@ -264,10 +489,11 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
         stake_id = sp.local("stake_id", deposit_paramter.stake_id)
 
+        self.migrate_owner(self.data.sender)
         with sp.if_(stake_id.value > 0):
             sp.verify(
-                self.data.stakes_owner_lookup[self.data.sender].contains(
-                    stake_id.value
+                self.data.owner_stake_indexes.contains(
+                    OwnerStakeKey.make(self.data.sender, stake_id.value)
                 ),
                 message=Errors.NOT_OWNER,
             )
@@ -293,15 +519,24 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             stake.value.age_timestamp = new_age_timestamp.value
             self.data.stakes[stake_id.value] = stake.value
         with sp.else_():
-            with sp.if_(~self.data.stakes_owner_lookup.contains(self.data.sender)):
-                self.data.stakes_owner_lookup[self.data.sender] = sp.set([])
-            self.data.stakes_owner_lookup[self.data.sender].add(stake_id.value)
+            self.add_owner_stake(self.data.sender, stake_id.value)
             self.data.stakes[stake_id.value] = sp.record(
                 token_amount=token_amount.value,
                 stake=discounted_stake.value,
                 age_timestamp=sp.now,
             )
         self.data.total_stake += discounted_stake.value
+        sp.emit(
+            StakeEvent.make(
+                stake_id.value,
+                self.data.sender,
+                token_amount.value,
+                discounted_stake.value,
+                sp.nat(0),
+                self.data.disc_factor,
+            ),
+            tag="deposit",
+        )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def withdraw(self, withdraw_paramter):
@@ -314,9 +549,10 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
 
         self.data.sender = sp.sender
-        self.fetch_reward_balance(sp.unit)
-        sp.transfer(
-            withdraw_paramter, sp.mutez(0), sp.self_entry_point("internal_withdraw")
+        self.fetch_balance_and_execute(
+            "internal_withdraw",
+            withdraw_paramter,
+            lambda: self.execute_withdraw(withdraw_paramter),
         )
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -330,13 +566,18 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
         )
 
         self.verify_internal(sp.unit)
+        self.execute_withdraw(withdraw_paramter)
+
+    def execute_withdraw(self, withdraw_paramter):
+        """ """
         self.sub_update_factor(sp.unit)
 
         stake = sp.local("stake", self.data.stakes[withdraw_paramter.stake_id])
 
+        self.migrate_owner(self.data.sender)
         sp.verify(
-            self.data.stakes_owner_lookup[self.data.sender].contains(
-                withdraw_paramter.stake_id
+            self.data.owner_stake_indexes.contains(
+                OwnerStakeKey.make(self.data.sender, withdraw_paramter.stake_id)
             ),
             message=Errors.NOT_OWNER,
         )
@@ -398,14 +639,23 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
 
         with sp.if_(remaining_stake == 0):
             del self.data.stakes[withdraw_paramter.stake_id]
-            self.data.stakes_owner_lookup[self.data.sender].remove(
-                withdraw_paramter.stake_id
-            )
+            self.remove_owner_stake(self.data.sender, withdraw_paramter.stake_id)
         with sp.else_():
             self.data.stakes[
                 withdraw_paramter.stake_id
             ].token_amount = remaining_inital_token_amount
             self.data.stakes[withdraw_paramter.stake_id].stake = remaining_stake
+        sp.emit(
+            StakeEvent.make(
+                withdraw_paramter.stake_id,
+                self.data.sender,
+                partial_initial_token_amount.value,
+                partial_stake_amount.value,
+                payout_amount.value,
+                self.data.disc_factor,
+            ),
+            tag="withdraw",
+        )
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def update_operators(self, update_operators):
@@ -444,11 +694,11 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
                     message=FA2ErrorMessage.NOT_OPERATOR,
                 )
 
-                with sp.if_((tx.amount == 1) & self.data.stakes_owner_lookup[transfer.from_].contains(tx.token_id)):
-                    with sp.if_(~self.data.stakes_owner_lookup.contains(tx.to_)):
-                        self.data.stakes_owner_lookup[tx.to_] = sp.set([])
-                    self.data.stakes_owner_lookup[transfer.from_].remove(tx.token_id)
-                    self.data.stakes_owner_lookup[tx.to_].add(tx.token_id)
+                self.migrate_owner(transfer.from_)
+                self.migrate_owner(tx.to_)
+                with sp.if_((tx.amount == 1) & self.data.owner_stake_indexes.contains(OwnerStakeKey.make(transfer.from_, tx.token_id))):
+                    self.remove_owner_stake(transfer.from_, tx.token_id)
+                    self.add_owner_stake(tx.to_, tx.token_id)
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def balance_of(self, balance_of_request):
@@ -468,13 +718,8 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
                 message=FA2ErrorMessage.TOKEN_UNDEFINED,
             )
             stake = sp.local("stake", self.data.stakes[request.token_id])
-            with sp.if_(self.data.stakes_owner_lookup.contains(request.owner)):
-                with sp.if_(
-                    self.data.stakes_owner_lookup[request.owner].contains(
-                        request.token_id
-                    )
-                ):
-                    responses.value.push(sp.record(request=request, balance=1))
+            with sp.if_(self.is_stake_owner(request.owner, request.token_id)):
+                responses.value.push(sp.record(request=request, balance=1))
             with sp.else_():
                 responses.value.push(sp.record(request=request, balance=0))
 
@@ -553,14 +798,7 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
             message=FA2ErrorMessage.TOKEN_UNDEFINED,
         )
 
-        with sp.if_(
-            (
-                self.data.stakes_owner_lookup.contains(parameter.address)
-                & self.data.stakes_owner_lookup[parameter.address].contains(
-                    parameter.token_id
-                )
-            )
-        ):
+        with sp.if_(self.is_stake_owner(parameter.address, parameter.token_id)):
             sp.result(1)
         with sp.else_():
             sp.result(0)
@@ -575,11 +813,79 @@ class UnifiedStakingPool(sp.Contract, InternalMixin, SingleAdministrableMixin):
 
     @sp.onchain_view()
     def view_owner_stakes(self, owner):
+        """Deprecated, use view_is_stake_owner or view_owner_stakes_page instead. Returns all stake ids of the owner, the cost grows
+        with the number of indexed stakes. Owners without indexed stakes are answered from the legacy entries directly.
+        """
         sp.set_type(owner, sp.TAddress)
-        with sp.if_(~self.data.stakes_owner_lookup.contains(owner)):
-            sp.result(sp.set([]))
-        with sp.else_():
-            sp.result(self.data.stakes_owner_lookup[owner])
+        owner_stakes = sp.local(
+            "owner_stakes",
+            self.data.stakes_owner_lookup.get(owner, sp.set([], t=sp.TNat)),
+        )
+        with sp.if_(self.data.owner_stake_counts.contains(owner)):
+            with sp.for_(
+                "position", sp.range(0, self.data.owner_stake_counts[owner])
+            ) as position:
+                owner_stakes.value.add(
+                    self.data.owner_stakes[OwnerPositionKey.make(owner, position)]
+                )
+        sp.result(owner_stakes.value)
+
+    @sp.onchain_view()
+    def view_is_stake_owner(self, owner_stake_key):
+        """Returns whether the owner holds the stake."""
+        sp.set_type(owner_stake_key, OwnerStakeKey.get_type())
+        sp.result(self.is_stake_owner(owner_stake_key.owner, owner_stake_key.stake_id))
+
+    @sp.onchain_view()
+    def view_owner_stake_count(self, owner):
+        """Returns the number of stakes of the owner, pages of view_owner_stakes_page go up to this count."""
+        sp.set_type(owner, sp.TAddress)
+        legacy_count = sp.local("legacy_count", sp.nat(0))
+        with sp.if_(self.data.stakes_owner_lookup.contains(owner)):
+            legacy_count.value = sp.len(self.data.stakes_owner_lookup[owner])
+        sp.result(
+            legacy_count.value + self.data.owner_stake_counts.get(owner, sp.nat(0))
+        )
+
+    @sp.onchain_view()
+    def view_owner_stakes_page(self, page):
+        """Returns at most limit stake ids of the owner starting at offset. Not yet migrated owners are paged over the
+        legacy entries first (in ascending order), followed by the indexed stakes. The order of the indexed stakes
+        changes when a stake is removed (the last stake takes its position).
+        """
+        sp.set_type(page, OwnerStakesPage.get_type())
+        stake_ids = sp.local("stake_ids", sp.list([], t=sp.TNat))
+        end = sp.local("end", page.offset + page.limit)
+        legacy_count = sp.local("legacy_count", sp.nat(0))
+        with sp.if_(self.data.stakes_owner_lookup.contains(page.owner)):
+            legacy_position = sp.local("legacy_position", sp.nat(0))
+            with sp.for_(
+                "legacy_stake_id", self.data.stakes_owner_lookup[page.owner].elements()
+            ) as legacy_stake_id:
+                with sp.if_(
+                    (legacy_position.value >= page.offset)
+                    & (legacy_position.value < end.value)
+                ):
+                    stake_ids.value.push(legacy_stake_id)
+                legacy_position.value += 1
+            legacy_count.value = legacy_position.value
+
+        first_position = sp.local("first_position", sp.nat(0))
+        with sp.if_(page.offset > legacy_count.value):
+            first_position.value = sp.as_nat(page.offset - legacy_count.value)
+        last_position = sp.local("last_position", sp.nat(0))
+        with sp.if_(end.value > legacy_count.value):
+            last_position.value = sp.min(
+                sp.as_nat(end.value - legacy_count.value),
+                self.data.owner_stake_counts.get(page.owner, sp.nat(0)),
+            )
+        with sp.for_(
+            "position", sp.range(first_position.value, last_position.value)
+        ) as position:
+            stake_ids.value.push(
+                self.data.owner_stakes[OwnerPositionKey.make(page.owner, position)]
+            )
+        sp.result(stake_ids.value.rev())
 
     @sp.onchain_view()
     def view_stake(self, stake_id):
@@ -87,3 +87,61 @@ class Vault(sp.Contract):
 
         with sp.if_(sp.utils.mutez_to_nat(transfer_amount.amount) > 0):
             sp.send(transfer_amount.recipient, transfer_amount.amount)
+
+
+class LeanVault(sp.Contract):
+    """Lean variant of the vault. It does not notify the admin on incoming transfers, the admin reads the
+    balance lazily through the get_balance view instead. The storage is the same as the one of Vault (the admin
+    address only) and the default entrypoint is kept such that plain tez transfers are still accepted, it is
+    empty though: the set_vault_balance callback on every deposit and the self transfer after set_delegate are
+    saved.
+
+    Args:
+        (sp.Contract): this is a smartpy contract
+    """
+
+    def __init__(self, admin_address):
+        """takes an address as parameter to set the admin in storage.
+
+        Args:
+            admin_address (sp.address): the admin that controls this contract. Cannot be changed.
+        """
+        self.add_flag("initial-cast")
+        self.init(admin_address=admin_address)
+
+    @sp.entry_point
+    def set_delegate(self, delegate):
+        """entrypoint that sets the delegate. Only admin can call this
+        Pre: sp.sender == storage.admin_address
+        Post: sp.set_delegate(delegate)
+
+        Args:
+            delegate (sp.TOption(sp.TKeyHash)): delegate to set
+        """
+        sp.verify(sp.sender == self.data.admin_address, message=Errors.NOT_ADMIN)
+        sp.set_delegate(delegate)
+
+    @sp.entry_point
+    def default(self):
+        """default entrypoint to receive tez, the balance is read by the admin through get_balance"""
+        pass
+
+    @sp.entry_point
+    def withdraw(self, transfer_amount):
+        """entrypoint to withdraw the balance from the vault. Only admin can do this:
+        Pre: sp.sender == storage.admin_address
+        Post: send transfer_amount.amount to transfer_amount.recipient
+
+        Args:
+            transfer_amount (TransferAmount): the amount and recipient to transfer to
+        """
+        sp.verify(sp.sender == self.data.admin_address, message=Errors.NOT_ADMIN)
+        sp.set_type(transfer_amount, TransferAmount.get_type())
+
+        with sp.if_(sp.utils.mutez_to_nat(transfer_amount.amount) > 0):
+            sp.send(transfer_amount.recipient, transfer_amount.amount)
+
+    @sp.onchain_view()
+    def get_balance(self):
+        """Returns the balance of the vault"""
+        sp.result(sp.balance)
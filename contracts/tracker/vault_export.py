@@ -0,0 +1,169 @@
+"""Lambdas for the execute entrypoint of the v3 engines used to hand over the vaults of an engine that is migrated
+into another v3 engine (see import_vault_contexts and utils/migration.py). The lambda withdraws the collateral of the
+given owners to the custody address and deletes their vault contexts, the vaults of the source engine are disabled:
+they cannot mint, be liquidated or settled anymore and, for the tez engine, tez sent to an old vault are rejected
+(set_vault_balance fails without vault lookup). The custody address then imports the vault contexts together with the
+collateral into the target engine.
+"""
+
+import smartpy as sp
+
+import utils.constants as Constants
+import utils.error_codes as Errors
+import utils.fa1 as fa1
+import utils.fa2 as fa2
+from contracts.tracker.vault import TransferAmount
+
+
+def get_tez_vault_context_type():
+    """Returns the vault context type of the TezCollateralTrackerEngine, layouted
+
+    Returns:
+        sp.TRecord: the layouted vault context
+    """
+    return sp.TRecord(
+        address=sp.TAddress,
+        minted=sp.TNat,
+        balance=sp.TNat,
+        introducer=sp.TOption(sp.TAddress),
+    ).right_comb()
+
+
+def get_token_vault_context_type():
+    """Returns the vault context type of the TokenTrackerEngine, layouted
+
+    Returns:
+        sp.TRecord: the layouted vault context
+    """
+    return sp.TRecord(
+        minted=sp.TNat, balance=sp.TNat, introducer=sp.TOption(sp.TAddress)
+    ).right_comb()
+
+
+def build_tez_vault_export(owners, custody, lean_vaults=False):
+    """Builds the lambda for execute of a TezCollateralTrackerEngine that withdraws the vaults of the owners to the
+    custody address and deletes their vault contexts and vault lookups.
+
+    Args:
+        owners (list): the owner addresses of the vaults to export
+        custody (sp.TAddress): the recipient of the collateral, imports the vault contexts into the target engine
+        lean_vaults (bool, optional): the source engine originates LeanVaults, their balance is read through the
+            get_balance view. Defaults to False.
+
+    Returns:
+        function: the lambda to pass to execute
+    """
+
+    def export_vaults(params):
+        sp.set_type(
+            params,
+            sp.TPair(
+                sp.TBigMap(sp.TAddress, get_tez_vault_context_type()),
+                sp.TBigMap(sp.TAddress, sp.TAddress),
+            ),
+        )
+        vault_contexts = sp.local("vault_contexts", sp.fst(params))
+        vault_lookup = sp.local("vault_lookup", sp.snd(params))
+        operations = sp.local("operations", sp.list(t=sp.TOperation))
+
+        with sp.for_("owner", sp.list(owners, t=sp.TAddress)) as owner:
+            vault_context = sp.local("vault_context", vault_contexts.value[owner])
+            if lean_vaults:
+                vault_balance = sp.view(
+                    "get_balance", vault_context.value.address, sp.unit, t=sp.TMutez
+                ).open_some(Errors.INVALID_VIEW)
+            else:
+                vault_balance = sp.utils.nat_to_mutez(vault_context.value.balance)
+            withdraw_from_vault = sp.contract(
+                TransferAmount.get_type(),
+                vault_context.value.address,
+                entry_point="withdraw",
+            ).open_some()
+            operations.value.push(
+                sp.transfer_operation(
+                    TransferAmount.make(custody, vault_balance),
+                    sp.mutez(0),
+                    withdraw_from_vault,
+                )
+            )
+            del vault_lookup.value[vault_context.value.address]
+            del vault_contexts.value[owner]
+
+        sp.result(
+            sp.pair(
+                sp.pair(vault_contexts.value, vault_lookup.value), operations.value
+            )
+        )
+
+    return export_vaults
+
+
+def build_token_vault_export(
+    owners,
+    custody,
+    collateral_token_contract,
+    collateral_token_id=0,
+    collateral_token_type=Constants.TOKEN_TYPE_FA2,
+):
+    """Builds the lambda for execute of a TokenTrackerEngine that transfers the collateral of the owners to the custody
+    address and deletes their vault contexts.
+
+    Args:
+        owners (list): the owner addresses of the vaults to export
+        custody (sp.TAddress): the recipient of the collateral, imports the vault contexts into the target engine
+        collateral_token_contract (sp.TAddress): the collateral token of the source engine
+        collateral_token_id (int, optional): the collateral token id. Defaults to 0.
+        collateral_token_type (int, optional): Constants.TOKEN_TYPE_FA2 or Constants.TOKEN_TYPE_FA1. Defaults to
+            Constants.TOKEN_TYPE_FA2.
+
+    Returns:
+        function: the lambda to pass to execute
+    """
+
+    def export_vaults(vault_contexts):
+        sp.set_type(vault_contexts, sp.TBigMap(sp.TAddress, get_token_vault_context_type()))
+        exported_vault_contexts = sp.local("exported_vault_contexts", vault_contexts)
+        exported_balance = sp.local("exported_balance", sp.nat(0))
+        operations = sp.local("operations", sp.list(t=sp.TOperation))
+
+        with sp.for_("owner", sp.list(owners, t=sp.TAddress)) as owner:
+            exported_balance.value += exported_vault_contexts.value[owner].balance
+            del exported_vault_contexts.value[owner]
+
+        with sp.if_(exported_balance.value > 0):
+            if collateral_token_type == Constants.TOKEN_TYPE_FA2:
+                transfer_token_contract = sp.contract(
+                    fa2.Transfer.get_batch_type(),
+                    collateral_token_contract,
+                    entry_point="transfer",
+                ).open_some()
+                transfer_payload = [
+                    fa2.Transfer.item(
+                        sp.self_address,
+                        [
+                            sp.record(
+                                to_=custody,
+                                token_id=collateral_token_id,
+                                amount=exported_balance.value,
+                            )
+                        ],
+                    )
+                ]
+            else:
+                transfer_token_contract = sp.contract(
+                    fa1.FA1Transfer.get_type(),
+                    collateral_token_contract,
+                    entry_point="transfer",
+                ).open_some()
+                transfer_payload = fa1.FA1Transfer.item(
+                    sp.self_address, custody, exported_balance.value
+                )
+            operations.value.push(
+                sp.transfer_operation(
+                    transfer_payload, sp.mutez(0), transfer_token_contract
+                )
+            )
+
+        sp.result(sp.pair(exported_vault_contexts.value, operations.value))
+
+    return export_vaults
@@ -13,11 +13,34 @@ from contracts.tracker.async_token_tracker_engine import (
     RecipientTokenAmount,
     LedgerKey,
 )
-from contracts.tracker.governance_token import GovernanceToken
+from contracts.tracker.governance_token import GovernanceToken, Stake
+from contracts.tracker.stake_manager import StakeManager
 
 STARTING_BALANCE = 1000 * 10**12
 
 
+class StakeRecorder(sp.Contract):
+    """Records the stake updates it receives in place of the governance token"""
+
+    def __init__(self):
+        self.init(
+            update_stake_calls=sp.nat(0),
+            update_stakes_calls=sp.nat(0),
+            stakes=sp.list([], t=Stake.get_type()),
+        )
+
+    @sp.entry_point
+    def update_stake(self, stake):
+        sp.set_type(stake, Stake.get_type())
+        self.data.update_stake_calls += 1
+
+    @sp.entry_point
+    def update_stakes(self, stakes):
+        sp.set_type(stakes, sp.TList(Stake.get_type()))
+        self.data.update_stakes_calls += 1
+        self.data.stakes = stakes
+
+
 @sp.add_test(name="FA2 Engine Settlement Premium")
 def testFA2EngineSettlementPremium():
     scenario = sp.test_scenario()
@@ -602,3 +625,165 @@ def testFA2TrackerEngine():
     scenario += options_listing.execute_intent(
         address=alice.address, token_amount=Constants.PRECISION_FACTOR
     ).run(sender=bob, now=now)
+
+
+@sp.add_test(name="FA2 Engine Batch Touch Stakes")
+def testFA2EngineBatchTouchStakes():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Batch Touch Stakes Unit Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+    scenario.h2("Accounts")
+    scenario.show([administrator, alice, bob, dan])
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+
+    collateral_token_id = 1
+    token_id = 0
+
+    synth = fa2.AdministrableFA2(
+        {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
+    scenario += synth
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=collateral_token_id, token_info=sp.map())
+    ).run(sender=administrator.address)
+
+    tracker_engine = AsyncTokenTrackerEngine(
+        synth.address,
+        token_id,
+        synth.address,
+        collateral_token_id,
+        administrators=sp.big_map(
+            {LedgerKey.make(sp.nat(0), administrator.address): sp.unit}
+        ),
+        batch_touch_stakes=True,
+    )
+    scenario += tracker_engine
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=tracker_engine.address
+    ).run(sender=administrator)
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=tracker_engine.address)
+
+    scenario.p("Governance Token behind a Stake Manager")
+    governance_token = GovernanceToken(
+        dan.address, {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
+    scenario += governance_token
+    stake_manager = StakeManager(
+        governance_token.address,
+        sp.big_map(
+            {
+                fa2.LedgerKey.make(
+                    Constants.GOVERNANCE_TOKEN_ID, tracker_engine.address
+                ): sp.unit
+            }
+        ),
+    )
+    scenario += stake_manager
+    scenario += governance_token.set_administrator(
+        token_id=Constants.GOVERNANCE_TOKEN_ID,
+        administrator_to_set=stake_manager.address,
+    ).run(sender=administrator)
+
+    scenario += tracker_engine.set_contracts(
+        target_price_oracle=target_oracle.address,
+        reward_pool_contract=dan.address,
+        savings_pool_contract=bob.address,
+        governance_token_contract=stake_manager.address,
+        options_contract=Constants.DEFAULT_ADDRESS,
+    ).run(sender=administrator)
+
+    scenario.h2("Vaults (settlement on)")
+    owners = [alice, bob, dan]
+    for index, owner in enumerate(owners):
+        scenario += synth.mint(
+            RecipientTokenAmount.make(
+                owner.address, collateral_token_id, STARTING_BALANCE
+            )
+        ).run(sender=administrator.address)
+        scenario += synth.update_operators(
+            [
+                sp.variant(
+                    "add_operator",
+                    sp.record(
+                        owner=owner.address,
+                        operator=tracker_engine.address,
+                        token_id=collateral_token_id,
+                    ),
+                )
+            ]
+        ).run(sender=owner.address)
+        scenario += tracker_engine.create_vault(True).run(sender=owner)
+        scenario += tracker_engine.deposit(
+            sp.nat(100 * Constants.PRECISION_FACTOR)
+        ).run(sender=owner)
+        scenario += tracker_engine.mint(
+            sp.nat((index + 1) * 10 * Constants.PRECISION_FACTOR)
+        ).run(sender=owner)
+
+    def expected_stake(owner):
+        return Stake.make(
+            owner.address,
+            tracker_engine.data.vault_contexts[owner.address].minted
+            * tracker_engine.data.compound_interest_rate
+            * tracker_engine.data.target_price
+            // Constants.PRECISION_FACTOR,
+        )
+
+    scenario.h2("Touch updates the stakes on the Stake Manager and the Governance Token")
+    now = sp.timestamp(24 * 60 * 60)
+    scenario += target_oracle.set_price(800000)
+    scenario += tracker_engine.touch([bob.address, alice.address, dan.address]).run(
+        now=now
+    )
+    scenario.verify_equal(tracker_engine.data.target_price, 800000)
+    for owner in owners:
+        stake = expected_stake(owner)
+        scenario.verify_equal(
+            stake_manager.data.local_stakes[
+                sp.pair(tracker_engine.address, owner.address)
+            ],
+            stake.amount,
+        )
+        scenario.verify_equal(
+            stake_manager.data.global_stakes[owner.address], stake.amount
+        )
+        scenario.verify_equal(
+            governance_token.data.stakes[owner.address], stake.amount
+        )
+
+    scenario.h2("Touch sends all stakes in a single update_stakes call in order")
+    stake_recorder = StakeRecorder()
+    scenario += stake_recorder
+    scenario += tracker_engine.set_contracts(
+        target_price_oracle=target_oracle.address,
+        reward_pool_contract=dan.address,
+        savings_pool_contract=bob.address,
+        governance_token_contract=stake_recorder.address,
+        options_contract=Constants.DEFAULT_ADDRESS,
+    ).run(sender=administrator)
+    scenario += target_oracle.set_price(900000)
+    scenario += tracker_engine.touch([bob.address, alice.address, dan.address]).run(
+        now=now
+    )
+    scenario.verify_equal(stake_recorder.data.update_stakes_calls, 1)
+    scenario.verify_equal(stake_recorder.data.update_stake_calls, 0)
+    scenario.verify_equal(
+        stake_recorder.data.stakes,
+        [expected_stake(bob), expected_stake(alice), expected_stake(dan)],
+    )
+
+    scenario.p("No call without a vault allowing settlement")
+    scenario += tracker_engine.create_vault(False).run(sender=administrator)
+    scenario += tracker_engine.touch([administrator.address]).run(now=now)
+    scenario.verify_equal(stake_recorder.data.update_stakes_calls, 1)
@@ -663,3 +663,333 @@ def test():
         staking_token.data.ledger[alice_ledger_key],
         initial_balance + 14 * Constants.PRECISION_FACTOR,
     )
+
+
+@sp.add_test(name="CommitmentPool Balance View")
+def test():
+    scenario = sp.test_scenario()
+    scenario.h1("Commitment Pool Balance View Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+
+    token_id = sp.nat(0)
+    epoch_length = 4 * 7 * 24 * 60 * 60
+    max_cooldown_duration = 32 * epoch_length
+    max_withdraw_delay = 2 * 24 * 60 * 60  # 2 days
+
+    staking_token = DummyFA2({LedgerKey.make(token_id, administrator.address): sp.unit})
+    scenario += staking_token
+    scenario += staking_token.set_token_metadata(token_id=token_id, token_info=sp.map()).run(
+        sender=administrator
+    )
+
+    commitment_pool = CommitmentPool(
+        administrators=sp.big_map(l={administrator.address: 1}),
+        max_cooldown_duration=max_cooldown_duration,
+        epoch_length=epoch_length,
+        max_withdraw_delay=max_withdraw_delay,
+        kicker_reward_ratio=Ratio.make(10, 100),  # 10%
+        token_address=staking_token.address,
+        token_id=sp.nat(0),
+        use_balance_view=True,
+    )
+    scenario += commitment_pool
+
+    initial_balance = 1000 * Constants.PRECISION_FACTOR
+    for account in [alice, bob, dan]:
+        scenario += staking_token.mint(
+            owner=account.address, token_id=token_id, token_amount=initial_balance
+        )
+        scenario += staking_token.update_operators(
+            [
+                sp.variant(
+                    "add_operator",
+                    sp.record(
+                        owner=account.address,
+                        operator=commitment_pool.address,
+                        token_id=token_id,
+                    ),
+                )
+            ]
+        ).run(sender=account.address)
+
+    alice_ledger_key = LedgerKey.make(0, alice.address)
+    bob_ledger_key = LedgerKey.make(0, bob.address)
+    dan_ledger_key = LedgerKey.make(0, dan.address)
+    commitment_pool_key = LedgerKey.make(0, commitment_pool.address)
+
+    scenario.h2("Commitments without internal calls")
+    scenario += commitment_pool.commit(
+        sp.record(
+            amount=100 * Constants.PRECISION_FACTOR,
+            cooldown_duration=max_cooldown_duration,
+            stake_id=sp.none,
+        )
+    ).run(sender=alice.address)
+    scenario += commitment_pool.commit(
+        sp.record(
+            amount=100 * Constants.PRECISION_FACTOR,
+            cooldown_duration=max_cooldown_duration,
+            stake_id=sp.none,
+        )
+    ).run(sender=bob.address)
+    alice_stake_id = 0
+    bob_stake_id = 1
+    scenario.verify_equal(
+        commitment_pool.data.total_reward_stake_weight, 200 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        commitment_pool.data.previous_token_balance, 200 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[commitment_pool_key], 200 * Constants.PRECISION_FACTOR
+    )
+
+    scenario.h2("Rewards")
+    scenario += staking_token.mint(
+        owner=commitment_pool.address,
+        token_id=token_id,
+        token_amount=20 * Constants.PRECISION_FACTOR,
+    )
+    scenario += commitment_pool.update_parameters().run(sender=dan.address)
+    scenario.verify_equal(
+        commitment_pool.data.reward_factor,
+        Constants.PRECISION_FACTOR + Constants.PRECISION_FACTOR // 10,
+    )
+
+    scenario.h2("Cooldown and withdraw")
+    scenario += commitment_pool.enter_cooldown(alice_stake_id).run(sender=alice.address)
+    scenario.verify_equal(
+        commitment_pool.data.stakes[alice_stake_id].accumulated_rewards,
+        10 * Constants.PRECISION_FACTOR,
+    )
+    scenario += staking_token.mint(
+        owner=commitment_pool.address,
+        token_id=token_id,
+        token_amount=15 * Constants.PRECISION_FACTOR,
+    )
+    scenario += commitment_pool.withdraw(alice_stake_id).run(
+        sender=alice.address, now=sp.timestamp(max_cooldown_duration)
+    )
+    # alice received 10 YOUs with the full weight and 5 YOUs with the halved weight
+    scenario.verify_equal(
+        staking_token.data.ledger[alice_ledger_key],
+        initial_balance + 15 * Constants.PRECISION_FACTOR,
+    )
+
+    scenario.h2("Kickout")
+    scenario += commitment_pool.enter_cooldown(bob_stake_id).run(
+        sender=bob.address, now=sp.timestamp(max_cooldown_duration)
+    )
+    scenario += commitment_pool.kickout(bob_stake_id).run(
+        sender=dan.address,
+        now=sp.timestamp(2 * max_cooldown_duration + max_withdraw_delay + 1),
+    )
+    # bob received 10+10 YOUs, 10% goes to dan
+    scenario.verify_equal(
+        staking_token.data.ledger[bob_ledger_key],
+        initial_balance + 18 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[dan_ledger_key],
+        initial_balance + 2 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(commitment_pool.data.total_reward_stake_weight, 0)
+    scenario.verify_equal(commitment_pool.data.previous_token_balance, 0)
+
+
+@sp.add_test(name="CommitmentPool Batch Operations")
+def test():
+    scenario = sp.test_scenario()
+    scenario.h1("Commitment Pool Batch Operations Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+
+    token_id = sp.nat(0)
+    epoch_length = 4 * 7 * 24 * 60 * 60
+    max_cooldown_duration = 32 * epoch_length
+
+    staking_token = DummyFA2({LedgerKey.make(token_id, administrator.address): sp.unit})
+    scenario += staking_token
+    scenario += staking_token.set_token_metadata(token_id=token_id, token_info=sp.map()).run(
+        sender=administrator
+    )
+
+    commitment_pool = CommitmentPool(
+        administrators=sp.big_map(l={administrator.address: 1}),
+        max_cooldown_duration=max_cooldown_duration,
+        epoch_length=epoch_length,
+        token_address=staking_token.address,
+        token_id=sp.nat(0),
+    )
+    scenario += commitment_pool
+
+    initial_balance = 1000 * Constants.PRECISION_FACTOR
+    for account in [alice, bob]:
+        scenario += staking_token.mint(
+            owner=account.address, token_id=token_id, token_amount=initial_balance
+        )
+        scenario += staking_token.update_operators(
+            [
+                sp.variant(
+                    "add_operator",
+                    sp.record(
+                        owner=account.address,
+                        operator=commitment_pool.address,
+                        token_id=token_id,
+                    ),
+                )
+            ]
+        ).run(sender=account.address)
+
+    alice_ledger_key = LedgerKey.make(0, alice.address)
+    commitment_pool_key = LedgerKey.make(0, commitment_pool.address)
+
+    scenario.h2("Commit many")
+    scenario += commitment_pool.commit_many(
+        [
+            sp.record(
+                amount=100 * Constants.PRECISION_FACTOR,
+                cooldown_duration=max_cooldown_duration,
+                stake_id=sp.none,
+            ),
+            sp.record(
+                amount=100 * Constants.PRECISION_FACTOR,
+                cooldown_duration=max_cooldown_duration,
+                stake_id=sp.none,
+            ),
+        ]
+    ).run(sender=alice.address)
+    scenario.verify_equal(commitment_pool.data.stake_id_counter, 2)
+    scenario.verify_equal(commitment_pool.data.ledger[1], alice.address)
+    scenario.verify_equal(
+        commitment_pool.data.total_reward_stake_weight, 200 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        commitment_pool.data.previous_token_balance, 200 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[commitment_pool_key], 200 * Constants.PRECISION_FACTOR
+    )
+
+    scenario.p("Bob cannot commit to Alice's stake")
+    scenario += commitment_pool.commit_many(
+        [
+            sp.record(
+                amount=100 * Constants.PRECISION_FACTOR,
+                cooldown_duration=max_cooldown_duration,
+                stake_id=sp.none,
+            ),
+            sp.record(
+                amount=100 * Constants.PRECISION_FACTOR,
+                cooldown_duration=max_cooldown_duration,
+                stake_id=sp.some(1),
+            ),
+        ]
+    ).run(sender=bob.address, valid=False)
+
+    scenario.h2("Enter cooldown many")
+    scenario += staking_token.mint(
+        owner=commitment_pool.address,
+        token_id=token_id,
+        token_amount=20 * Constants.PRECISION_FACTOR,
+    )
+    scenario.p("A stake cannot enter cooldown twice")
+    scenario += commitment_pool.enter_cooldown_many([0, 0]).run(
+        sender=alice.address, valid=False
+    )
+    scenario += commitment_pool.enter_cooldown_many([0, 1]).run(
+        sender=bob.address, valid=False
+    )
+    scenario += commitment_pool.enter_cooldown_many([0, 1]).run(sender=alice.address)
+    scenario.verify_equal(
+        commitment_pool.data.stakes[0].accumulated_rewards, 10 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        commitment_pool.data.stakes[1].accumulated_rewards, 10 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        commitment_pool.data.total_reward_stake_weight, 100 * Constants.PRECISION_FACTOR
+    )
+
+    scenario.h2("Withdraw many")
+    scenario += commitment_pool.withdraw_many([0, 1]).run(
+        sender=alice.address, now=sp.timestamp(max_cooldown_duration - 1), valid=False
+    )
+    scenario += commitment_pool.withdraw_many([0, 0]).run(
+        sender=alice.address, now=sp.timestamp(max_cooldown_duration), valid=False
+    )
+    scenario += commitment_pool.withdraw_many([0, 1]).run(
+        sender=alice.address, now=sp.timestamp(max_cooldown_duration)
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[alice_ledger_key],
+        initial_balance + 20 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify(~commitment_pool.data.stakes.contains(0))
+    scenario.verify(~commitment_pool.data.ledger.contains(1))
+    scenario.verify_equal(commitment_pool.data.total_reward_stake_weight, 0)
+    scenario.verify_equal(commitment_pool.data.total_bailout_stake_weight, 0)
+    scenario.verify_equal(commitment_pool.data.previous_token_balance, 0)
+
+    scenario.h2("Kickout many")
+    max_withdraw_delay = 2 * 24 * 60 * 60
+    start = sp.timestamp(max_cooldown_duration)
+    for account in [alice, bob]:
+        scenario += commitment_pool.commit_many(
+            [
+                sp.record(
+                    amount=100 * Constants.PRECISION_FACTOR,
+                    cooldown_duration=epoch_length,
+                    stake_id=sp.none,
+                )
+            ]
+        ).run(sender=account.address, now=start)
+    scenario += commitment_pool.enter_cooldown_many([2]).run(sender=alice.address, now=start)
+    scenario += commitment_pool.enter_cooldown_many([3]).run(sender=bob.address, now=start)
+    kickout_time = start.add_seconds(epoch_length + max_withdraw_delay)
+    scenario.p("Stakes which cannot be kicked out yet are skipped")
+    total_reward_stake_weight = scenario.compute(
+        commitment_pool.data.total_reward_stake_weight
+    )
+    scenario += commitment_pool.kickout_many([2, 3]).run(
+        sender=administrator.address, now=kickout_time
+    )
+    scenario.verify(commitment_pool.data.stakes.contains(2))
+    scenario.verify(commitment_pool.data.stakes.contains(3))
+    scenario.verify_equal(
+        commitment_pool.data.total_reward_stake_weight, total_reward_stake_weight
+    )
+    scenario += staking_token.mint(
+        owner=commitment_pool.address,
+        token_id=token_id,
+        token_amount=10 * Constants.PRECISION_FACTOR,
+    )
+    scenario.p("Duplicates and stakes which do not exist are skipped")
+    scenario += commitment_pool.kickout_many([2, 2, 3, 7]).run(
+        sender=administrator.address, now=kickout_time.add_seconds(1)
+    )
+    scenario.verify(~commitment_pool.data.stakes.contains(2))
+    # both stakes received 5 YOUs, 10% of them goes to the kicker in a single transfer
+    scenario.verify_equal(
+        staking_token.data.ledger[LedgerKey.make(0, administrator.address)],
+        Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[LedgerKey.make(0, bob.address)],
+        initial_balance + 45 * Constants.PRECISION_FACTOR // 10,
+    )
+    scenario.verify(~commitment_pool.data.stakes.contains(3))
+    scenario.verify_equal(commitment_pool.data.total_reward_stake_weight, 0)
+    scenario.verify_equal(commitment_pool.data.previous_token_balance, 0)
@@ -1,9 +1,11 @@
+from random import Random
+
 import smartpy as sp
 
 import utils.constants as Constants
 import utils.fa2 as fa2
 
-from contracts.tracker.governance_token import GovernanceToken
+from contracts.tracker.governance_token import GovernanceToken, Stake
 
 
 @sp.add_test(name="Governance Token")
@@ -242,3 +244,161 @@ def test():
         (Constants.SECONDS_PER_WEEK * (Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> 2))
         >> Constants.TREASURY_REWARD_BITSHIFT,
     )  # treasury receives fair share
+
+    scenario.h2("Batched stake updates")
+    scenario.p("only an admin can update stakes")
+    now = sp.timestamp(Constants.SECONDS_PER_WEEK * 107)
+    scenario += governance_token.update_stakes(
+        [Stake.make(bob.address, 0), Stake.make(dan.address, Constants.PRECISION_FACTOR)]
+    ).run(sender=dan, now=now, valid=False)
+
+    scenario.p("bob leaves and dan joins in one call, bob's rewards are claimed")
+    bob_balance = scenario.compute(
+        governance_token.data.ledger[fa2.LedgerKey.make(0, bob.address)]
+    )
+    scenario += governance_token.update_stakes(
+        [Stake.make(bob.address, 0), Stake.make(dan.address, Constants.PRECISION_FACTOR)]
+    ).run(sender=administrator, now=now)
+    scenario.verify_equal(
+        governance_token.data.ledger[fa2.LedgerKey.make(0, bob.address)],
+        bob_balance
+        + Constants.SECONDS_PER_WEEK * (Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> 2) // 2,
+    )
+    scenario.verify_equal(governance_token.data.stakes.contains(bob.address), False)
+    scenario.verify_equal(
+        governance_token.data.stakes[dan.address], Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        governance_token.data.total_stake, 2 * Constants.PRECISION_FACTOR
+    )
+
+
+def reference_distribute(state, now):
+    """Reference implementation of the per phase distribution loop, used to check the contract bit by bit."""
+    if state["total_stake"] > 0:
+        start_phase = state["last_update_timestamp"] // Constants.ISSUANCE_PHASE_INTERVAL
+        end_phase = now // Constants.ISSUANCE_PHASE_INTERVAL
+        for phase in range(start_phase, end_phase):
+            phase_end_timestamp = (phase + 1) * Constants.ISSUANCE_PHASE_INTERVAL
+            issuance = (phase_end_timestamp - state["last_update_timestamp"]) * (
+                Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> phase
+            )
+            state["treasury"] += issuance >> Constants.TREASURY_REWARD_BITSHIFT
+            state["dist_factor"] += (
+                issuance * Constants.PRECISION_FACTOR // state["total_stake"]
+            )
+            state["last_update_timestamp"] = phase_end_timestamp
+        issuance = (now - state["last_update_timestamp"]) * (
+            Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE >> end_phase
+        )
+        state["treasury"] += issuance >> Constants.TREASURY_REWARD_BITSHIFT
+        state["dist_factor"] += (
+            issuance * Constants.PRECISION_FACTOR // state["total_stake"]
+        )
+        state["last_update_timestamp"] = now
+
+
+@sp.add_test(name="Governance Token Cross Phase Issuance")
+def test_cross_phase_issuance():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Governance Token Cross Phase Issuance")
+
+    administrator = sp.test_account("Administrator")
+    bob = sp.test_account("Robert")
+
+    random = Random(20221010)
+    for run in range(4):
+        scenario.h2("Randomized run %d" % run)
+        governance_token = GovernanceToken(
+            administrator.address,
+            {fa2.LedgerKey.make(0, administrator.address): sp.unit},
+        )
+        scenario += governance_token
+        state = dict(total_stake=0, dist_factor=0, treasury=0, last_update_timestamp=0)
+
+        now = random.randrange(0, 3 * Constants.ISSUANCE_PHASE_INTERVAL)
+        for step in range(12):
+            if step == 0 or random.random() < 0.3:
+                amount = random.randrange(1, 10**16)
+                scenario += governance_token.update_stake(
+                    address=bob.address, amount=amount
+                ).run(sender=administrator, now=sp.timestamp(now))
+                reference_distribute(state, now)
+                state["total_stake"] = amount
+            else:
+                scenario += governance_token.claim().run(
+                    sender=bob, now=sp.timestamp(now)
+                )
+                reference_distribute(state, now)
+
+            scenario.verify_equal(governance_token.data.dist_factor, state["dist_factor"])
+            scenario.verify_equal(
+                governance_token.data.last_update_timestamp,
+                sp.timestamp(state["last_update_timestamp"]),
+            )
+            scenario.verify_equal(
+                governance_token.data.ledger[
+                    fa2.LedgerKey.make(0, administrator.address)
+                ],
+                state["treasury"],
+            )
+
+            # from a few seconds up to idling beyond the last issuing phase
+            now += random.choice(
+                [
+                    random.randrange(1, Constants.SECONDS_PER_WEEK),
+                    random.randrange(1, 3 * Constants.ISSUANCE_PHASE_INTERVAL),
+                    random.randrange(1, 40 * Constants.ISSUANCE_PHASE_INTERVAL),
+                ]
+            )
+
+
+@sp.add_test(name="Governance Token Claim For")
+def test_claim_for():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Governance Token Claim For")
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+
+    governance_token = GovernanceToken(
+        administrator.address, {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
+    scenario += governance_token
+
+    now = sp.timestamp(0)
+    scenario += governance_token.update_stakes(
+        [
+            Stake.make(alice.address, Constants.PRECISION_FACTOR),
+            Stake.make(bob.address, Constants.PRECISION_FACTOR),
+        ]
+    ).run(sender=administrator, now=now)
+
+    scenario.h2("Dan claims for alice, bob and himself (without stake)")
+    now = sp.timestamp(Constants.SECONDS_PER_WEEK)
+    scenario += governance_token.claim_for(
+        [alice.address, bob.address, dan.address]
+    ).run(sender=dan, now=now)
+    scenario.verify_equal(
+        governance_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
+        Constants.SECONDS_PER_WEEK * Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE // 2,
+    )
+    scenario.verify_equal(
+        governance_token.data.ledger[fa2.LedgerKey.make(0, bob.address)],
+        Constants.SECONDS_PER_WEEK * Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE // 2,
+    )
+    scenario.verify_equal(
+        governance_token.data.ledger.contains(fa2.LedgerKey.make(0, dan.address)),
+        False,
+    )
+
+    scenario.h2("Claiming again in the same block does not mint anything")
+    scenario += governance_token.claim_for([alice.address]).run(sender=dan, now=now)
+    scenario.verify_equal(
+        governance_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
+        Constants.SECONDS_PER_WEEK * Constants.GOVERNANCE_TOKEN_ISSUANCE_RATE // 2,
+    )
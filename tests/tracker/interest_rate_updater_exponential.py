@@ -177,3 +177,64 @@ def test():
     now = now.add_seconds(Constants.SECONDS_PER_WEEK)
     scenario += interest_rate_updater.interest_rate_update().run(sender=alice, now=now)
     scenario.show(interest_rate_updater.data.reference_interest_rate)
+
+
+@sp.add_test(name="Interest Rate Response Exponential View Prices")
+def test():
+    scenario = sp.test_scenario()
+    scenario.h1("Interest Rate Response View Prices Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    alice = sp.test_account("Alice")
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+    observed_oracle = DummyOracle()
+    scenario += observed_oracle
+    interest_rate_updater = InterestRateUpdaterExponential(
+        [Constants.DEFAULT_ADDRESS], target_oracle.address, observed_oracle.address
+    )
+    scenario += interest_rate_updater
+    view_interest_rate_updater = InterestRateUpdaterExponential(
+        [Constants.DEFAULT_ADDRESS],
+        target_oracle.address,
+        observed_oracle.address,
+        use_price_views=True,
+    )
+    scenario += view_interest_rate_updater
+
+    scenario.h3("Update Interest Rate on track")
+    scenario.p("Will fail if called prematurely")
+    scenario += view_interest_rate_updater.interest_rate_update().run(
+        sender=alice, valid=False
+    )
+
+    scenario.p("The internal entrypoint stays internal")
+    scenario += view_interest_rate_updater.internal_interest_rate_update().run(
+        sender=alice, now=sp.timestamp(Constants.SECONDS_PER_WEEK), valid=False
+    )
+
+    scenario.h3("Same response as with callbacks")
+    now = sp.timestamp(0)
+    for observed_price in [1000000, 500000, 900000, 1000000, 1100000, 10**20, 0]:
+        now = now.add_seconds(Constants.SECONDS_PER_WEEK)
+        scenario += observed_oracle.set_price(observed_price)
+        scenario += interest_rate_updater.interest_rate_update().run(
+            sender=alice, now=now
+        )
+        scenario += view_interest_rate_updater.interest_rate_update().run(
+            sender=alice, now=now
+        )
+        scenario.verify_equal(
+            view_interest_rate_updater.data.reference_interest_rate,
+            interest_rate_updater.data.reference_interest_rate,
+        )
+        scenario.verify_equal(
+            view_interest_rate_updater.data.observed_price, observed_price
+        )
+
+    scenario.p("Cannot call in same epoch...")
+    scenario += view_interest_rate_updater.interest_rate_update().run(
+        sender=alice, now=now, valid=False
+    )
@@ -180,3 +180,115 @@ def test():
     ).run(sender=administrator)
     scenario += liquidity_farm.withdraw().run(sender=alice)
     scenario.verify_equal(governance_token.data.stakes.contains(alice.address), False)
+
+    scenario.h2("Partial Withdraw")
+    scenario += liquidity_farm.set_incentive_factor(Constants.PRECISION_FACTOR).run(
+        sender=administrator
+    )
+    scenario += liquidity_farm.deposit(Constants.PRECISION_FACTOR).run(sender=alice)
+    scenario += liquidity_farm.partial_withdraw(2 * Constants.PRECISION_FACTOR).run(
+        sender=alice, valid=False
+    )
+    scenario += liquidity_farm.partial_withdraw(Constants.PRECISION_FACTOR // 4).run(
+        sender=alice
+    )
+    scenario.verify_equal(
+        liquidity_farm.data.stakes[alice.address],
+        sp.nat(3 * Constants.PRECISION_FACTOR // 4),
+    )
+    scenario.verify_equal(
+        governance_token.data.stakes[alice.address],
+        sp.nat(3 * Constants.PRECISION_FACTOR // 4),
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[fa2.LedgerKey.make(token_id, alice.address)],
+        sp.nat(Constants.PRECISION_FACTOR // 4),
+    )
+    scenario += liquidity_farm.partial_withdraw(
+        3 * Constants.PRECISION_FACTOR // 4
+    ).run(sender=alice)
+    scenario.verify_equal(liquidity_farm.data.stakes.contains(alice.address), False)
+    scenario.verify_equal(governance_token.data.stakes.contains(alice.address), False)
+
+    scenario.h2("Deferred Stake Updates")
+    deferred_liquidity_farm = LiquidityFarm(
+        staking_token.address,
+        token_id,
+        stake_manager.address,
+        {
+            fa2.LedgerKey.make(
+                Constants.GOVERNANCE_TOKEN_ID, administrator.address
+            ): sp.unit
+        },
+        deferred_stake_updates=True,
+    )
+    scenario += deferred_liquidity_farm
+    scenario += stake_manager.set_administrator(
+        token_id=token_id, administrator_to_set=deferred_liquidity_farm.address
+    ).run(sender=administrator)
+    scenario += staking_token.update_operators(
+        [
+            sp.variant(
+                "add_operator",
+                sp.record(
+                    owner=bob.address,
+                    operator=deferred_liquidity_farm.address,
+                    token_id=token_id,
+                ),
+            )
+        ]
+    ).run(sender=bob.address)
+
+    scenario.p("Only admin can set the threshold")
+    scenario += deferred_liquidity_farm.set_stake_sync_threshold(
+        Constants.PRECISION_FACTOR // 10
+    ).run(sender=bob, valid=False)
+    scenario += deferred_liquidity_farm.set_stake_sync_threshold(
+        Constants.PRECISION_FACTOR // 10
+    ).run(sender=administrator)
+
+    scenario.p("First deposit is always pushed")
+    scenario += deferred_liquidity_farm.deposit(Constants.PRECISION_FACTOR // 2).run(
+        sender=bob
+    )
+    scenario.verify_equal(
+        governance_token.data.stakes[bob.address], sp.nat(Constants.PRECISION_FACTOR // 2)
+    )
+
+    scenario.p("Changes within the threshold are not pushed")
+    scenario += deferred_liquidity_farm.deposit(Constants.PRECISION_FACTOR // 20).run(
+        sender=bob
+    )
+    scenario += deferred_liquidity_farm.partial_withdraw(
+        Constants.PRECISION_FACTOR // 10
+    ).run(sender=bob)
+    scenario.verify_equal(
+        governance_token.data.stakes[bob.address], sp.nat(Constants.PRECISION_FACTOR // 2)
+    )
+    scenario.verify_equal(
+        deferred_liquidity_farm.data.stakes[bob.address],
+        sp.nat(9 * Constants.PRECISION_FACTOR // 20),
+    )
+
+    scenario.p("Anyone can sync a stake")
+    scenario += deferred_liquidity_farm.sync_stake(bob.address).run(sender=dan)
+    scenario.verify_equal(
+        governance_token.data.stakes[bob.address],
+        sp.nat(9 * Constants.PRECISION_FACTOR // 20),
+    )
+
+    scenario.p("Changes above the threshold are pushed")
+    scenario += deferred_liquidity_farm.deposit(Constants.PRECISION_FACTOR // 2).run(
+        sender=bob
+    )
+    scenario.verify_equal(
+        governance_token.data.stakes[bob.address],
+        sp.nat(19 * Constants.PRECISION_FACTOR // 20),
+    )
+
+    scenario.p("Exits are always pushed")
+    scenario += deferred_liquidity_farm.withdraw().run(sender=bob)
+    scenario.verify_equal(governance_token.data.stakes.contains(bob.address), False)
+    scenario.verify_equal(
+        deferred_liquidity_farm.data.synced_stakes.contains(bob.address), False
+    )
@@ -31,9 +31,37 @@ class DummyFA2(fa2.AdministrableFA2):
             ] = recipient_token_amount.token_amount
 
 
+class NoSelfTransferFA2(DummyFA2):
+    """FA2 which rejects self-transfers, the pool used to make one on every claim for indexing purposes"""
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def transfer(self, transfers):
+        sp.set_type(transfers, fa2.Transfer.get_batch_type())
+        with sp.for_("transfer", transfers) as transfer:
+            with sp.for_("tx", transfer.txs) as tx:
+                sp.verify(transfer.from_ != tx.to_, message="SELF_TRANSFER")
+                sp.verify(
+                    (sp.sender == transfer.from_)
+                    | self.data.operators.contains(
+                        fa2.OperatorKey.make(tx.token_id, transfer.from_, sp.sender)
+                    ),
+                    message=fa2.FA2ErrorMessage.NOT_OPERATOR,
+                )
+                from_user_ledger_key = fa2.LedgerKey.make(tx.token_id, transfer.from_)
+                to_user_ledger_key = fa2.LedgerKey.make(tx.token_id, tx.to_)
+                self.data.ledger[from_user_ledger_key] = sp.as_nat(
+                    self.data.ledger.get(from_user_ledger_key, 0) - tx.amount,
+                    message=fa2.FA2ErrorMessage.INSUFFICIENT_BALANCE,
+                )
+                self.data.ledger[to_user_ledger_key] = (
+                    self.data.ledger.get(to_user_ledger_key, 0) + tx.amount
+                )
+
+
 @sp.add_test(name="Normal Staking Pool")
 def test_normal_staking_pool():
     scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
     scenario.h1("Staking Pool Unit Test")
     scenario.table_of_contents()
 
@@ -254,6 +282,7 @@ def test_normal_staking_pool():
 @sp.add_test(name="Vesting Staking Pool")
 def test_vesting_incentive():
     scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
     scenario.h1("Staking Pool Unit Test")
     scenario.table_of_contents()
 
@@ -267,7 +296,9 @@ def test_vesting_incentive():
 
     scenario.show([administrator, alice, bob, dan])
 
-    reward_token = DummyFA2({fa2.LedgerKey.make(0, administrator.address): sp.unit})
+    reward_token = NoSelfTransferFA2(
+        {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
     staking_token = DummyFA2({fa2.LedgerKey.make(0, administrator.address): sp.unit})
 
     scenario += reward_token
@@ -359,9 +390,20 @@ def test_vesting_incentive():
     scenario += reward_token.mint(
         owner=staking_pool.address, token_id=token_id, token_amount=reward_amount
     )
-    scenario.p("alice claims as only user -> gets full reward")
+    scenario.p(
+        "alice claims as only user -> gets half of the reward, the rest is redistributed without self-transfer"
+    )
     scenario += staking_pool.claim().run(sender=alice, now=now)
     scenario.verify_equal(reward_token.data.ledger[alice_ledger_key], alice_reward)
+    scenario.verify_equal(
+        reward_token.data.ledger[fa2.LedgerKey.make(0, staking_pool.address)],
+        reward_amount - alice_reward,
+    )
+    scenario.verify_equal(
+        staking_pool.data.stakes[alice.address].dist_factor, reward_amount
+    )
+    scenario.p("the unreleased reward stays in the pool and is redistributed by the next claim")
+    scenario.verify_equal(staking_pool.data.last_reward_balance, 0)
     scenario.p("Multiclaim yields the re-distributed rewards")
     alice_reward += (reward_amount - alice_reward) // 2
     scenario += staking_pool.claim().run(sender=alice, now=now)
@@ -499,3 +541,105 @@ def test_vesting_incentive():
         sender=administrator, now=now, valid=True
     )
     scenario.verify(staking_pool.data.max_release_period == 360 * 24 * 60 * 60)
+
+
+@sp.add_test(name="Long Staking Pool Balance View")
+def test_balance_view_staking_pool():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
+    scenario.h1("Long Staking Pool Balance View Unit Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    token_id = sp.nat(0)
+    max_release_period = 100
+    reward = 1000
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+
+    reward_token = DummyFA2({fa2.LedgerKey.make(0, administrator.address): sp.unit})
+    staking_token = DummyFA2({fa2.LedgerKey.make(0, administrator.address): sp.unit})
+    scenario += reward_token
+    scenario += staking_token
+    scenario += reward_token.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=administrator)
+    scenario += staking_token.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=administrator)
+
+    staking_pool = LongStakingPool(
+        staking_token.address,
+        token_id,
+        Constants.TOKEN_TYPE_FA2,
+        reward_token.address,
+        token_id,
+        max_release_period,
+        sp.big_map({administrator.address: AdministratorState.SET}),
+        use_balance_view=True,
+    )
+    scenario += staking_pool
+
+    for account in [alice, bob]:
+        scenario += staking_token.mint(
+            owner=account.address,
+            token_id=token_id,
+            token_amount=10 * Constants.PRECISION_FACTOR,
+        )
+        scenario += staking_token.update_operators(
+            [
+                sp.variant(
+                    "add_operator",
+                    sp.record(
+                        owner=account.address,
+                        operator=staking_pool.address,
+                        token_id=token_id,
+                    ),
+                )
+            ]
+        ).run(sender=account.address)
+    alice_ledger_key = fa2.LedgerKey.make(0, alice.address)
+    bob_ledger_key = fa2.LedgerKey.make(0, bob.address)
+    staking_pool_ledger_key = fa2.LedgerKey.make(0, staking_pool.address)
+
+    scenario.h2("Alice deposits and claims the reward in the same call")
+    now = sp.timestamp(0)
+    scenario += staking_pool.deposit(10 * Constants.PRECISION_FACTOR).run(
+        sender=alice, now=now
+    )
+    scenario += reward_token.mint(
+        owner=staking_pool.address, token_id=token_id, token_amount=reward
+    ).run(now=now)
+    now = now.add_seconds(max_release_period)
+    scenario += staking_pool.claim().run(sender=alice, now=now)
+    scenario.verify_equal(reward_token.data.ledger[alice_ledger_key], reward)
+    scenario.verify_equal(reward_token.data.ledger[staking_pool_ledger_key], 0)
+    scenario.verify_equal(staking_pool.data.last_reward_balance, 0)
+
+    scenario.h2("Bob joins after a reward and gets none of it")
+    scenario += reward_token.mint(
+        owner=staking_pool.address, token_id=token_id, token_amount=reward
+    ).run(now=now)
+    scenario += staking_pool.deposit(10 * Constants.PRECISION_FACTOR).run(
+        sender=bob, now=now
+    )
+    scenario.verify_equal(
+        staking_pool.data.stakes[bob.address].dist_factor,
+        staking_pool.data.dist_factor,
+    )
+
+    scenario.h2("Both withdraw")
+    now = now.add_seconds(max_release_period)
+    scenario += staking_pool.withdraw().run(sender=alice, now=now)
+    scenario += staking_pool.withdraw().run(sender=bob, now=now)
+    scenario.verify_equal(reward_token.data.ledger[alice_ledger_key], 2 * reward)
+    scenario.verify_equal(reward_token.data.ledger.get(bob_ledger_key, 0), 0)
+    scenario.verify_equal(
+        staking_token.data.ledger[alice_ledger_key], 10 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        staking_token.data.ledger[bob_ledger_key], 10 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(staking_pool.data.total_stake, 0)
@@ -496,3 +496,103 @@ def test():
     scenario.verify_equal(
         savings_pool.balance, sp.mutez(2)
     )  # flooring error of 2 mutez...
+
+
+@sp.add_test(name="Savings Pool Balance View")
+def test():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
+    scenario.h1("Savings Pool Balance View Unit Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    token_id = sp.nat(0)
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+
+    staking_token = DummyFA2(
+        {fa2.LedgerKey.make(token_id, administrator.address): sp.unit}
+    )
+    scenario += staking_token
+    scenario += staking_token.set_token_metadata(
+        token_id=token_id, token_info=sp.map()
+    ).run(sender=administrator)
+
+    savings_pool = SavingsPool(
+        staking_token.address,
+        token_id,
+        {fa2.LedgerKey.make(sp.nat(0), administrator.address): sp.unit},
+        use_balance_view=True,
+    )
+    scenario += savings_pool
+
+    vesting_contract = vester.Vester(staking_token.address, token_id)
+    scenario += vesting_contract
+    scenario += savings_pool.set_vesting_contract(
+        sp.record(
+            contract=vesting_contract.address,
+            duration_in_seconds=Constants.DEFAULT_VESTING_DURATION_IN_SECONDS,
+        )
+    ).run(sender=administrator)
+
+    for account in [alice, bob]:
+        scenario += staking_token.mint(
+            owner=account.address,
+            token_id=token_id,
+            token_amount=1 * Constants.PRECISION_FACTOR,
+        )
+        scenario += staking_token.update_operators(
+            [
+                sp.variant(
+                    "add_operator",
+                    sp.record(
+                        owner=account.address,
+                        operator=savings_pool.address,
+                        token_id=token_id,
+                    ),
+                )
+            ]
+        ).run(sender=account.address)
+
+    scenario.h2("Alice deposits")
+    scenario += savings_pool.deposit(1 * Constants.PRECISION_FACTOR).run(sender=alice)
+    scenario.verify_equal(
+        savings_pool.data.stakes[alice.address], 1 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        savings_pool.data.last_balance, 1 * Constants.PRECISION_FACTOR
+    )
+
+    scenario.h2("The reward is accounted by the deposit of Bob")
+    scenario += staking_token.mint(
+        owner=savings_pool.address,
+        token_id=token_id,
+        token_amount=1 * Constants.PRECISION_FACTOR,
+    )
+    scenario += savings_pool.deposit(1 * Constants.PRECISION_FACTOR).run(sender=bob)
+    scenario.verify_equal(
+        savings_pool.data.disc_factor, 2 * Constants.PRECISION_FACTOR
+    )
+    scenario.verify_equal(
+        savings_pool.data.stakes[bob.address], 1 * Constants.PRECISION_FACTOR // 2
+    )
+    scenario.verify_equal(
+        savings_pool.data.last_balance, 3 * Constants.PRECISION_FACTOR
+    )
+
+    scenario.h2("Both withdraw to the vesting contract")
+    now = sp.timestamp(Constants.SECONDS_PER_WEEK)
+    scenario += savings_pool.withdraw().run(sender=alice, now=now)
+    scenario.verify_equal(
+        staking_token.data.ledger[fa2.LedgerKey.make(0, vesting_contract.address)],
+        2 * Constants.PRECISION_FACTOR,
+    )
+    scenario += savings_pool.withdraw().run(sender=bob, now=now)
+    scenario.verify_equal(
+        staking_token.data.ledger[fa2.LedgerKey.make(0, vesting_contract.address)],
+        3 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(savings_pool.data.total_stake, 0)
+    scenario.verify_equal(savings_pool.data.last_balance, 0)
@@ -1,7 +1,9 @@
 import smartpy as sp
 
 import utils.constants as Constants
+import utils.error_codes as Errors
 import utils.fa2 as fa2
+from utils.stake_import import compute_checksum, order_stakes, plan_import
 
 from contracts.tracker.governance_token import Stake
 from contracts.tracker.governance_token import GovernanceToken
@@ -300,3 +302,249 @@ def test():
     scenario.verify_equal(
         stake_manager.data.global_stakes[bob.address], sp.nat(1)
     )  # bob was already in the global stakes once so he cannot be imported.
+
+    scenario.h2("Batched Stake Updates")
+    scenario.p("Only an admin can update stakes")
+    scenario += stake_manager.update_stakes(
+        [Stake.make(alice.address, sp.nat(10)), Stake.make(dan.address, sp.nat(5))]
+    ).run(sender=alice, valid=False)
+
+    scenario.p("All stakes are forwarded in one call")
+    scenario += stake_manager.update_stakes(
+        [Stake.make(alice.address, sp.nat(10)), Stake.make(dan.address, sp.nat(5))]
+    ).run(sender=source2)
+    scenario.verify_equal(stake_manager.data.global_stakes[alice.address], sp.nat(10))
+    scenario.verify_equal(stake_manager.data.global_stakes[dan.address], sp.nat(18))
+    scenario.verify_equal(stake_manager.data.total_stake, sp.nat(29))
+    scenario.verify_equal(governance_token.data.stakes[alice.address], sp.nat(10))
+    scenario.verify_equal(governance_token.data.stakes[dan.address], sp.nat(18))
+
+    scenario.p("Later stakes of the same source and address win")
+    scenario += stake_manager.update_stakes(
+        [Stake.make(alice.address, sp.nat(3)), Stake.make(alice.address, sp.nat(0))]
+    ).run(sender=source2)
+    scenario.verify_equal(stake_manager.data.global_stakes.contains(alice.address), False)
+    scenario.verify_equal(governance_token.data.stakes.contains(alice.address), False)
+    scenario.verify_equal(stake_manager.data.total_stake, sp.nat(19))
+
+
+    scenario.h2("Resumable Stake Import")
+    planned_stakes = order_stakes(
+        [
+            {
+                "updater": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+                "owner": "tz1aSkwEot3L2kmUvcoxzjMomb9mvBNuzFK6",
+                "amount": 7,
+            },
+            {
+                "updater": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+                "owner": "tz29EDhZ4D3XueHxm5RGZsJLHRtj3qSA2MzH",
+                "amount": 8,
+            },
+            {
+                "updater": "KT1TezoooozzSmartPyzzSTATiCzzzwwBFA1",
+                "owner": "tz3WEJYwJ6pPwVbSL8FrSoAXRmFHHZTuEnMA",
+                "amount": 9,
+            },
+        ]
+    )
+    import_stake1, import_stake2, import_stake3 = [
+        sp.record(
+            updater=sp.address(stake["updater"]),
+            owner=sp.address(stake["owner"]),
+            amount=sp.nat(stake["amount"]),
+        )
+        for stake in planned_stakes
+    ]
+    eve, frank, gina = [sp.address(stake["owner"]) for stake in planned_stakes]
+
+    scenario.p("Chunks need an open session")
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=1, offset=0, stakes=[import_stake1]
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_SESSION)
+
+    scenario.p("Only an admin can open a session")
+    scenario += stake_manager.start_import_session(
+        session_id=1, expected_count=3
+    ).run(sender=alice, valid=False)
+    scenario += stake_manager.start_import_session(
+        session_id=1, expected_count=3
+    ).run(sender=administrator)
+    scenario += stake_manager.start_import_session(
+        session_id=2, expected_count=3
+    ).run(sender=administrator, valid=False)
+
+    scenario.p("First chunk")
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=1, offset=0, stakes=[import_stake1, import_stake2]
+    ).run(sender=administrator)
+    scenario.verify_equal(stake_manager.data.global_stakes[eve], sp.nat(7))
+    scenario.verify_equal(stake_manager.data.global_stakes[frank], sp.nat(8))
+    scenario.verify_equal(stake_manager.import_session().open_some().imported_count, sp.nat(2))
+
+    scenario.p("The on-chain checksum matches the off-chain chain")
+    scenario.verify_equal(
+        stake_manager.import_session().open_some().checksum,
+        sp.bytes("0x" + compute_checksum(planned_stakes[:2]).hex()),
+    )
+
+    scenario.p("Re-sent chunks and wrong sessions fail")
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=1, offset=0, stakes=[import_stake1, import_stake2]
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_OFFSET)
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=2, offset=2, stakes=[import_stake3]
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_SESSION)
+
+    scenario.p("Cannot import more than expected")
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=1, offset=2, stakes=[import_stake3, import_stake3]
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_COUNT)
+
+    scenario.p("Cannot close before all stakes are imported")
+    checksum = sp.bytes("0x" + compute_checksum(planned_stakes).hex())
+    scenario += stake_manager.close_import_session(
+        session_id=1, checksum=checksum
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_COUNT)
+
+    scenario.p("Resume at the imported count")
+    resume_plan = plan_import(planned_stakes, 1, 2200, resume_from=2)
+    scenario.verify_equal(
+        stake_manager.import_session().open_some().checksum,
+        sp.bytes(resume_plan["resume_checksum"]),
+    )
+    scenario += stake_manager.import_stakes_chunk(
+        session_id=1, offset=2, stakes=[import_stake3]
+    ).run(sender=administrator)
+    scenario.verify_equal(stake_manager.data.global_stakes[gina], sp.nat(9))
+    scenario.verify_equal(stake_manager.data.total_stake, sp.nat(43))
+
+    scenario.p("Close with matching checksum")
+    scenario += stake_manager.close_import_session(
+        session_id=2, checksum=checksum
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_SESSION)
+    scenario += stake_manager.close_import_session(
+        session_id=1, checksum=sp.bytes("0x00")
+    ).run(sender=administrator, valid=False, exception=Errors.INVALID_IMPORT_CHECKSUM)
+    scenario.verify_equal(
+        stake_manager.import_session().open_some().checksum,
+        sp.bytes(resume_plan["close"]["checksum"]),
+    )
+    scenario += stake_manager.close_import_session(
+        session_id=1, checksum=checksum
+    ).run(sender=administrator)
+    scenario.verify_equal(stake_manager.data.import_session.is_none(), True)
+
+    scenario.p("Cancel an open session")
+    scenario += stake_manager.start_import_session(
+        session_id=2, expected_count=1
+    ).run(sender=administrator)
+    scenario += stake_manager.cancel_import_session().run(sender=alice, valid=False)
+    scenario += stake_manager.cancel_import_session().run(sender=administrator)
+    scenario.verify_equal(stake_manager.data.import_session.is_none(), True)
+
+
+@sp.add_test(name="Stake Manager Fixed Stake Refresh")
+def test():
+    scenario = sp.test_scenario()
+    scenario.h1("Governance Stake Manager Fixed Stake Refresh")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    source1 = sp.test_account("Source1")
+    fixed_stake1 = sp.test_account("Fixed Stake Receiver 1")
+    fixed_stake2 = sp.test_account("Fixed Stake Receiver 2")
+
+    governance_token = GovernanceToken(
+        administrator.address,
+        {
+            fa2.LedgerKey.make(
+                Constants.GOVERNANCE_TOKEN_ID, administrator.address
+            ): sp.unit
+        },
+    )
+    scenario += governance_token
+
+    stake_manager = StakeManager(
+        governance_token.address,
+        sp.big_map(
+            {
+                fa2.LedgerKey.make(
+                    Constants.GOVERNANCE_TOKEN_ID, administrator.address
+                ): sp.unit,
+                fa2.LedgerKey.make(
+                    Constants.GOVERNANCE_TOKEN_ID, source1.address
+                ): sp.unit,
+            }
+        ),
+        auto_refresh_fixed_stakes=True,
+    )
+    scenario += stake_manager
+    scenario += governance_token.set_administrator(
+        token_id=Constants.GOVERNANCE_TOKEN_ID,
+        administrator_to_set=stake_manager.address,
+    ).run(sender=administrator)
+
+    scenario += stake_manager.set_fixed_stake(
+        address=fixed_stake1.address, ratio=int(0.2 * Constants.PRECISION_FACTOR)
+    ).run(sender=administrator)
+    scenario += stake_manager.set_fixed_stake(
+        address=fixed_stake2.address, ratio=int(0.1 * Constants.PRECISION_FACTOR)
+    ).run(sender=administrator)
+
+    scenario.h2("Only an admin can set the threshold")
+    scenario += stake_manager.set_fixed_stake_refresh_threshold(
+        int(0.1 * Constants.PRECISION_FACTOR)
+    ).run(sender=alice, valid=False)
+
+    scenario.h2("No refresh without threshold")
+    scenario += stake_manager.update_stake(Stake.make(alice.address, sp.nat(100))).run(
+        sender=source1
+    )
+    scenario.verify_equal(governance_token.data.stakes.contains(fixed_stake1.address), False)
+    scenario.verify_equal(governance_token.data.total_stake, sp.nat(100))
+
+    scenario.h2("Refresh on first update above threshold")
+    scenario += stake_manager.set_fixed_stake_refresh_threshold(
+        int(0.1 * Constants.PRECISION_FACTOR)
+    ).run(sender=administrator)
+    scenario += stake_manager.update_stake(Stake.make(bob.address, sp.nat(100))).run(
+        sender=source1
+    )
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake1.address], sp.nat(40))
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake2.address], sp.nat(20))
+    scenario.verify_equal(stake_manager.data.fixed_stake_reference, sp.nat(200))
+    scenario.verify_equal(governance_token.data.total_stake, sp.nat(260))
+
+    scenario.h2("Changes within the threshold do not refresh")
+    scenario += stake_manager.update_stake(Stake.make(bob.address, sp.nat(120))).run(
+        sender=source1
+    )
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake1.address], sp.nat(40))
+    scenario.verify_equal(stake_manager.data.fixed_stake_reference, sp.nat(200))
+    scenario.verify_equal(governance_token.data.total_stake, sp.nat(280))
+
+    scenario.h2("Batched updates refresh in the same call")
+    scenario += stake_manager.update_stakes(
+        [Stake.make(alice.address, sp.nat(50)), Stake.make(bob.address, sp.nat(50))]
+    ).run(sender=source1)
+    scenario.verify_equal(governance_token.data.stakes[alice.address], sp.nat(50))
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake1.address], sp.nat(20))
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake2.address], sp.nat(10))
+    scenario.verify_equal(stake_manager.data.fixed_stake_reference, sp.nat(100))
+    scenario.verify_equal(governance_token.data.total_stake, sp.nat(130))
+
+    scenario.h2("Removed fixed stakes are not refreshed anymore")
+    scenario += stake_manager.set_fixed_stake(
+        address=fixed_stake2.address, ratio=sp.nat(0)
+    ).run(sender=administrator)
+    scenario += stake_manager.update_fixed_stakes([fixed_stake2.address]).run()
+    scenario += stake_manager.update_stake(Stake.make(alice.address, sp.nat(150))).run(
+        sender=source1
+    )
+    scenario.verify_equal(governance_token.data.stakes[fixed_stake1.address], sp.nat(40))
+    scenario.verify_equal(governance_token.data.stakes.contains(fixed_stake2.address), False)
+    scenario.verify_equal(governance_token.data.total_stake, sp.nat(240))
@@ -60,7 +60,7 @@ class DummyFA2(fa2.AdministrableFA2):
 @sp.add_test(name="Staking Pool")
 def test():
     scenario = sp.test_scenario()
-    scenario.add_flag("protocol", "ithaca")
+    scenario.add_flag("protocol", "kathmandu")
     scenario.h1("Staking Pool Unit Test")
     scenario.table_of_contents()
 
@@ -138,6 +138,10 @@ def test():
         reward_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
         Constants.SECONDS_PER_WEEK,
     )
+    scenario.verify_equal(
+        staking_pool.data.dist_factors[alice.address], Constants.SECONDS_PER_WEEK
+    )
+    scenario.verify_equal(staking_pool.data.last_reward_balance, 0)
 
     scenario.p("Multiclaim yields nothing")
     scenario += staking_pool.claim().run(sender=alice, now=now)
@@ -145,6 +149,9 @@ def test():
         reward_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
         Constants.SECONDS_PER_WEEK,
     )
+    scenario.verify_equal(
+        staking_pool.data.dist_factors[alice.address], Constants.SECONDS_PER_WEEK
+    )
 
     scenario.h2("Bob joins after a week")
     now = sp.timestamp(Constants.SECONDS_PER_WEEK * 2)
@@ -228,6 +235,11 @@ def test():
     now = sp.timestamp(Constants.SECONDS_PER_WEEK * 6)
 
     scenario += staking_pool.withdraw().run(sender=dan, now=now)
+    scenario.verify(~staking_pool.data.stakes.contains(dan.address))
+    scenario.verify_equal(
+        reward_token.data.ledger[fa2.LedgerKey.make(0, dan.address)],
+        Constants.SECONDS_PER_WEEK // 3 * 2,
+    )
 
     scenario.p("Rejoins")
     now = sp.timestamp(Constants.SECONDS_PER_WEEK * 7)
@@ -256,3 +268,137 @@ def test():
         reward_token.data.ledger[fa2.LedgerKey.make(0, dan.address)],
         Constants.SECONDS_PER_WEEK // 3 * 2,
     )
+
+
+class NoViewFA2(DummyFA2):
+    """FA2 without the get_balance view, the staking pool falls back to the balance_of callback."""
+
+    def get_balance(self, ledger_key):
+        pass
+
+
+def add_balance_view_test(name, reward_token_class):
+    @sp.add_test(name=name)
+    def test():
+        scenario = sp.test_scenario()
+        scenario.add_flag("protocol", "kathmandu")
+        scenario.h1("%s Unit Test" % name)
+        scenario.table_of_contents()
+
+        scenario.h2("Bootstrapping")
+        token_id = sp.nat(0)
+
+        administrator = sp.test_account("Administrator")
+        alice = sp.test_account("Alice")
+        bob = sp.test_account("Robert")
+
+        reward_token = reward_token_class(
+            {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+        )
+        scenario += reward_token
+        staking_token = DummyFA2(
+            {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+        )
+        scenario += staking_token
+        tracker_engine = DummyEngine(reward_token.address)
+        scenario += tracker_engine
+
+        scenario += reward_token.set_token_metadata(
+            sp.record(token_id=token_id, token_info=sp.map())
+        ).run(sender=administrator)
+        scenario += staking_token.set_token_metadata(
+            sp.record(token_id=token_id, token_info=sp.map())
+        ).run(sender=administrator)
+
+        staking_pool = StakingPool(
+            tracker_engine.address,
+            staking_token.address,
+            token_id,
+            reward_token.address,
+            token_id,
+            use_balance_view=True,
+        )
+        scenario += staking_pool
+        scenario += tracker_engine.set_pool_contract(staking_pool.address)
+
+        for account in [alice, bob]:
+            scenario += staking_token.mint(
+                owner=account.address,
+                token_id=token_id,
+                token_amount=1 * Constants.PRECISION_FACTOR,
+            )
+            scenario += staking_token.update_operators(
+                [
+                    sp.variant(
+                        "add_operator",
+                        sp.record(
+                            owner=account.address,
+                            operator=staking_pool.address,
+                            token_id=token_id,
+                        ),
+                    )
+                ]
+            ).run(sender=account.address)
+
+        scenario.h2("Alice deposits")
+        scenario += staking_pool.deposit(1 * Constants.PRECISION_FACTOR).run(
+            sender=alice
+        )
+        scenario.verify_equal(
+            staking_pool.data.total_stake, 1 * Constants.PRECISION_FACTOR
+        )
+        scenario.verify_equal(
+            staking_token.data.ledger[fa2.LedgerKey.make(0, staking_pool.address)],
+            1 * Constants.PRECISION_FACTOR,
+        )
+
+        scenario.h2("Engine rewards are accounted by the same action")
+        now = sp.timestamp(Constants.SECONDS_PER_WEEK)
+        scenario += staking_pool.claim().run(sender=alice, now=now)
+        scenario.verify_equal(
+            reward_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
+            Constants.SECONDS_PER_WEEK,
+        )
+        scenario.verify_equal(
+            reward_token.data.ledger[fa2.LedgerKey.make(0, staking_pool.address)], 0
+        )
+        scenario.verify_equal(staking_pool.data.last_reward_balance, 0)
+
+        scenario.h2("Bob joins after an accrual and gets none of it")
+        now = sp.timestamp(2 * Constants.SECONDS_PER_WEEK)
+        scenario += staking_pool.deposit(1 * Constants.PRECISION_FACTOR).run(
+            sender=bob, now=now
+        )
+        scenario.verify_equal(
+            staking_pool.data.last_reward_balance, Constants.SECONDS_PER_WEEK
+        )
+        scenario.verify_equal(
+            staking_pool.data.dist_factors[bob.address], staking_pool.data.dist_factor
+        )
+        scenario += reward_token.mint(
+            owner=staking_pool.address,
+            token_id=token_id,
+            token_amount=1 * Constants.PRECISION_FACTOR,
+        ).run(now=now)
+
+        scenario.h2("Both withdraw")
+        scenario += staking_pool.withdraw().run(sender=alice, now=now)
+        scenario += staking_pool.withdraw().run(sender=bob, now=now)
+        scenario.verify_equal(staking_pool.data.total_stake, 0)
+        scenario.verify_equal(
+            reward_token.data.ledger[fa2.LedgerKey.make(0, alice.address)],
+            2 * Constants.SECONDS_PER_WEEK + 1 * Constants.PRECISION_FACTOR // 2,
+        )
+        scenario.verify_equal(
+            reward_token.data.ledger[fa2.LedgerKey.make(0, bob.address)],
+            1 * Constants.PRECISION_FACTOR // 2,
+        )
+        scenario.verify_equal(
+            staking_token.data.ledger[fa2.LedgerKey.make(0, bob.address)],
+            1 * Constants.PRECISION_FACTOR,
+        )
+        scenario.verify(~staking_pool.data.reward_balance_fetched)
+
+
+add_balance_view_test("Staking Pool Balance View", DummyFA2)
+add_balance_view_test("Staking Pool Balance View Fallback", NoViewFA2)
@@ -0,0 +1,131 @@
+import smartpy as sp
+
+import utils.constants as Constants
+from utils.fa2 import LedgerKey, RecipientTokenAmount, AdministrableFA2
+
+from contracts.oracle.dummy_oracle import DummyOracle
+from contracts.tracker.token_collateral_tracker_engine import TokenTrackerEngine
+
+STARTING_BALANCE = 1000 * 10**12
+
+
+@sp.add_test(name="Collateral FA2 Engine Price Cache")
+def test():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Collateral FA2 Engine Price Cache")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+    scenario.h2("Accounts")
+    scenario.show([administrator, alice, bob, dan])
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+
+    collateral_token_id = 1
+    token_id = 0
+
+    synth = AdministrableFA2({LedgerKey.make(0, administrator.address): sp.unit})
+    scenario += synth
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=collateral_token_id, token_info=sp.map())
+    ).run(sender=administrator.address)
+    scenario += synth.mint(
+        RecipientTokenAmount.make(alice.address, collateral_token_id, STARTING_BALANCE)
+    ).run(sender=administrator.address)
+
+    tracker_engine = TokenTrackerEngine(
+        synth.address,
+        token_id,
+        synth.address,
+        collateral_token_id,
+        administrators=sp.big_map(
+            {LedgerKey.make(sp.nat(0), administrator.address): sp.unit}
+        ),
+    )
+    scenario += tracker_engine
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=tracker_engine.address
+    ).run(sender=administrator)
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=tracker_engine.address)
+    scenario += tracker_engine.set_contracts(
+        target_price_oracle=target_oracle.address,
+        reward_pool_contract=dan.address,
+        savings_pool_contract=bob.address,
+        governance_token_contract=Constants.DEFAULT_ADDRESS,
+        options_contract=Constants.DEFAULT_ADDRESS,
+    ).run(sender=administrator)
+
+    scenario += synth.update_operators(
+        [
+            sp.variant(
+                "add_operator",
+                sp.record(
+                    owner=alice.address,
+                    operator=tracker_engine.address,
+                    token_id=collateral_token_id,
+                ),
+            )
+        ]
+    ).run(sender=alice.address)
+
+    scenario.h2("Alice creates a vault")
+    scenario += tracker_engine.create_vault(False).run(sender=alice)
+    scenario += tracker_engine.deposit(sp.nat(100 * Constants.PRECISION_FACTOR)).run(
+        sender=alice
+    )
+
+    scenario.h2("Enable the cache")
+    scenario += tracker_engine.set_price_cache_enabled(True).run(
+        sender=alice, valid=False
+    )
+    scenario += tracker_engine.set_price_cache_enabled(True).run(
+        sender=administrator
+    )
+    scenario.verify(tracker_engine.data.price_cache.is_some())
+
+    scenario.h2("The first call in a level fetches the price")
+    scenario += tracker_engine.mint(sp.nat(10 * Constants.PRECISION_FACTOR)).run(
+        sender=alice, level=100
+    )
+    scenario.verify_equal(
+        tracker_engine.data.price_cache.open_some(),
+        sp.record(price=target_oracle.data.price, level=100),
+    )
+    cached_price = scenario.compute(tracker_engine.data.price_cache.open_some().price)
+
+    scenario.h2("The oracle price changes within the same level, the cached price is used")
+    scenario += target_oracle.set_price(cached_price * 2).run(level=100)
+    scenario += tracker_engine.withdraw(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=alice, level=100
+    )
+    scenario.verify_equal(
+        tracker_engine.data.price_cache.open_some().price, cached_price
+    )
+
+    scenario.h2("The next level fetches the price again")
+    scenario += tracker_engine.withdraw(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=alice, level=101
+    )
+    scenario.verify_equal(
+        tracker_engine.data.price_cache.open_some(),
+        sp.record(price=cached_price * 2, level=101),
+    )
+
+    scenario.h2("Disable the cache")
+    scenario += tracker_engine.set_price_cache_enabled(False).run(
+        sender=administrator, level=101
+    )
+    scenario.verify(tracker_engine.data.price_cache.is_none())
+    scenario += target_oracle.set_price(cached_price).run(level=101)
+    scenario += tracker_engine.withdraw(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=alice, level=101
+    )
+    scenario.verify(tracker_engine.data.price_cache.is_none())
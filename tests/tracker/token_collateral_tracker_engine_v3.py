@@ -10,7 +10,12 @@ from contracts.tracker.savings_pool import SavingsPool
 from contracts.tracker.staking_pool import StakingPool
 from contracts.tracker.options_listing import OptionsListing
 from contracts.tracker.governance_token import GovernanceToken
+from contracts.tracker.interest_rate_updater_exponential import (
+    InterestRateUpdaterExponential,
+)
+from contracts.tracker.base_tracker_engine_v3 import Liquidation, VaultAction
 from contracts.tracker.token_collateral_tracker_engine_v3 import TokenTrackerEngine
+from contracts.tracker.vault_export import build_token_vault_export
 
 STARTING_BALANCE = 1000 * 10**12
 
@@ -380,7 +385,7 @@ def test():
     scenario += tracker_engine.set_collateral_ratio(Ratio.make(4, 1)).run(
         sender=administrator
     )
-    scenario.verify_equal(tracker_engine.data.collateral_ratio, Ratio.make(4, 1))
+    scenario.verify_equal(tracker_engine.data.config.collateral_ratio, Ratio.make(4, 1))
 
     scenario.p("Settlement ratio update")
     scenario += tracker_engine.set_settlement_ratio(Ratio.make(4, 1)).run(
@@ -389,7 +394,7 @@ def test():
     scenario += tracker_engine.set_settlement_ratio(Ratio.make(4, 1)).run(
         sender=administrator
     )
-    scenario.verify_equal(tracker_engine.data.settlement_ratio, Ratio.make(4, 1))
+    scenario.verify_equal(tracker_engine.data.config.settlement_ratio, Ratio.make(4, 1))
 
     scenario.p("Minting fee ratio update")
     scenario += tracker_engine.set_minting_fee_ratio(Ratio.make(2, 100)).run(
@@ -398,7 +403,7 @@ def test():
     scenario += tracker_engine.set_minting_fee_ratio(Ratio.make(2, 100)).run(
         sender=administrator
     )
-    scenario.verify_equal(tracker_engine.data.minting_fee_ratio, Ratio.make(2, 100))
+    scenario.verify_equal(tracker_engine.data.config.minting_fee_ratio, Ratio.make(2, 100))
 
     scenario.p("Introducer ratio update")
     scenario += tracker_engine.set_introducer_ratio(Ratio.make(18, 100)).run(
@@ -407,7 +412,7 @@ def test():
     scenario += tracker_engine.set_introducer_ratio(Ratio.make(18, 100)).run(
         sender=administrator
     )
-    scenario.verify_equal(tracker_engine.data.introducer_ratio, Ratio.make(18, 100))
+    scenario.verify_equal(tracker_engine.data.config.introducer_ratio, Ratio.make(18, 100))
 
     scenario.p("Settlement reward fee ratio update")
     scenario += tracker_engine.set_settlement_reward_fee_ratio(Ratio.make(20, 100)).run(
@@ -417,7 +422,7 @@ def test():
         sender=administrator
     )
     scenario.verify_equal(
-        tracker_engine.data.settlement_reward_fee_ratio, Ratio.make(20, 100)
+        tracker_engine.data.config.settlement_reward_fee_ratio, Ratio.make(20, 100)
     )
 
     scenario.p("Settlement payout ratio update")
@@ -428,7 +433,7 @@ def test():
         sender=administrator
     )
     scenario.verify_equal(
-        tracker_engine.data.settlement_payout_ratio, Ratio.make(975, 1000)
+        tracker_engine.data.config.settlement_payout_ratio, Ratio.make(975, 1000)
     )
 
     scenario.p("Liquidation payout ratio update")
@@ -439,5 +444,607 @@ def test():
         sender=administrator
     )
     scenario.verify_equal(
-        tracker_engine.data.liquidation_payout_ratio, Ratio.make(120, 100)
+        tracker_engine.data.config.liquidation_payout_ratio, Ratio.make(120, 100)
     )
+
+    scenario.h1("Batched liquidation")
+    scenario.p("Dan opens a vault at the current price")
+    scenario += tracker_engine.create_vault(sp.none).run(sender=dan)
+    scenario += tracker_engine.deposit(sp.nat(100 * Constants.PRECISION_FACTOR)).run(
+        sender=dan
+    )
+    scenario += tracker_engine.mint(sp.nat(12 * Constants.PRECISION_FACTOR)).run(
+        sender=dan
+    )
+
+    scenario.p("Nothing can be liquidated while the vaults are healthy")
+    scenario += tracker_engine.liquidate_many(
+        [Liquidation.make(dan.address, one_token)]
+    ).run(sender=bob, valid=False)
+
+    scenario.p("After the price increase bob liquidates alice and dan in one go")
+    current_price = sp.nat(3000000)
+    scenario += target_oracle.set_price(current_price)
+    alice_minted = scenario.compute(
+        tracker_engine.data.vault_contexts[alice.address].minted
+    )
+    dan_minted = scenario.compute(tracker_engine.data.vault_contexts[dan.address].minted)
+    total_supply = scenario.compute(tracker_engine.data.total_supply)
+    bob_tokens = scenario.compute(
+        synth.data.ledger[LedgerKey.make(token_id, bob.address)]
+    )
+    scenario += tracker_engine.liquidate_many(
+        [
+            Liquidation.make(alice.address, one_token),
+            Liquidation.make(dan.address, one_token),
+        ]
+    ).run(sender=bob)
+    scenario.verify(
+        tracker_engine.data.vault_contexts[alice.address].minted < alice_minted
+    )
+    scenario.verify(tracker_engine.data.vault_contexts[dan.address].minted < dan_minted)
+    scenario.verify_equal(
+        tracker_engine.data.total_supply, sp.as_nat(total_supply - 2 * one_token)
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(token_id, bob.address)],
+        sp.as_nat(bob_tokens - 2 * one_token),
+    )
+
+    scenario.p("The whole batch fails if a single liquidation is invalid")
+    scenario += tracker_engine.liquidate_many(
+        [
+            Liquidation.make(dan.address, one_token),
+            Liquidation.make(alice.address, 100 * one_token),
+        ]
+    ).run(sender=bob, valid=False)
+
+    scenario.h1("Deferred accrual")
+    scenario.p("Only an admin can defer the accrual minting")
+    scenario += tracker_engine.set_deferred_accrual(True).run(sender=alice, valid=False)
+    scenario += tracker_engine.set_deferred_accrual(True).run(sender=administrator)
+
+    scenario.p("Accrual is only accounted while deferred")
+    savings_pool_balance = scenario.compute(
+        synth.data.ledger[LedgerKey.make(token_id, savings_pool.address)]
+    )
+    rewards_pool_balance = scenario.compute(
+        synth.data.ledger[LedgerKey.make(token_id, rewards_pool.address)]
+    )
+    now = sp.timestamp(Constants.SECONDS_PER_WEEK * 3)
+    scenario += tracker_engine.touch([]).run(now=now)
+    scenario.verify(tracker_engine.data.pending_asset_accrual > 0)
+    scenario.verify(tracker_engine.data.pending_spread_accrual > 0)
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(token_id, savings_pool.address)],
+        savings_pool_balance,
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(token_id, rewards_pool.address)],
+        rewards_pool_balance,
+    )
+
+    scenario.p("Anyone can flush the pending accrual")
+    pending_asset_accrual = scenario.compute(tracker_engine.data.pending_asset_accrual)
+    pending_spread_accrual = scenario.compute(
+        tracker_engine.data.pending_spread_accrual
+    )
+    scenario += tracker_engine.update().run(sender=dan, now=now)
+    scenario.verify_equal(tracker_engine.data.pending_asset_accrual, 0)
+    scenario.verify_equal(tracker_engine.data.pending_spread_accrual, 0)
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(token_id, savings_pool.address)],
+        savings_pool_balance + pending_asset_accrual,
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(token_id, rewards_pool.address)],
+        rewards_pool_balance + pending_spread_accrual,
+    )
+
+    scenario.p("Disabling the deferred accrual mints directly again")
+    scenario += tracker_engine.set_deferred_accrual(False).run(
+        sender=administrator, now=now
+    )
+    now = sp.timestamp(Constants.SECONDS_PER_WEEK * 4)
+    scenario += tracker_engine.touch([]).run(now=now)
+    scenario.verify_equal(tracker_engine.data.pending_asset_accrual, 0)
+    scenario.verify(
+        synth.data.ledger[LedgerKey.make(token_id, savings_pool.address)]
+        > savings_pool_balance + pending_asset_accrual
+    )
+
+    scenario.h1("Combined vault management")
+    scenario.p("Bob deposits and mints in one call")
+    scenario += tracker_engine.create_vault(sp.none).run(sender=bob, now=now)
+    scenario += tracker_engine.manage_vault(
+        [
+            VaultAction.make("deposit", sp.nat(100 * Constants.PRECISION_FACTOR)),
+            VaultAction.make("mint", sp.nat(5 * Constants.PRECISION_FACTOR)),
+        ]
+    ).run(sender=bob, now=now)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].balance,
+        100 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].minted,
+        sp.nat(5 * Constants.PRECISION_FACTOR * Constants.PRECISION_FACTOR)
+        // tracker_engine.data.compound_interest_rate,
+    )
+
+    scenario.p("Collateral is checked after all actions")
+    scenario += tracker_engine.manage_vault(
+        [VaultAction.make("withdraw", sp.nat(50 * Constants.PRECISION_FACTOR))]
+    ).run(sender=bob, now=now, valid=False)
+    scenario += tracker_engine.manage_vault(
+        [
+            VaultAction.make("deposit", sp.nat(10 * Constants.PRECISION_FACTOR)),
+            VaultAction.make("mint", sp.nat(5 * Constants.PRECISION_FACTOR)),
+        ]
+    ).run(sender=bob, now=now, valid=False)
+
+    scenario.p("Bob burns and withdraws in one call")
+    collateral_balance = scenario.compute(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, bob.address)]
+    )
+    total_supply = scenario.compute(tracker_engine.data.total_supply)
+    scenario += tracker_engine.manage_vault(
+        [
+            VaultAction.make("burn", sp.nat(2 * Constants.PRECISION_FACTOR)),
+            VaultAction.make("withdraw", sp.nat(50 * Constants.PRECISION_FACTOR)),
+        ]
+    ).run(sender=bob, now=now)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].balance,
+        50 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, bob.address)],
+        collateral_balance + 50 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        tracker_engine.data.total_supply,
+        sp.as_nat(total_supply - 2 * Constants.PRECISION_FACTOR),
+    )
+
+    scenario.p("The same rebalancing with separate calls")
+    scenario += tracker_engine.deposit(sp.nat(50 * Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now
+    )
+    scenario += tracker_engine.mint(sp.nat(2 * Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now
+    )
+    scenario += tracker_engine.burn(sp.nat(2 * Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now
+    )
+    scenario += tracker_engine.withdraw(sp.nat(50 * Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now
+    )
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].balance,
+        50 * Constants.PRECISION_FACTOR,
+    )
+
+    scenario.h1("Vault health")
+    bob_health = tracker_engine.vault_health(bob.address).open_some()
+    scenario.verify_equal(
+        bob_health.minted,
+        (
+            tracker_engine.data.vault_contexts[bob.address].minted
+            * tracker_engine.data.compound_interest_rate
+            + (Constants.PRECISION_FACTOR - 1)
+        )
+        // Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        bob_health.balance, tracker_engine.data.vault_contexts[bob.address].balance
+    )
+    scenario.verify(bob_health.liquidation_headroom > 0)
+    scenario.verify(
+        tracker_engine.vault_health(alice.address).open_some().liquidation_headroom < 0
+    )
+    scenario.verify(tracker_engine.vault_health(administrator.address).is_none())
+
+    scenario.h1("Engine state")
+    engine_state = tracker_engine.get_engine_state(sp.some(bob.address))
+    scenario.verify_equal(engine_state.total_supply, tracker_engine.data.total_supply)
+    scenario.verify_equal(
+        engine_state.compound_interest_rate,
+        tracker_engine.data.compound_interest_rate,
+    )
+    scenario.verify_equal(
+        engine_state.config.collateral_ratio,
+        tracker_engine.data.config.collateral_ratio,
+    )
+    scenario.verify_equal(
+        engine_state.vault_context.open_some().minted,
+        tracker_engine.data.vault_contexts[bob.address].minted,
+    )
+    scenario.verify(
+        tracker_engine.get_engine_state(sp.none).vault_context.is_none()
+    )
+    scenario.verify(engine_state.price_cache.is_none())
+    scenario.verify(~engine_state.vault_import_locked)
+    scenario.verify(
+        tracker_engine.get_engine_state(
+            sp.some(administrator.address)
+        ).vault_context.is_none()
+    )
+
+    scenario.h1("Withdraw collateral boundary")
+    scenario.p(
+        "The withdraw check is exact, collateral can be withdrawn down to the last unit covering the minted amount"
+    )
+    required_collateral_value = scenario.compute(
+        tracker_engine.data.vault_contexts[bob.address].minted
+        * tracker_engine.data.compound_interest_rate
+        * target_oracle.data.price
+        * tracker_engine.data.config.collateral_ratio.numerator
+        * 10**tracker_engine.collateral_token_decimals
+    )
+    collateral_value_factor = scenario.compute(
+        Constants.PRECISION_FACTOR
+        * Constants.PRICE_PRECISION_FACTOR
+        * tracker_engine.price_extra_precision_factor
+        * 10**tracker_engine.token_decimals
+        * tracker_engine.data.config.collateral_ratio.denominator
+    )
+    required_balance = scenario.compute(
+        (required_collateral_value + sp.as_nat(collateral_value_factor - 1))
+        // collateral_value_factor
+    )
+    excess_balance = scenario.compute(
+        sp.as_nat(
+            tracker_engine.data.vault_contexts[bob.address].balance - required_balance
+        )
+    )
+    scenario += tracker_engine.withdraw(excess_balance + 1).run(
+        sender=bob, now=now, valid=False
+    )
+    scenario += tracker_engine.manage_vault(
+        [VaultAction.make("withdraw", excess_balance + 1)]
+    ).run(sender=bob, now=now, valid=False)
+    scenario += tracker_engine.manage_vault(
+        [VaultAction.make("withdraw", excess_balance)]
+    ).run(sender=bob, now=now)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].balance, required_balance
+    )
+    scenario += tracker_engine.deposit(excess_balance).run(sender=bob, now=now)
+    scenario += tracker_engine.withdraw(excess_balance).run(sender=bob, now=now)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[bob.address].balance, required_balance
+    )
+    scenario += tracker_engine.deposit(excess_balance).run(sender=bob, now=now)
+
+    scenario.h1("Price cache")
+    scenario += tracker_engine.set_price_cache_enabled(True).run(
+        sender=bob, now=now, valid=False
+    )
+    scenario += tracker_engine.set_price_cache_enabled(True).run(
+        sender=administrator, now=now
+    )
+    scenario += tracker_engine.mint(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now, level=100
+    )
+    cached_price = scenario.compute(tracker_engine.data.price_cache.open_some().price)
+    scenario.verify_equal(tracker_engine.data.price_cache.open_some().level, 100)
+    scenario.verify_equal(
+        tracker_engine.get_engine_state(sp.none).price_cache,
+        tracker_engine.data.price_cache,
+    )
+
+    scenario.p("The oracle price changes within the same level, the cached price is used")
+    scenario += target_oracle.set_price(cached_price * 2).run(level=100)
+    scenario += tracker_engine.burn(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now, level=100
+    )
+    scenario += tracker_engine.withdraw(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now, level=100
+    )
+    scenario.verify_equal(tracker_engine.data.price_cache.open_some().price, cached_price)
+
+    scenario.p("The next level fetches the price again")
+    scenario += tracker_engine.withdraw(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=bob, now=now, level=101
+    )
+    scenario.verify_equal(
+        tracker_engine.data.price_cache.open_some().price, cached_price * 2
+    )
+    scenario += target_oracle.set_price(cached_price)
+
+    scenario += tracker_engine.set_price_cache_enabled(False).run(
+        sender=administrator, now=now, level=101
+    )
+    scenario.verify(tracker_engine.data.price_cache.is_none())
+
+    scenario.h1("Vault context import")
+    eve = sp.test_account("Eve")
+    scenario.p("The administrator holds the collateral handed over by the previous engine")
+    scenario += synth.mint(
+        RecipientTokenAmount.make(
+            administrator.address, collateral_token_id, 10 * Constants.PRECISION_FACTOR
+        )
+    ).run(sender=administrator.address)
+    scenario += synth.update_operators(
+        [
+            sp.variant(
+                "add_operator",
+                sp.record(
+                    owner=administrator.address,
+                    operator=tracker_engine.address,
+                    token_id=collateral_token_id,
+                ),
+            )
+        ]
+    ).run(sender=administrator.address)
+    engine_collateral = scenario.compute(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, tracker_engine.address)]
+    )
+    total_supply = scenario.compute(tracker_engine.data.total_supply)
+    imported_vault_contexts = [
+        sp.record(
+            owner=eve.address,
+            vault_context=sp.record(
+                minted=sp.nat(Constants.PRECISION_FACTOR),
+                balance=sp.nat(10 * Constants.PRECISION_FACTOR),
+                introducer=sp.some(dan.address),
+            ),
+        )
+    ]
+    scenario += tracker_engine.import_vault_contexts(imported_vault_contexts).run(
+        sender=bob, now=now, valid=False
+    )
+    scenario += tracker_engine.import_vault_contexts(imported_vault_contexts).run(
+        sender=administrator, amount=sp.mutez(1), now=now, valid=False
+    )
+    scenario += tracker_engine.import_vault_contexts(imported_vault_contexts).run(
+        sender=administrator, now=now
+    )
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[eve.address],
+        sp.record(
+            minted=Constants.PRECISION_FACTOR,
+            balance=10 * Constants.PRECISION_FACTOR,
+            introducer=sp.some(dan.address),
+        ),
+    )
+    scenario.verify_equal(
+        tracker_engine.data.total_supply,
+        total_supply
+        + (
+            Constants.PRECISION_FACTOR * tracker_engine.data.compound_interest_rate
+            + (Constants.PRECISION_FACTOR - 1)
+        )
+        // Constants.PRECISION_FACTOR,
+    )
+
+    scenario.p("The imported collateral is taken into custody")
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, tracker_engine.address)],
+        engine_collateral + 10 * Constants.PRECISION_FACTOR,
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, administrator.address)],
+        0,
+    )
+
+    scenario.p("An owner can only be imported once")
+    scenario += tracker_engine.import_vault_contexts(imported_vault_contexts).run(
+        sender=administrator, now=now, valid=False
+    )
+
+    scenario.h2("Vault export")
+    export_vaults = sp.build_lambda(
+        build_token_vault_export(
+            [eve.address], administrator.address, synth.address, collateral_token_id
+        )
+    )
+    scenario += tracker_engine.execute(export_vaults).run(
+        sender=bob, now=now, valid=False
+    )
+    scenario += tracker_engine.execute(export_vaults).run(
+        sender=administrator, now=now
+    )
+    scenario.verify(~tracker_engine.data.vault_contexts.contains(eve.address))
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, tracker_engine.address)],
+        engine_collateral,
+    )
+    scenario.verify_equal(
+        synth.data.ledger[LedgerKey.make(collateral_token_id, administrator.address)],
+        10 * Constants.PRECISION_FACTOR,
+    )
+    scenario.p("The exported vault is disabled")
+    scenario += tracker_engine.withdraw(sp.nat(1)).run(
+        sender=eve, now=now, valid=False
+    )
+
+    scenario.p("No import after the lock")
+    scenario += tracker_engine.lock_vault_import().run(sender=bob, now=now, valid=False)
+    scenario += tracker_engine.lock_vault_import().run(sender=administrator, now=now)
+    scenario.verify(tracker_engine.get_engine_state(sp.none).vault_import_locked)
+    scenario += tracker_engine.import_vault_contexts(
+        [
+            sp.record(
+                owner=administrator.address,
+                vault_context=sp.record(
+                    minted=sp.nat(0), balance=sp.nat(0), introducer=sp.none
+                ),
+            )
+        ]
+    ).run(sender=administrator, now=now, valid=False)
+
+
+@sp.add_test(name="FA2 Tracker Engine Pull Reference Interest Rate")
+def test():
+    scenario = sp.test_scenario()
+    scenario.h1("Tracker Engine Pull Reference Interest Rate")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+    observed_oracle = DummyOracle()
+    scenario += observed_oracle
+
+    token_id = 0
+    synth = AdministrableFA2({LedgerKey.make(0, administrator.address): sp.unit})
+    scenario += synth
+
+    tracker_engine = TokenTrackerEngine(
+        synth.address,
+        token_id,
+        synth.address,
+        1,
+        administrators=sp.big_map(
+            {LedgerKey.make(sp.nat(0), administrator.address): sp.unit}
+        ),
+        pull_reference_interest_rate=True,
+    )
+    scenario += tracker_engine
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=tracker_engine.address
+    ).run(sender=administrator)
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=tracker_engine.address)
+
+    interest_rate_updater = InterestRateUpdaterExponential(
+        [tracker_engine.address],
+        target_oracle.address,
+        observed_oracle.address,
+        pull_reference_interest_rate=True,
+    )
+    scenario += interest_rate_updater
+
+    scenario += tracker_engine.set_contracts(
+        target_price_oracle=target_oracle.address,
+        reward_pool_contract=dan.address,
+        savings_pool_contract=bob.address,
+        governance_token_contract=Constants.DEFAULT_ADDRESS,
+        options_contract=Constants.DEFAULT_ADDRESS,
+        interest_rate_setter_contract=interest_rate_updater.address,
+    ).run(sender=administrator)
+
+    scenario.p("Supply to accrue on")
+    scenario += tracker_engine.import_vault_contexts(
+        [
+            sp.record(
+                owner=alice.address,
+                vault_context=sp.record(
+                    minted=sp.nat(Constants.PRECISION_FACTOR),
+                    balance=sp.nat(0),
+                    introducer=sp.none,
+                ),
+            )
+        ]
+    ).run(sender=administrator, now=sp.timestamp(0))
+
+    scenario.h2("Rate updates do not call the engines")
+    scenario += observed_oracle.set_price(500000)
+    scenario += interest_rate_updater.interest_rate_update().run(
+        sender=alice, now=sp.timestamp(Constants.SECONDS_PER_WEEK)
+    )
+    scenario += interest_rate_updater.interest_rate_update().run(
+        sender=alice, now=sp.timestamp(2 * Constants.SECONDS_PER_WEEK)
+    )
+    intermediate_reference_interest_rate = Constants.SECONDS_INTEREST_MINIMUM + 1833
+    reference_interest_rate = Constants.SECONDS_INTEREST_MINIMUM + 2 * 1833
+    scenario.verify_equal(
+        interest_rate_updater.get_reference_interest_rate(),
+        sp.record(
+            reference_interest_rate=reference_interest_rate,
+            effective_timestamp=sp.timestamp(2 * Constants.SECONDS_PER_WEEK),
+        ),
+    )
+    scenario.verify_equal(
+        tracker_engine.data.reference_interest_rate,
+        Constants.SECONDS_INTEREST_MINIMUM,
+    )
+
+    scenario.h2("The rate history lists every rate since a timestamp")
+    scenario.verify_equal(
+        interest_rate_updater.get_reference_interest_rates(sp.timestamp(0)),
+        [
+            sp.record(
+                reference_interest_rate=Constants.SECONDS_INTEREST_MINIMUM,
+                effective_timestamp=sp.timestamp(0),
+            ),
+            sp.record(
+                reference_interest_rate=intermediate_reference_interest_rate,
+                effective_timestamp=sp.timestamp(Constants.SECONDS_PER_WEEK),
+            ),
+            sp.record(
+                reference_interest_rate=reference_interest_rate,
+                effective_timestamp=sp.timestamp(2 * Constants.SECONDS_PER_WEEK),
+            ),
+        ],
+    )
+    scenario.verify_equal(
+        interest_rate_updater.get_reference_interest_rates(
+            sp.timestamp(2 * Constants.SECONDS_PER_WEEK + 1)
+        ),
+        [
+            sp.record(
+                reference_interest_rate=reference_interest_rate,
+                effective_timestamp=sp.timestamp(2 * Constants.SECONDS_PER_WEEK),
+            ),
+        ],
+    )
+
+    scenario.h2("Vault health projects the pulled rates")
+    projected_compound_interest_rate = Constants.PRECISION_FACTOR
+    for period_reference_interest_rate in [
+        Constants.SECONDS_INTEREST_MINIMUM,
+        intermediate_reference_interest_rate,
+    ]:
+        projected_compound_interest_rate = (
+            projected_compound_interest_rate
+            * (
+                Constants.PRECISION_FACTOR
+                + (period_reference_interest_rate + Constants.SECONDS_INTEREST_SPREAD)
+                * Constants.SECONDS_PER_WEEK
+            )
+            // Constants.PRECISION_FACTOR
+        )
+    scenario.verify_equal(
+        tracker_engine.vault_health(alice.address).open_some().minted,
+        projected_compound_interest_rate,
+    )
+
+    scenario.h2("The engine accrues each rate from its effective timestamp")
+    scenario += tracker_engine.touch([]).run(
+        now=sp.timestamp(3 * Constants.SECONDS_PER_WEEK)
+    )
+    compound_interest_rate = Constants.PRECISION_FACTOR
+    for period_reference_interest_rate in [
+        Constants.SECONDS_INTEREST_MINIMUM,
+        intermediate_reference_interest_rate,
+        reference_interest_rate,
+    ]:
+        compound_interest_rate = (
+            compound_interest_rate
+            * (
+                Constants.PRECISION_FACTOR
+                + (period_reference_interest_rate + Constants.SECONDS_INTEREST_SPREAD)
+                * Constants.SECONDS_PER_WEEK
+            )
+            // Constants.PRECISION_FACTOR
+        )
+    scenario.verify_equal(
+        tracker_engine.data.reference_interest_rate, reference_interest_rate
+    )
+    scenario.verify_equal(
+        tracker_engine.data.compound_interest_rate, compound_interest_rate
+    )
+    scenario.verify_equal(
+        tracker_engine.data.accrual_update_timestamp,
+        sp.timestamp(3 * Constants.SECONDS_PER_WEEK),
+    )
+    scenario.verify(synth.data.ledger[LedgerKey.make(token_id, bob.address)] > 0)
@@ -1,6 +1,7 @@
 import smartpy as sp
 
 import utils.constants as Constants
+import utils.error_codes as Errors
 
 from utils.fa2 import LedgerKey
 from utils.viewer import Viewer
@@ -15,6 +16,8 @@ from contracts.tracker.tracker_engine import TrackerEngine
 from contracts.tracker.tez_collateral_tracker_engine_v3 import (
     TezCollateralTrackerEngine,
 )
+from contracts.tracker.vault import Vault, LeanVault
+from contracts.tracker.vault_export import build_tez_vault_export
 from utils.contract_utils import Ratio
 
 MAXMIMUM_RESPONSE = 1833
@@ -132,8 +135,8 @@ def testSettlementPremium():
     tokens_to_mint = sp.nat(33 * Constants.PRECISION_FACTOR)
     tokens_fee = (
         tokens_to_mint
-        * tracker_engine.data.minting_fee_ratio.numerator
-        // tracker_engine.data.minting_fee_ratio.denominator
+        * tracker_engine.data.config.minting_fee_ratio.numerator
+        // tracker_engine.data.config.minting_fee_ratio.denominator
     )
     received_tokens = sp.as_nat(tokens_to_mint - tokens_fee)
     scenario += tracker_engine.mint(tokens_to_mint).run(sender=alice)
@@ -151,8 +154,8 @@ def testSettlementPremium():
     tokens_to_mint = sp.nat(33 * Constants.PRECISION_FACTOR)
     tokens_fee = (
         tokens_to_mint
-        * tracker_engine.data.minting_fee_ratio.numerator
-        // tracker_engine.data.minting_fee_ratio.denominator
+        * tracker_engine.data.config.minting_fee_ratio.numerator
+        // tracker_engine.data.config.minting_fee_ratio.denominator
     )
     received_tokens = sp.as_nat(tokens_to_mint - tokens_fee)
     scenario += tracker_engine.mint(sp.nat(33 * Constants.PRECISION_FACTOR)).run(
@@ -234,6 +237,402 @@ def testSettlementPremium():
     scenario += governance_token.claim().run(sender=bob, now=now)
 
 
+@sp.add_test(name="Lean Vaults")
+def testLeanVaults():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Lean Vaults Unit Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    dan = sp.test_account("Dan")
+    scenario.h2("Accounts")
+    scenario.show([administrator, alice, dan])
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+
+    token_id = 0
+
+    synth = fa2.AdministrableFA2(
+        {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
+    scenario += synth
+
+    tracker_engine = TezCollateralTrackerEngine(
+        token_contract=synth.address,
+        token_id=sp.nat(0),
+        collateral_token_contract=Constants.DEFAULT_ADDRESS,
+        collateral_token_id=sp.nat(0),
+        administrators=sp.big_map(
+            {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+        ),
+        lean_vaults=True,
+    )
+    scenario += tracker_engine
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=tracker_engine.address
+    ).run(sender=administrator)
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=tracker_engine.address)
+
+    governance_token = GovernanceToken(
+        dan.address, {fa2.LedgerKey.make(0, tracker_engine.address): sp.unit}
+    )
+    scenario += governance_token
+    rewards_pool = StakingPool(
+        tracker_engine.address,
+        governance_token.address,
+        token_id,
+        synth.address,
+        token_id,
+    )
+    scenario += rewards_pool
+    savings_pool = SavingsPool(
+        synth.address,
+        sp.nat(0),
+        administrators={LedgerKey.make(sp.nat(0), administrator.address): sp.unit},
+    )
+    scenario += savings_pool
+    scenario += tracker_engine.set_contracts(
+        target_price_oracle=target_oracle.address,
+        reward_pool_contract=rewards_pool.address,
+        savings_pool_contract=savings_pool.address,
+        governance_token_contract=governance_token.address,
+        options_contract=Constants.DEFAULT_ADDRESS,
+        interest_rate_setter_contract=Constants.DEFAULT_ADDRESS,
+    ).run(sender=administrator)
+
+    scenario.h3("Alice creates a lean vault")
+    scenario += tracker_engine.create_vault(
+        baker=sp.none, introducer=sp.none
+    ).run(sender=alice, amount=sp.tez(100))
+    alice_vault = scenario.dynamic_contract(0, LeanVault(tracker_engine.address))
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].address, alice_vault.address
+    )
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 100 * 10**6
+    )
+
+    scenario.h3("Deposits through the engine are accounted without callback")
+    scenario += tracker_engine.create_vault(
+        baker=sp.none, introducer=sp.none
+    ).run(sender=alice, amount=sp.tez(10))
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 110 * 10**6
+    )
+
+    scenario.h3("Direct deposits are read lazily")
+    scenario += alice_vault.default().run(sender=alice, amount=sp.tez(20))
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 110 * 10**6
+    )
+    scenario.verify_equal(
+        tracker_engine.vault_health(alice.address).open_some().balance, 130 * 10**6
+    )
+    scenario += tracker_engine.mint(sp.nat(33 * Constants.PRECISION_FACTOR)).run(
+        sender=alice
+    )
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 130 * 10**6
+    )
+
+    scenario.h3("Withdraw")
+    scenario += tracker_engine.withdraw(sp.nat(30 * 10**6)).run(sender=alice)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 100 * 10**6
+    )
+    scenario.verify_equal(alice_vault.balance, sp.tez(100))
+    scenario += tracker_engine.withdraw(sp.nat(40 * 10**6)).run(
+        sender=alice, valid=False
+    )
+
+    scenario.h3("Direct transfers are picked up by sync_vault_balance")
+    scenario += alice_vault.default().run(sender=bob, amount=sp.tez(5))
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 100 * 10**6
+    )
+    scenario += tracker_engine.withdraw(sp.nat(5 * 10**6)).run(sender=alice)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 100 * 10**6
+    )
+    scenario.verify_equal(alice_vault.balance, sp.tez(100))
+
+    scenario.p("A top up through the engine and a direct transfer are not counted twice")
+    scenario += tracker_engine.create_vault(
+        baker=sp.none, introducer=sp.none
+    ).run(sender=alice, amount=sp.tez(10))
+    scenario += alice_vault.default().run(sender=alice, amount=sp.tez(10))
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 110 * 10**6
+    )
+    scenario += tracker_engine.manage_vault([]).run(sender=alice)
+    scenario.verify_equal(
+        tracker_engine.data.vault_contexts[alice.address].balance, 120 * 10**6
+    )
+    scenario.verify_equal(alice_vault.balance, sp.tez(120))
+
+
+@sp.add_test(name="Tez Vault Migration")
+def testTezVaultMigration():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Tez Vault Migration")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    dan = sp.test_account("Dan")
+    scenario.h2("Accounts")
+    scenario.show([administrator, alice, bob, dan])
+
+    target_oracle = DummyOracle()
+    scenario += target_oracle
+
+    token_id = 0
+
+    synth = fa2.AdministrableFA2(
+        {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+    )
+    scenario += synth
+
+    tracker_engines = []
+    for lean_vaults in [False, True]:
+        tracker_engine = TezCollateralTrackerEngine(
+            token_contract=synth.address,
+            token_id=sp.nat(0),
+            collateral_token_contract=Constants.DEFAULT_ADDRESS,
+            collateral_token_id=sp.nat(0),
+            administrators=sp.big_map(
+                {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+            ),
+            lean_vaults=lean_vaults,
+        )
+        scenario += tracker_engine
+        scenario += tracker_engine.set_contracts(
+            target_price_oracle=target_oracle.address,
+            reward_pool_contract=dan.address,
+            savings_pool_contract=bob.address,
+            governance_token_contract=Constants.DEFAULT_ADDRESS,
+            options_contract=Constants.DEFAULT_ADDRESS,
+            interest_rate_setter_contract=Constants.DEFAULT_ADDRESS,
+        ).run(sender=administrator)
+        tracker_engines.append(tracker_engine)
+    source_engine, target_engine = tracker_engines
+
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=source_engine.address
+    ).run(sender=administrator)
+    scenario += synth.set_token_metadata(
+        sp.record(token_id=token_id, token_info=sp.map())
+    ).run(sender=source_engine.address)
+
+    scenario.h2("Alice has a vault on the source engine")
+    scenario += source_engine.create_vault(
+        baker=sp.none, introducer=sp.some(dan.address)
+    ).run(sender=alice, amount=sp.tez(100))
+    source_vault = scenario.dynamic_contract(0, Vault(source_engine.address))
+    scenario += source_engine.mint(sp.nat(10 * Constants.PRECISION_FACTOR)).run(
+        sender=alice
+    )
+    source_vault_context = scenario.compute(
+        source_engine.data.vault_contexts[alice.address]
+    )
+
+    scenario.h2("Disable the source engine")
+    scenario += synth.set_administrator(
+        token_id=token_id, administrator_to_set=target_engine.address
+    ).run(sender=source_engine.address)
+    scenario += synth.remove_administrator(
+        token_id=token_id, administrator_to_remove=source_engine.address
+    ).run(sender=target_engine.address)
+    scenario += source_engine.mint(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=alice, valid=False
+    )
+
+    scenario.h2("Hand over the vault to the custody address")
+    export_vaults = sp.build_lambda(
+        build_tez_vault_export([alice.address], administrator.address)
+    )
+    scenario += source_engine.execute(export_vaults).run(sender=alice, valid=False)
+    scenario += source_engine.execute(export_vaults).run(sender=administrator)
+    scenario.verify(~source_engine.data.vault_contexts.contains(alice.address))
+    scenario.verify(~source_engine.data.vault_lookup.contains(source_vault.address))
+    scenario.verify_equal(source_vault.balance, sp.tez(0))
+
+    scenario.p("The old vault rejects deposits")
+    scenario += source_vault.default().run(
+        sender=alice, amount=sp.tez(1), valid=False
+    )
+
+    scenario.h2("Import the vault into the target engine")
+    vault_imports = [
+        sp.record(
+            owner=alice.address,
+            vault_context=sp.record(
+                minted=source_vault_context.minted,
+                balance=source_vault_context.balance,
+                introducer=source_vault_context.introducer,
+            ),
+        )
+    ]
+    scenario += target_engine.import_vault_contexts(vault_imports).run(
+        sender=administrator, amount=sp.tez(99), valid=False
+    )
+    scenario += target_engine.import_vault_contexts(vault_imports).run(
+        sender=administrator, amount=sp.tez(100)
+    )
+    target_vault = scenario.dynamic_contract(1, LeanVault(target_engine.address))
+    scenario.verify_equal(target_vault.balance, sp.tez(100))
+    scenario.verify_equal(
+        target_engine.data.vault_contexts[alice.address],
+        sp.record(
+            address=target_vault.address,
+            minted=source_vault_context.minted,
+            balance=100 * 10**6,
+            introducer=sp.some(dan.address),
+        ),
+    )
+    scenario.verify_equal(
+        target_engine.data.vault_lookup[target_vault.address], alice.address
+    )
+
+    scenario.h2("The target engine administrates the new vault")
+    scenario += target_engine.set_vault_delegate(sp.none).run(sender=alice)
+    scenario += target_engine.withdraw(sp.nat(10 * 10**6)).run(sender=alice)
+    scenario.verify_equal(target_vault.balance, sp.tez(90))
+    scenario += target_engine.mint(sp.nat(Constants.PRECISION_FACTOR)).run(
+        sender=alice
+    )
+
+
+class NoViewOracle(DummyOracle):
+    """Oracle without the get_price view, the engine falls back to the callback and internal call."""
+
+    def view_get_price(self):
+        pass
+
+
+def add_target_price_view_test(name, oracle_class):
+    @sp.add_test(name=name)
+    def test():
+        scenario = sp.test_scenario()
+        scenario.add_flag("protocol", "ithaca")
+        scenario.h1("%s Unit Test" % name)
+        scenario.table_of_contents()
+
+        scenario.h2("Bootstrapping")
+        administrator = sp.test_account("Administrator")
+        alice = sp.test_account("Alice")
+        bob = sp.test_account("Robert")
+        dan = sp.test_account("Dan")
+        scenario.h2("Accounts")
+        scenario.show([administrator, alice, bob, dan])
+
+        target_oracle = oracle_class()
+        scenario += target_oracle
+        viewer = Viewer()
+        scenario += viewer
+
+        token_id = 0
+
+        synth = fa2.AdministrableFA2(
+            {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+        )
+        scenario += synth
+
+        tracker_engine = TrackerEngine(
+            synth.address,
+            token_id,
+            administrators=sp.big_map(
+                {fa2.LedgerKey.make(0, administrator.address): sp.unit}
+            ),
+            use_target_price_view=True,
+        )
+        scenario += tracker_engine
+        scenario += synth.set_administrator(
+            token_id=token_id, administrator_to_set=tracker_engine.address
+        ).run(sender=administrator)
+        scenario += synth.set_token_metadata(
+            sp.record(token_id=token_id, token_info=sp.map())
+        ).run(sender=tracker_engine.address)
+        scenario += tracker_engine.set_contracts(
+            target_price_oracle=target_oracle.address,
+            reward_pool_contract=dan.address,
+            savings_pool_contract=bob.address,
+            governance_token_contract=Constants.DEFAULT_ADDRESS,
+            options_contract=Constants.DEFAULT_ADDRESS,
+        ).run(sender=administrator)
+
+        scenario.h3("Alice creates Vault")
+        return_contract = sp.contract(
+            sp.TAddress, viewer.address, entry_point="set_address"
+        ).open_some()
+        scenario += tracker_engine.create_vault(
+            baker=sp.none,
+            allows_settlement=False,
+            contract_address_callback=return_contract,
+        ).run(sender=alice, amount=sp.tez(100))
+
+        scenario.h3("Mint uses the current oracle price")
+        tokens_to_mint = sp.nat(10 * Constants.PRECISION_FACTOR)
+        tokens_fee = tokens_to_mint >> Constants.MINTING_FEE_BITSHIFT
+        scenario += tracker_engine.mint(tokens_to_mint).run(sender=alice)
+        scenario.verify_equal(
+            tracker_engine.data.target_price, target_oracle.data.price
+        )
+        scenario.verify_equal(
+            tracker_engine.data.vault_contexts[alice.address].minted, tokens_to_mint
+        )
+        scenario.verify_equal(
+            synth.data.ledger[LedgerKey.make(token_id, alice.address)],
+            sp.as_nat(tokens_to_mint - tokens_fee),
+        )
+
+        scenario.h3("Burn and withdraw use the current oracle price")
+        scenario += target_oracle.set_price(2000000)
+        scenario += tracker_engine.burn(sp.nat(Constants.PRECISION_FACTOR)).run(
+            sender=alice
+        )
+        scenario.verify_equal(tracker_engine.data.target_price, 2000000)
+        scenario.verify_equal(
+            tracker_engine.data.vault_contexts[alice.address].minted,
+            sp.as_nat(tokens_to_mint - Constants.PRECISION_FACTOR),
+        )
+        scenario += tracker_engine.withdraw(sp.tez(50)).run(sender=alice, valid=False)
+        scenario += tracker_engine.withdraw(sp.tez(10)).run(sender=alice)
+        scenario.verify_equal(
+            tracker_engine.data.vault_contexts[alice.address].balance, sp.tez(90)
+        )
+
+        scenario.h3("The callback and internal entrypoints still verify the sender")
+        scenario += tracker_engine.set_target_price(sp.nat(1)).run(
+            sender=alice, valid=False
+        )
+        scenario += tracker_engine.internal_mint(tokens_to_mint).run(
+            sender=alice, valid=False, exception=Errors.NOT_INTERNAL
+        )
+        scenario += tracker_engine.internal_burn(
+            sp.nat(Constants.PRECISION_FACTOR)
+        ).run(sender=alice, valid=False, exception=Errors.NOT_INTERNAL)
+        scenario += tracker_engine.internal_withdraw(sp.tez(1)).run(
+            sender=alice, valid=False, exception=Errors.NOT_INTERNAL
+        )
+        scenario.verify_equal(tracker_engine.data.target_price, 2000000)
+
+
+add_target_price_view_test("Legacy Tracker Engine Target Price View", DummyOracle)
+add_target_price_view_test(
+    "Legacy Tracker Engine Target Price View Fallback", NoViewOracle
+)
+
+
 @sp.add_test(name="Tracker Engine")
 def testTrackerEngine():
     def lambda_delete_vault(param):
@@ -355,8 +754,8 @@ def testTrackerEngine():
     tokens_to_mint = sp.nat(33 * Constants.PRECISION_FACTOR)
     tokens_fee = (
         tokens_to_mint
-        * tracker_engine.data.minting_fee_ratio.numerator
-        // tracker_engine.data.minting_fee_ratio.denominator
+        * tracker_engine.data.config.minting_fee_ratio.numerator
+        // tracker_engine.data.config.minting_fee_ratio.denominator
     )
     received_tokens = sp.as_nat(tokens_to_mint - tokens_fee)
     scenario += tracker_engine.mint(sp.nat(33 * Constants.PRECISION_FACTOR)).run(
@@ -394,8 +793,8 @@ def testTrackerEngine():
     tokens_to_mint = sp.nat(20 * Constants.PRECISION_FACTOR)
     tokens_fee = (
         tokens_to_mint
-        * tracker_engine.data.minting_fee_ratio.numerator
-        // tracker_engine.data.minting_fee_ratio.denominator
+        * tracker_engine.data.config.minting_fee_ratio.numerator
+        // tracker_engine.data.config.minting_fee_ratio.denominator
     )
     received_tokens = sp.as_nat(tokens_to_mint - tokens_fee)
     scenario += tracker_engine.mint(tokens_to_mint).run(sender=alice)
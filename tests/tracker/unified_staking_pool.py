@@ -7,6 +7,9 @@ from contracts.tracker.unified_staking_pool import (
     UnifiedStakingPool,
     ExchangeValue,
     ExchangeKey,
+    OwnerStakeKey,
+    OwnerPositionKey,
+    Stake,
 )
 
 
@@ -50,6 +53,32 @@ class DummyFA2(AdministrableFA2):
         )
 
 
+class LegacyUnifiedStakingPool(UnifiedStakingPool):
+    """Unified staking pool originated with stakes in the former stakes_owner_lookup set"""
+
+    def __init__(self, legacy_owner, *args, **kwargs):
+        self.legacy_owner = legacy_owner
+        UnifiedStakingPool.__init__(self, *args, **kwargs)
+
+    def get_init_storage(self):
+        storage = UnifiedStakingPool.get_init_storage(self)
+        storage["last_stake_id"] = sp.nat(2)
+        storage["stakes"] = sp.big_map(
+            {
+                1: Stake.make(sp.nat(10), sp.nat(10), sp.timestamp(0)),
+                2: Stake.make(sp.nat(20), sp.nat(20), sp.timestamp(0)),
+            },
+            tkey=sp.TNat,
+            tvalue=Stake.get_type(),
+        )
+        storage["stakes_owner_lookup"] = sp.big_map(
+            {self.legacy_owner: sp.set([1, 2])},
+            tkey=sp.TAddress,
+            tvalue=sp.TSet(sp.TNat),
+        )
+        return storage
+
+
 class DummyExchangeOracle(sp.Contract):
     @sp.entry_point
     def default(self):
@@ -64,6 +93,7 @@ class DummyExchangeOracle(sp.Contract):
 @sp.add_test(name="Unified Staking Pool")
 def test():
     scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
     scenario.h1("Unified Staking Pool Test")
     scenario.table_of_contents()
 
@@ -150,11 +180,16 @@ def test():
     scenario += unified_staking_pool.deposit(
         sp.record(token_amount=alices_stake, stake_id=0)
     ).run(sender=alice.address, now=now)
+    scenario.verify_equal(unified_staking_pool.data.stakes[1].token_amount, alices_stake)
+    scenario.verify_equal(unified_staking_pool.data.stakes[1].stake, alices_stake)
+    scenario.verify_equal(unified_staking_pool.data.disc_factor, Constants.PRECISION_FACTOR)
     scenario.p("Alice withdraws what she put in")
     scenario += unified_staking_pool.withdraw(
         sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=1)
     ).run(sender=alice.address, now=now)
     scenario.verify_equal(staking_token.data.ledger[alice_ledger_key], alices_balance)
+    scenario.verify(~unified_staking_pool.data.stakes.contains(1))
+    scenario.verify_equal(unified_staking_pool.data.disc_factor, Constants.PRECISION_FACTOR)
 
     scenario.p("Alice stakes 1 token")
     reward_payout = 1 * Constants.PRECISION_FACTOR
@@ -176,11 +211,16 @@ def test():
     scenario.verify_equal(
         staking_token.data.ledger[unified_staking_pool_key], reward_payout
     )
+    scenario.verify(~unified_staking_pool.data.stakes.contains(2))
+    scenario.verify_equal(unified_staking_pool.data.disc_factor, 2 * Constants.PRECISION_FACTOR)
 
     scenario.p("Alice stakes 1 token")
     scenario += unified_staking_pool.deposit(
         sp.record(token_amount=alices_stake, stake_id=0)
     ).run(sender=alice.address, now=now)
+    scenario.verify_equal(unified_staking_pool.data.stakes[3].token_amount, alices_stake)
+    scenario.verify_equal(unified_staking_pool.data.stakes[3].stake, alices_stake // 2)
+    scenario.verify_equal(unified_staking_pool.data.disc_factor, 2 * Constants.PRECISION_FACTOR)
     scenario += staking_token.mint(
         owner=unified_staking_pool.address,
         token_id=token_id,
@@ -195,6 +235,8 @@ def test():
         sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=3)
     ).run(sender=alice.address, now=now)
     scenario.verify_equal(staking_token.data.ledger[alice_ledger_key], alices_balance)
+    scenario.verify(~unified_staking_pool.data.stakes.contains(3))
+    scenario.verify_equal(unified_staking_pool.data.disc_factor, 6 * Constants.PRECISION_FACTOR)
     scenario.verify_equal(
         staking_token.data.ledger[unified_staking_pool_key], total_reward * 9 // 10
     )
@@ -823,3 +865,256 @@ def test():
     )
     scenario.verify(unified_staking_pool.view_disc_factor() > 0)
     scenario.verify(unified_staking_pool.view_total_stake() > 0)
+
+
+@sp.add_test(name="Unified Staking Pool Owner Index")
+def test():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
+    scenario.h1("Unified Staking Pool Owner Index Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+
+    scenario.show([administrator, alice, bob])
+
+    token_id = sp.nat(0)
+    staking_token = DummyFA2({LedgerKey.make(token_id, administrator.address): sp.unit})
+    scenario += staking_token
+    scenario += staking_token.set_token_metadata(
+        token_id=token_id, token_info=sp.map()
+    ).run(sender=administrator)
+
+    unified_staking_pool = LegacyUnifiedStakingPool(
+        alice.address, staking_token.address, token_id, 100, {administrator.address: 1}
+    )
+    scenario += unified_staking_pool
+
+    initial_balance = 1000 * Constants.PRECISION_FACTOR
+    scenario += staking_token.mint(
+        owner=bob.address, token_id=token_id, token_amount=initial_balance
+    )
+    scenario += staking_token.update_operators(
+        [
+            sp.variant(
+                "add_operator",
+                sp.record(
+                    owner=bob.address,
+                    operator=unified_staking_pool.address,
+                    token_id=token_id,
+                ),
+            )
+        ]
+    ).run(sender=bob.address)
+
+    scenario.h2("Legacy entries")
+    scenario.verify_equal(unified_staking_pool.view_owner_stake_count(alice.address), 2)
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes(alice.address), sp.set([1, 2])
+    )
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes_page(
+            sp.record(owner=alice.address, offset=1, limit=5)
+        ),
+        [2],
+    )
+    scenario.verify(
+        unified_staking_pool.view_is_stake_owner(
+            OwnerStakeKey.make(alice.address, 1)
+        )
+    )
+    scenario.verify_equal(
+        unified_staking_pool.view_balance(sp.record(address=alice.address, token_id=2)),
+        1,
+    )
+
+    scenario.h2("Migration")
+    scenario.p("only an admin can migrate")
+    scenario += unified_staking_pool.migrate_owner_stakes([alice.address]).run(
+        sender=alice.address, valid=False
+    )
+    scenario += unified_staking_pool.migrate_owner_stakes(
+        [alice.address, bob.address]
+    ).run(sender=administrator.address)
+    scenario.verify(~unified_staking_pool.data.stakes_owner_lookup.contains(alice.address))
+    scenario.verify_equal(unified_staking_pool.data.owner_stake_counts[alice.address], 2)
+    scenario.verify_equal(
+        unified_staking_pool.data.owner_stakes[OwnerPositionKey.make(alice.address, 1)],
+        2,
+    )
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes(alice.address), sp.set([1, 2])
+    )
+    scenario.p("migrating again does nothing")
+    scenario += unified_staking_pool.migrate_owner_stakes([alice.address]).run(
+        sender=administrator.address
+    )
+    scenario.verify_equal(unified_staking_pool.data.owner_stake_counts[alice.address], 2)
+
+    scenario.h2("Transfer moves the last stake into the free position")
+    scenario += unified_staking_pool.transfer(
+        [Transfer.item(alice.address, [sp.record(to_=bob.address, token_id=1, amount=1)])]
+    ).run(sender=alice.address)
+    scenario.verify_equal(unified_staking_pool.data.owner_stake_counts[alice.address], 1)
+    scenario.verify_equal(
+        unified_staking_pool.data.owner_stakes[OwnerPositionKey.make(alice.address, 0)],
+        2,
+    )
+    scenario.verify_equal(
+        unified_staking_pool.data.owner_stake_indexes[
+            OwnerStakeKey.make(alice.address, 2)
+        ],
+        0,
+    )
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes_page(
+            sp.record(owner=bob.address, offset=0, limit=5)
+        ),
+        [1],
+    )
+    scenario.verify(
+        ~unified_staking_pool.view_is_stake_owner(OwnerStakeKey.make(alice.address, 1))
+    )
+
+    scenario.h2("Deposit and withdraw use the index")
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=Constants.PRECISION_FACTOR, stake_id=0)
+    ).run(sender=bob.address)
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=Constants.PRECISION_FACTOR, stake_id=0)
+    ).run(sender=bob.address)
+    scenario.verify_equal(unified_staking_pool.view_owner_stake_count(bob.address), 3)
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes_page(
+            sp.record(owner=bob.address, offset=1, limit=1)
+        ),
+        [3],
+    )
+    scenario.p("cannot add to someone elses stake")
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=Constants.PRECISION_FACTOR, stake_id=2)
+    ).run(sender=bob.address, valid=False)
+    scenario += unified_staking_pool.withdraw(
+        sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=3)
+    ).run(sender=bob.address)
+    scenario.verify_equal(
+        unified_staking_pool.view_owner_stakes_page(
+            sp.record(owner=bob.address, offset=0, limit=5)
+        ),
+        [1, 4],
+    )
+    scenario.verify(
+        ~unified_staking_pool.data.owner_stake_indexes.contains(
+            OwnerStakeKey.make(bob.address, 3)
+        )
+    )
+
+
+@sp.add_test(name="Unified Staking Pool Balance View")
+def test():
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "kathmandu")
+    scenario.h1("Unified Staking Pool Balance View Test")
+    scenario.table_of_contents()
+
+    scenario.h2("Bootstrapping")
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+
+    token_id = sp.nat(0)
+    staking_token = DummyFA2({LedgerKey.make(token_id, administrator.address): sp.unit})
+    scenario += staking_token
+    scenario += staking_token.set_token_metadata(
+        token_id=token_id, token_info=sp.map()
+    ).run(sender=administrator)
+
+    unified_staking_pool = UnifiedStakingPool(
+        staking_token.address,
+        token_id,
+        100,
+        {administrator.address: 1},
+        use_balance_view=True,
+    )
+    scenario += unified_staking_pool
+
+    initial_balance = 1000 * Constants.PRECISION_FACTOR
+    scenario += staking_token.mint(
+        owner=alice.address, token_id=token_id, token_amount=initial_balance
+    )
+    scenario += staking_token.update_operators(
+        [
+            sp.variant(
+                "add_operator",
+                sp.record(
+                    owner=alice.address,
+                    operator=unified_staking_pool.address,
+                    token_id=token_id,
+                ),
+            )
+        ]
+    ).run(sender=alice.address)
+
+    alice_ledger_key = LedgerKey.make(0, alice.address)
+    unified_staking_pool_key = LedgerKey.make(0, unified_staking_pool.address)
+
+    scenario.h2("Same results as the callback path")
+    now = sp.timestamp(0)
+    alices_stake = 1 * Constants.PRECISION_FACTOR
+    alices_balance = initial_balance
+    reward_payout = 1 * Constants.PRECISION_FACTOR
+
+    scenario.p("Alice stakes 1 token and withdraws what she put in")
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=alices_stake, stake_id=0)
+    ).run(sender=alice.address, now=now)
+    scenario.verify_equal(
+        unified_staking_pool.data.current_token_balance, sp.nat(0)
+    )
+    scenario += unified_staking_pool.withdraw(
+        sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=1)
+    ).run(sender=alice.address, now=now)
+    scenario.verify_equal(
+        unified_staking_pool.data.current_token_balance, alices_stake
+    )
+    scenario.verify_equal(staking_token.data.ledger[alice_ledger_key], alices_balance)
+
+    scenario.p("Alice stakes 1 token and withdraws what she put in after reward")
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=alices_stake, stake_id=0)
+    ).run(sender=alice.address, now=now)
+    scenario += staking_token.mint(
+        owner=unified_staking_pool.address,
+        token_id=token_id,
+        token_amount=reward_payout,
+    )
+    scenario += unified_staking_pool.withdraw(
+        sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=2)
+    ).run(sender=alice.address, now=now)
+    scenario.verify_equal(staking_token.data.ledger[alice_ledger_key], alices_balance)
+    scenario.verify_equal(
+        staking_token.data.ledger[unified_staking_pool_key], reward_payout
+    )
+
+    scenario.p("Alice stakes 1 token and withdraws after 1/10 of the time")
+    scenario += unified_staking_pool.deposit(
+        sp.record(token_amount=alices_stake, stake_id=0)
+    ).run(sender=alice.address, now=now)
+    scenario += staking_token.mint(
+        owner=unified_staking_pool.address,
+        token_id=token_id,
+        token_amount=reward_payout,
+    )
+    now = now.add_seconds(10)
+    total_reward = 2 * reward_payout
+    alices_balance += total_reward // 10
+    scenario += unified_staking_pool.withdraw(
+        sp.record(ratio_numerator=1, ratio_denominator=1, stake_id=3)
+    ).run(sender=alice.address, now=now)
+    scenario.verify_equal(staking_token.data.ledger[alice_ledger_key], alices_balance)
+    scenario.verify_equal(
+        staking_token.data.ledger[unified_staking_pool_key], total_reward * 9 // 10
+    )
@@ -1,6 +1,6 @@
 import smartpy as sp
 
-from contracts.tracker.vault import Vault
+from contracts.tracker.vault import Vault, LeanVault
 
 
 @sp.add_test(name="Vault")
@@ -36,3 +36,38 @@ def test():
         valid=False, sender=bob
     )
     # scenario += vault.withdraw(recipient=alice.address, amount=sp.tez(17)).run(valid=False, sender=administrator) this error throws but a level deeper such that "valid=False" is not able to identify it and the test crashes.
+
+
+@sp.add_test(name="Lean Vault")
+def test_lean_vault():
+
+    scenario = sp.test_scenario()
+    scenario.add_flag("protocol", "ithaca")
+    scenario.h1("Lean Vault")
+    scenario.table_of_contents()
+
+    administrator = sp.test_account("Administrator")
+    alice = sp.test_account("Alice")
+    bob = sp.test_account("Robert")
+    scenario.h2("Accounts")
+    scenario.show([administrator, alice, bob])
+
+    vault = LeanVault(administrator.address)
+    scenario += vault
+    scenario += vault.default().run(amount=sp.tez(10), sender=administrator)
+    scenario += vault.default().run(amount=sp.tez(11), sender=bob)
+    scenario.verify_equal(vault.get_balance(), sp.tez(21))
+    scenario += vault.withdraw(recipient=alice.address, amount=sp.tez(5)).run(
+        sender=administrator
+    )
+    scenario.verify_equal(vault.get_balance(), sp.tez(16))
+    scenario += vault.set_delegate(sp.some(alice.public_key_hash)).run(
+        sender=administrator, voting_powers={alice.public_key_hash: 10}
+    )
+
+    scenario += vault.set_delegate(sp.some(bob.public_key_hash)).run(
+        valid=False, sender=bob, voting_powers={bob.public_key_hash: 10}
+    )
+    scenario += vault.withdraw(recipient=alice.address, amount=sp.tez(5)).run(
+        valid=False, sender=bob
+    )
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from utils.kickout_index import (
+    KickoutIndex,
+    build_index,
+    kickable_time,
+    load_stakes,
+    parse_timestamp,
+    plan_kickouts,
+)
+
+MAX_WITHDRAW_DELAY = 100
+
+
+def make_stake(cooldown_start_timestamp, cooldown_duration=10):
+    return {
+        "cooldown_start_timestamp": cooldown_start_timestamp,
+        "cooldown_duration": str(cooldown_duration),
+    }
+
+
+def test_parse_timestamp():
+    assert parse_timestamp(1000) == 1000
+    assert parse_timestamp("1000") == 1000
+    assert parse_timestamp("1970-01-01T00:16:40Z") == 1000
+
+
+def test_kickable_time():
+    assert kickable_time(make_stake(None), MAX_WITHDRAW_DELAY) is None
+    assert kickable_time({"cooldown_duration": "10"}, MAX_WITHDRAW_DELAY) is None
+    assert kickable_time(make_stake({"None": {}}), MAX_WITHDRAW_DELAY) is None
+    assert kickable_time(make_stake("1000"), MAX_WITHDRAW_DELAY) == 1110
+    assert kickable_time(make_stake({"Some": "1000"}), MAX_WITHDRAW_DELAY) == 1110
+
+
+def test_kickable():
+    index = build_index(
+        {
+            1: make_stake("300"),
+            2: make_stake("100"),
+            3: make_stake(None),
+            4: make_stake("200"),
+        },
+        MAX_WITHDRAW_DELAY,
+    )
+    assert len(index) == 3
+    assert index.next_kickable_time() == 210
+    # kickout is only allowed after the kickable time
+    assert index.kickable(210) == []
+    assert index.kickable(311) == [2, 4]
+    assert index.kickable(1000) == [2, 4, 1]
+    assert index.kickable(1000, limit=2) == [2, 4]
+    # the index is left unchanged
+    assert index.kickable(1000) == [2, 4, 1]
+
+
+def test_lazy_deletion():
+    index = KickoutIndex(MAX_WITHDRAW_DELAY)
+    index.update(1, make_stake("100"))
+    index.update(2, make_stake("200"))
+    index.update(1, make_stake("500"))
+    index.remove(2)
+    # the stale heap entries are only dropped once they reach the top
+    assert len(index.heap) == 3
+    assert len(index) == 1
+    assert index.kickable(1000) == [1]
+    assert index.next_kickable_time() == 610
+    assert len(index.heap) == 1
+
+    index.update(1, make_stake(None))
+    assert index.next_kickable_time() is None
+    assert index.heap == []
+
+
+def test_remove_and_readd():
+    index = KickoutIndex(MAX_WITHDRAW_DELAY)
+    index.update(1, make_stake("100"))
+    index.remove(1)
+    index.update(1, make_stake("100"))
+    assert len(index.heap) == 2
+    assert index.kickable(1000) == [1]
+
+
+def test_apply_diffs():
+    index = build_index(
+        {1: make_stake("100"), 2: make_stake("200")},
+        MAX_WITHDRAW_DELAY,
+        [
+            {"action": "remove", "key": "1"},
+            {"action": "update", "key": "2", "value": None},
+            {"action": "update", "key": "3", "value": make_stake("300")},
+            {"action": "update", "key": "4", "value": make_stake("50")},
+            {"action": "update", "key": "4", "value": make_stake(None)},
+        ],
+    )
+    assert len(index) == 1
+    assert index.kickable(1000) == [3]
+
+
+def test_load_stakes(tmp_path):
+    mapping_path = tmp_path / "mapping.json"
+    mapping_path.write_text(json.dumps({"1": make_stake("100")}))
+    assert load_stakes(mapping_path) == {1: make_stake("100")}
+
+    keys_path = tmp_path / "keys.json"
+    keys_path.write_text(
+        json.dumps(
+            [
+                {"key": "1", "value": make_stake("100"), "active": True},
+                {"key": "2", "value": make_stake("200"), "active": False},
+                {"key": "3", "value": make_stake("300")},
+            ]
+        )
+    )
+    assert load_stakes(keys_path) == {1: make_stake("100"), 3: make_stake("300")}
+
+
+def test_plan_kickouts():
+    index = build_index(
+        {stake_id: make_stake(str(stake_id)) for stake_id in range(5)},
+        MAX_WITHDRAW_DELAY,
+    )
+    assert plan_kickouts(
+        index, 1000, gas_limit=250, base_gas=50, gas_per_kickout=100
+    ) == [[0, 1], [2, 3], [4]]
+    assert plan_kickouts(
+        index, 1000, max_batch_size=1, gas_limit=250, base_gas=50, gas_per_kickout=100
+    ) == [[0], [1], [2], [3], [4]]
+    assert plan_kickouts(index, 0) == []
+
+
+def test_plan_kickouts_single_kickout_too_large():
+    index = build_index({1: make_stake("100")}, MAX_WITHDRAW_DELAY)
+    with pytest.raises(ValueError):
+        plan_kickouts(index, 1000, gas_limit=100, base_gas=50, gas_per_kickout=100)
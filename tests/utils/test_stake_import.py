@@ -0,0 +1,108 @@
+import hashlib
+
+import pytest
+
+from utils.stake_import import (
+    chain_checksum,
+    compute_checksum,
+    order_stakes,
+    pack_import_stake,
+    plan_chunks,
+    plan_import,
+)
+
+STAKES = order_stakes(
+    [
+        {
+            "updater": "KT1TezoooozzSmartPyzzSTATiCzzzwwBFA1",
+            "owner": "tz3WEJYwJ6pPwVbSL8FrSoAXRmFHHZTuEnMA",
+            "amount": "9",
+        },
+        {
+            "updater": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+            "owner": "tz29EDhZ4D3XueHxm5RGZsJLHRtj3qSA2MzH",
+            "amount": "8",
+        },
+        {
+            "updater": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+            "owner": "tz1aSkwEot3L2kmUvcoxzjMomb9mvBNuzFK6",
+            "amount": "7",
+        },
+    ]
+)
+
+
+def test_order_stakes():
+    assert [stake["owner"] for stake in STAKES] == [
+        "tz1aSkwEot3L2kmUvcoxzjMomb9mvBNuzFK6",
+        "tz29EDhZ4D3XueHxm5RGZsJLHRtj3qSA2MzH",
+        "tz3WEJYwJ6pPwVbSL8FrSoAXRmFHHZTuEnMA",
+    ]
+    assert [stake["amount"] for stake in STAKES] == [7, 8, 9]
+
+
+def test_pack_import_stake():
+    packed = pack_import_stake(
+        {
+            "updater": "KT1TezoooozzSmartPyzzSTATiCzzzwwBFA1",
+            "owner": "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb",
+            "amount": 123456789,
+        }
+    )
+    assert packed.hex() == (
+        "0507070a0000001601d1371b91fdbd07c8855659c84652230be0eaecd500"
+        "07070a0000001600006b82198cb179e8306c1bedd08f12dc863f328886"
+        "0095b4de75"
+    )
+
+
+def test_chain_checksum():
+    checksum = b""
+    for stake in STAKES:
+        expected = hashlib.blake2b(
+            checksum + pack_import_stake(stake), digest_size=32
+        ).digest()
+        checksum = chain_checksum(checksum, stake)
+        assert checksum == expected
+    assert compute_checksum(STAKES) == checksum
+    assert compute_checksum([]) == b""
+
+
+def test_plan_chunks_gas_limit():
+    chunks = plan_chunks(STAKES, gas_per_record=100, gas_limit=250, base_gas=50)
+    assert chunks == [STAKES[:2], STAKES[2:]]
+
+
+def test_plan_chunks_size_limit():
+    chunks = plan_chunks(STAKES, gas_per_record=1, size_limit=100, base_bytes=50)
+    assert chunks == [[stake] for stake in STAKES]
+
+
+def test_plan_chunks_single_record_too_large():
+    with pytest.raises(ValueError):
+        plan_chunks(STAKES, gas_per_record=100, gas_limit=100, base_gas=50)
+
+
+def test_plan_import():
+    plan = plan_import(STAKES, 1, 100, gas_limit=250, base_gas=50)
+    assert plan["start"] == {"session_id": 1, "expected_count": 3}
+    assert plan["resume_checksum"] == "0x"
+    assert [(chunk["offset"], chunk["stakes"]) for chunk in plan["chunks"]] == [
+        (0, STAKES[:2]),
+        (2, STAKES[2:]),
+    ]
+    assert plan["close"] == {
+        "session_id": 1,
+        "checksum": "0x" + compute_checksum(STAKES).hex(),
+    }
+
+
+def test_plan_import_resume():
+    plan = plan_import(STAKES, 1, 100, resume_from=2, gas_limit=250, base_gas=50)
+    assert plan["resume_checksum"] == "0x" + compute_checksum(STAKES[:2]).hex()
+    assert plan["chunks"] == [{"session_id": 1, "offset": 2, "stakes": STAKES[2:]}]
+    assert plan["close"] == plan_import(STAKES, 1, 100)["close"]
+
+    assert plan_import(STAKES, 1, 100, resume_from=3)["chunks"] == []
+    with pytest.raises(ValueError):
+        plan_import(STAKES, 1, 100, resume_from=4)
@@ -0,0 +1,38 @@
+import smartpy as sp
+import utils.fa2 as fa2
+
+
+class BalanceViewMixin:
+    """Balance view mixin reads the own token balance through the "get_balance" view of the token contract, such that an action can be executed
+    in the same call instead of waiting for the balance_of callback. Tokens without the view are handled through the callback path."""
+
+    def execute_with_own_balance(
+        self, token_address, token_id, balance_field, execute, fallback
+    ):
+        """sets the own balance read through the view and executes the action directly, if the token contract does not offer the view
+        the fallback (balance_of request and call of the internal entrypoint) is executed instead.
+
+        Post: storage[balance_field] = get_balance(LedgerKey(sp.self_address, token_id))
+        Post: execute()
+
+        Args:
+            token_address (sp.address): token address to read the balance from
+            token_id (sp.nat): token id
+            balance_field (str): storage field set by the balance_of callback
+            execute (function): generates the action, same as the internal entrypoint without verify_internal
+            fallback (function): generates the balance_of request and the call of the internal entrypoint
+        """
+        own_balance = sp.local(
+            "own_balance",
+            sp.view(
+                "get_balance",
+                token_address,
+                fa2.LedgerKey.make(token_id, sp.self_address),
+                t=sp.TNat,
+            ),
+        )
+        with sp.if_(own_balance.value.is_some()):
+            setattr(self.data, balance_field, own_balance.value.open_some())
+            execute()
+        with sp.else_():
+            fallback()
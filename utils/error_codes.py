@@ -19,6 +19,10 @@ INVALID_PARAMETER = 603
 NO_INTRODUCER = 604
 TOO_LATE = 610
 TOO_EARLY = 611
+INVALID_IMPORT_SESSION = 620
+INVALID_IMPORT_OFFSET = 621
+INVALID_IMPORT_COUNT = 622
+INVALID_IMPORT_CHECKSUM = 623
 
 ALREADY_PRESENT = 700
 
@@ -26,6 +30,7 @@ NOT_ENOUGH_COLLATERAL = 801
 NOT_BELOW_EMERGENCY = 802
 TOO_MUCH_SETTLEMENT = 803
 NO_VESTER_SET = 804
+VAULT_IMPORT_LOCKED = 805
 
 PRICE_TOO_OLD = 900
 NOT_IN_EPOCH = 903
@@ -368,6 +368,16 @@ class BaseFA2(sp.Contract):
 
         sp.transfer(responses.value, sp.mutez(0), balance_of_request.callback)
 
+    @sp.onchain_view()
+    def get_balance(self, ledger_key):
+        """Returns the balance of the given owner and token id, allows contracts to read a balance without the balance_of callback.
+
+        Args:
+            ledger_key (LedgerKey): owner and token id
+        """
+        sp.set_type(ledger_key, LedgerKey.get_type())
+        sp.result(self.data.ledger.get(ledger_key, sp.nat(0)))
+
 
 class AdministrableMixin:
     """Mixin used to compose andministrable functionality of a contract. Still requires the inerhiting contract to define the apropiate storage."""
@@ -0,0 +1,289 @@
+"""Off-chain index of the stakes of a CommitmentPool that can be kicked out (kickout and kickout_many).
+
+A stake can be kicked out once its cooldown_start_timestamp + cooldown_duration + max_withdraw_delay has passed.
+The index keeps the stakes in cooldown in a min-heap ordered by that kickable time, such that a keeper finds the
+next candidates in O(log n) instead of scanning every stake. The index is built from a storage dump of the stakes
+big map and kept up to date by applying the big map diffs of the following operations. Updated and removed stakes
+leave stale heap entries behind, they are skipped (and dropped) when they reach the top of the heap.
+
+Usage:
+    python -m utils.kickout_index stakes.json --max-withdraw-delay 172800 --now 2023-01-01T00:00:00Z > batches.json
+    python -m utils.kickout_index stakes.json --diffs diffs.json --max-withdraw-delay 172800 --max-batch-size 20
+"""
+import argparse
+import datetime
+import heapq
+import json
+import sys
+
+from utils.migration import HARD_GAS_LIMIT_PER_OPERATION
+
+# estimates for kickout_many, calibrate with a dry-run of the first batch
+DEFAULT_BASE_GAS = 60000
+DEFAULT_GAS_PER_KICKOUT = 8000
+
+
+def parse_timestamp(value):
+    """Returns the timestamp in seconds since epoch.
+
+    Args:
+        value (str or int): RFC3339 timestamp as returned by the node/indexer or seconds since epoch
+
+    Returns:
+        int: seconds since epoch
+    """
+    if isinstance(value, int) or str(value).lstrip("-").isdigit():
+        return int(value)
+    return int(
+        datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    )
+
+
+def kickable_time(stake, max_withdraw_delay):
+    """Returns the time after which the stake can be kicked out, None if the stake has not entered the cooldown.
+
+    Args:
+        stake (dict): the stake as stored in the stakes big map
+        max_withdraw_delay (int): max_withdraw_delay of the CommitmentPool
+
+    Returns:
+        int: seconds since epoch (kickout is allowed for now > kickable time) or None
+    """
+    cooldown_start_timestamp = stake.get("cooldown_start_timestamp")
+    if cooldown_start_timestamp is None:
+        return None
+    if isinstance(cooldown_start_timestamp, dict):
+        # micheline-like option as returned by some indexers, {"Some": value} or {"None": {}}
+        if "Some" not in cooldown_start_timestamp:
+            return None
+        cooldown_start_timestamp = cooldown_start_timestamp["Some"]
+    return (
+        parse_timestamp(cooldown_start_timestamp)
+        + int(stake["cooldown_duration"])
+        + max_withdraw_delay
+    )
+
+
+class KickoutIndex:
+    """Min-heap of the stakes in cooldown ordered by their kickable time."""
+
+    def __init__(self, max_withdraw_delay):
+        """
+        Args:
+            max_withdraw_delay (int): max_withdraw_delay of the CommitmentPool
+        """
+        self.max_withdraw_delay = max_withdraw_delay
+        self.heap = []
+        self.kickable_times = {}
+
+    def __len__(self):
+        return len(self.kickable_times)
+
+    def update(self, stake_id, stake):
+        """Adds or updates a stake, stakes without cooldown are removed from the index.
+
+        Args:
+            stake_id (int): the stake id
+            stake (dict): the stake as stored in the stakes big map
+        """
+        stake_kickable_time = kickable_time(stake, self.max_withdraw_delay)
+        if stake_kickable_time is None:
+            self.remove(stake_id)
+            return
+        if self.kickable_times.get(stake_id) == stake_kickable_time:
+            return
+        self.kickable_times[stake_id] = stake_kickable_time
+        heapq.heappush(self.heap, (stake_kickable_time, stake_id))
+
+    def remove(self, stake_id):
+        """Removes a stake (withdrawn, kicked out or recommited), its heap entry is dropped lazily.
+
+        Args:
+            stake_id (int): the stake id
+        """
+        self.kickable_times.pop(stake_id, None)
+
+    def apply_diffs(self, diffs):
+        """Applies the big map diffs of the stakes big map.
+
+        Args:
+            diffs (list): {"action": "update"|"remove", "key", "value"} entries in operation order, an update without
+                value is a removal (same as the diffs of the node)
+        """
+        for diff in diffs:
+            stake_id = int(diff["key"])
+            if diff.get("action") == "remove" or diff.get("value") is None:
+                self.remove(stake_id)
+            else:
+                self.update(stake_id, diff["value"])
+
+    def pop_stale(self):
+        """Drops the heap entries of removed or updated stakes from the top of the heap."""
+        while self.heap:
+            stake_kickable_time, stake_id = self.heap[0]
+            if self.kickable_times.get(stake_id) == stake_kickable_time:
+                return
+            heapq.heappop(self.heap)
+
+    def next_kickable_time(self):
+        """Returns the earliest kickable time of the index.
+
+        Returns:
+            int: seconds since epoch or None if no stake is in cooldown
+        """
+        self.pop_stale()
+        if not self.heap:
+            return None
+        return self.heap[0][0]
+
+    def kickable(self, now, limit=None):
+        """Returns the stakes that can be kicked out at now, earliest first. The index is left unchanged, call remove
+        (or apply the diffs) once the kickout is included.
+
+        Args:
+            now (int): seconds since epoch
+            limit (int, optional): maximum number of stakes. Defaults to None (all).
+
+        Returns:
+            list: the stake ids
+        """
+        candidates = []
+        seen = set()
+        popped = []
+        self.pop_stale()
+        while self.heap and self.heap[0][0] < now:
+            if limit is not None and len(candidates) >= limit:
+                break
+            entry = heapq.heappop(self.heap)
+            popped.append(entry)
+            if entry[1] not in seen:
+                # a removed and re-added stake can have two entries with the same time
+                seen.add(entry[1])
+                candidates.append(entry[1])
+            self.pop_stale()
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        return candidates
+
+
+def load_stakes(path):
+    """Loads the stakes of a storage dump. Both a plain mapping of stake id to stake and the list of big map keys as
+    returned by an indexer (entries with "key", "value" and optionally "active") are supported.
+
+    Args:
+        path (str): path of the json dump
+
+    Returns:
+        dict: stake id to stake
+    """
+    with open(path) as dump_file:
+        dump = json.load(dump_file)
+
+    if isinstance(dump, dict):
+        return {int(stake_id): stake for stake_id, stake in dump.items()}
+
+    return {
+        int(entry["key"]): entry["value"]
+        for entry in dump
+        if entry.get("active", True)
+    }
+
+
+def build_index(stakes, max_withdraw_delay, diffs=()):
+    """Builds the index of a storage dump and applies the big map diffs since the dump.
+
+    Args:
+        stakes (dict): stake id to stake
+        max_withdraw_delay (int): max_withdraw_delay of the CommitmentPool
+        diffs (list, optional): big map diffs since the dump. Defaults to ().
+
+    Returns:
+        KickoutIndex: the index
+    """
+    index = KickoutIndex(max_withdraw_delay)
+    for stake_id, stake in stakes.items():
+        index.update(stake_id, stake)
+    index.apply_diffs(diffs)
+    return index
+
+
+def plan_kickouts(
+    index,
+    now,
+    max_batch_size=None,
+    gas_limit=HARD_GAS_LIMIT_PER_OPERATION,
+    base_gas=DEFAULT_BASE_GAS,
+    gas_per_kickout=DEFAULT_GAS_PER_KICKOUT,
+):
+    """Splits the kickable stakes into kickout_many parameters, each batch stays below the gas limit of an operation.
+
+    Args:
+        index (KickoutIndex): the index
+        now (int): seconds since epoch
+        max_batch_size (int, optional): maximum number of stakes per batch. Defaults to None (gas limit only).
+        gas_limit (int, optional): gas limit of one batch. Defaults to HARD_GAS_LIMIT_PER_OPERATION.
+        base_gas (int, optional): estimated gas of the call without any stake. Defaults to DEFAULT_BASE_GAS.
+        gas_per_kickout (int, optional): estimated gas per kicked out stake. Defaults to DEFAULT_GAS_PER_KICKOUT.
+
+    Returns:
+        list: the batches, lists of stake ids
+    """
+    if base_gas + gas_per_kickout > gas_limit:
+        raise ValueError("a single kickout does not fit into the gas limit")
+
+    batch_size = (gas_limit - base_gas) // gas_per_kickout
+    if max_batch_size is not None:
+        batch_size = min(batch_size, max_batch_size)
+
+    candidates = index.kickable(now)
+    return [
+        candidates[offset : offset + batch_size]
+        for offset in range(0, len(candidates), batch_size)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Lists the stakes of a CommitmentPool that can be kicked out."
+    )
+    parser.add_argument("stakes", help="json dump of the stakes big map")
+    parser.add_argument(
+        "--diffs", help="json list of the stakes big map diffs since the dump"
+    )
+    parser.add_argument("--max-withdraw-delay", type=int, required=True)
+    parser.add_argument(
+        "--now", help="timestamp of the kickout, defaults to the current time"
+    )
+    parser.add_argument("--max-batch-size", type=int)
+    parser.add_argument("--gas-limit", type=int, default=HARD_GAS_LIMIT_PER_OPERATION)
+    parser.add_argument("--base-gas", type=int, default=DEFAULT_BASE_GAS)
+    parser.add_argument("--gas-per-kickout", type=int, default=DEFAULT_GAS_PER_KICKOUT)
+    args = parser.parse_args(argv)
+
+    diffs = []
+    if args.diffs:
+        with open(args.diffs) as diffs_file:
+            diffs = json.load(diffs_file)
+    now = (
+        parse_timestamp(args.now)
+        if args.now
+        else int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    )
+
+    index = build_index(load_stakes(args.stakes), args.max_withdraw_delay, diffs)
+    plan = {
+        "next_kickable_time": index.next_kickable_time(),
+        "batches": plan_kickouts(
+            index,
+            now,
+            max_batch_size=args.max_batch_size,
+            gas_limit=args.gas_limit,
+            base_gas=args.base_gas,
+            gas_per_kickout=args.gas_per_kickout,
+        ),
+    }
+    json.dump(plan, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Off-chain planner for the migration of the vaults of a v3 engine into another v3 engine (import_vault_contexts).
+
+The planner reads a storage dump of the vault_contexts big map of the source engine, normalises the
+minted amounts to the compound interest rate of the target engine and splits the import into batches
+that fit into the gas and size limits of a single operation. The migration moves debt and collateral:
+
+    1. Disable the source engine: call update (flushes deferred accrual too) to mint the accrual
+       up to the migration, then remove it as administrator of the synthetic token (no mint, burn,
+       liquidation or accrual anymore) and set the target engine as administrator instead. Dump the
+       vault contexts and the compound interest rate of the source engine afterwards.
+    2. For every batch hand the vaults over on the source engine: call its execute entrypoint with the
+       lambda of contracts/tracker/vault_export.py for the owners of the batch. The collateral is sent to
+       the custody address (the admin running the migration) and the vault contexts are deleted.
+    3. Import the batch from the custody address into the target engine: the tez engine originates new
+       vaults funded out of the amount of the call (send the balance of the batch), the token engines pull
+       the balance of the batch from the custody address (approve the target engine as operator first).
+    4. touch the imported owners for their governance stakes and lock the import.
+
+The TrackerEngine, the AsyncTokenTrackerEngine and the v2 TokenTrackerEngine cannot hand over the collateral
+of their vaults (no admin access to the collateral), their vaults have to be closed by the owners instead.
+
+Usage:
+    python -m utils.migration dump.json --source-compound-interest-rate 1003000000000 \\
+        --target-compound-interest-rate 1000000000000 --tez > batches.json
+"""
+import argparse
+import json
+import sys
+
+# same as utils.constants.PRECISION_FACTOR, not imported to keep the planner free of smartpy
+PRECISION_FACTOR = 10**12
+
+HARD_GAS_LIMIT_PER_OPERATION = 1040000
+MAX_OPERATION_DATA_LENGTH = 32 * 1024
+
+# estimates for a v3 engine, calibrate with a dry-run of the first batch before running the migration
+DEFAULT_BASE_GAS = 80000
+DEFAULT_GAS_PER_VAULT = 3000
+# the tez engine originates a vault per imported vault context (the storage burn is paid by the sender)
+DEFAULT_GAS_PER_TEZ_VAULT = 12000
+DEFAULT_BASE_BYTES = 512
+ADDRESS_BYTES = 22
+OPTION_BYTES = 1
+
+
+def nat_bytes(value):
+    """Returns the number of bytes of a nat in the binary (zarith) encoding.
+
+    Args:
+        value (int): the nat
+
+    Returns:
+        int: the encoded size in bytes
+    """
+    size = 1
+    value >>= 6
+    while value > 0:
+        size += 1
+        value >>= 7
+    return size
+
+
+def ceil_div(dividend, divisor):
+    """Returns the rounded up division, same as ceil_div in the v3 engines.
+
+    Args:
+        dividend (int): the number to be divided
+        divisor (int): the divisor
+
+    Returns:
+        int: the rounded up quotient
+    """
+    return -(-dividend // divisor)
+
+
+def load_vault_contexts(path):
+    """Loads the vault contexts of a storage dump. Both a plain mapping of owner to vault context and the
+    list of big map keys as returned by an indexer (entries with "key", "value" and optionally "active") are
+    supported.
+
+    Args:
+        path (str): path of the json dump
+
+    Returns:
+        dict: owner address to vault context
+    """
+    with open(path) as dump_file:
+        dump = json.load(dump_file)
+
+    if isinstance(dump, dict):
+        return dump
+
+    return {
+        entry["key"]: entry["value"] for entry in dump if entry.get("active", True)
+    }
+
+
+def convert_vault_context(
+    vault_context,
+    source_compound_interest_rate,
+    target_compound_interest_rate,
+):
+    """Converts a vault context of the source engine into the imported vault context of the target engine. The minted
+    amount is turned into the current token amount at the source rate and normalised again at the target rate (both
+    rounded up like the v3 engines do). The introducer is kept, the vault address of a tez engine is not: the target
+    engine originates a new vault.
+
+    Args:
+        vault_context (dict): the vault context of the source engine
+        source_compound_interest_rate (int): compound interest rate of the source engine at migration time
+        target_compound_interest_rate (int): compound interest rate of the target engine at migration time
+
+    Returns:
+        dict: the imported vault context
+    """
+    token_amount = ceil_div(
+        int(vault_context["minted"]) * source_compound_interest_rate, PRECISION_FACTOR
+    )
+    return {
+        "minted": ceil_div(
+            token_amount * PRECISION_FACTOR, target_compound_interest_rate
+        ),
+        "balance": int(vault_context["balance"]),
+        "introducer": vault_context.get("introducer"),
+    }
+
+
+def estimate_vault_import_bytes(vault_context):
+    """Returns the estimated size of one imported vault context in the operation parameter.
+
+    Args:
+        vault_context (dict): the converted vault context
+
+    Returns:
+        int: the estimated size in bytes
+    """
+    size = (
+        ADDRESS_BYTES
+        + nat_bytes(vault_context["minted"])
+        + nat_bytes(vault_context["balance"])
+        + OPTION_BYTES
+    )
+    if vault_context["introducer"] is not None:
+        size += ADDRESS_BYTES
+    return size
+
+
+def plan_batches(
+    vault_contexts,
+    gas_limit=HARD_GAS_LIMIT_PER_OPERATION,
+    base_gas=DEFAULT_BASE_GAS,
+    gas_per_vault=DEFAULT_GAS_PER_VAULT,
+    size_limit=MAX_OPERATION_DATA_LENGTH,
+    base_bytes=DEFAULT_BASE_BYTES,
+):
+    """Splits the vault contexts into batches for import_vault_contexts, each batch stays below the gas and the
+    size limit of an operation. The owners are processed in sorted order to get a reproducible plan.
+
+    Args:
+        vault_contexts (dict): owner address to converted vault context
+        gas_limit (int, optional): gas limit of one batch. Defaults to HARD_GAS_LIMIT_PER_OPERATION.
+        base_gas (int, optional): estimated gas of the call without any vault. Defaults to DEFAULT_BASE_GAS.
+        gas_per_vault (int, optional): estimated gas per imported vault. Defaults to DEFAULT_GAS_PER_VAULT.
+        size_limit (int, optional): size limit of one batch in bytes. Defaults to MAX_OPERATION_DATA_LENGTH.
+        base_bytes (int, optional): estimated size of the operation without any vault. Defaults to DEFAULT_BASE_BYTES.
+
+    Returns:
+        list: the batches, lists of {"owner", "vault_context"} ready to be used as parameter
+    """
+    if base_gas + gas_per_vault > gas_limit:
+        raise ValueError("a single vault does not fit into the gas limit")
+
+    batches = []
+    batch = []
+    batch_gas = base_gas
+    batch_bytes = base_bytes
+    for owner in sorted(vault_contexts):
+        vault_context = vault_contexts[owner]
+        vault_bytes = estimate_vault_import_bytes(vault_context)
+        if batch and (
+            batch_gas + gas_per_vault > gas_limit
+            or batch_bytes + vault_bytes > size_limit
+        ):
+            batches.append(batch)
+            batch = []
+            batch_gas = base_gas
+            batch_bytes = base_bytes
+        batch.append({"owner": owner, "vault_context": vault_context})
+        batch_gas += gas_per_vault
+        batch_bytes += vault_bytes
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def plan_migration(
+    vault_contexts,
+    source_compound_interest_rate,
+    target_compound_interest_rate,
+    is_tez,
+    **batch_limits
+):
+    """Converts the vault contexts of the source engine and splits them into import batches. The owners of a batch are
+    the owners to export from the source engine (see contracts/tracker/vault_export.py), the balance of a batch is the
+    collateral to send (tez engine) or to approve (token engines) for its import.
+
+    Args:
+        vault_contexts (dict): owner address to vault context of the source engine
+        source_compound_interest_rate (int): compound interest rate of the source engine at migration time
+        target_compound_interest_rate (int): compound interest rate of the target engine at migration time
+        is_tez (bool): whether the target engine is a TezCollateralTrackerEngine (a vault is originated per import)
+        **batch_limits: limits passed to plan_batches
+
+    Returns:
+        dict: the batches, the balances of the batches and the total token amount the total supply of the target engine
+            increases by
+    """
+    if is_tez:
+        batch_limits.setdefault("gas_per_vault", DEFAULT_GAS_PER_TEZ_VAULT)
+    converted_vault_contexts = {
+        owner: convert_vault_context(
+            vault_context,
+            source_compound_interest_rate,
+            target_compound_interest_rate,
+        )
+        for owner, vault_context in vault_contexts.items()
+    }
+    total_token_amount = sum(
+        ceil_div(
+            vault_context["minted"] * target_compound_interest_rate,
+            PRECISION_FACTOR,
+        )
+        for vault_context in converted_vault_contexts.values()
+    )
+    batches = plan_batches(converted_vault_contexts, **batch_limits)
+    return {
+        "batches": batches,
+        "batch_balances": [
+            sum(vault_import["vault_context"]["balance"] for vault_import in batch)
+            for batch in batches
+        ],
+        "total_token_amount": total_token_amount,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Plans the import of vault contexts into a v3 engine."
+    )
+    parser.add_argument("dump", help="json dump of the vault_contexts big map")
+    parser.add_argument("--source-compound-interest-rate", type=int, required=True)
+    parser.add_argument("--target-compound-interest-rate", type=int, required=True)
+    parser.add_argument(
+        "--tez", action="store_true", help="target is a TezCollateralTrackerEngine"
+    )
+    parser.add_argument("--gas-limit", type=int, default=HARD_GAS_LIMIT_PER_OPERATION)
+    parser.add_argument("--base-gas", type=int, default=DEFAULT_BASE_GAS)
+    parser.add_argument(
+        "--gas-per-vault",
+        type=int,
+        help="defaults to DEFAULT_GAS_PER_TEZ_VAULT with --tez, DEFAULT_GAS_PER_VAULT otherwise",
+    )
+    parser.add_argument("--size-limit", type=int, default=MAX_OPERATION_DATA_LENGTH)
+    args = parser.parse_args(argv)
+
+    gas_per_vault = args.gas_per_vault
+    if gas_per_vault is None:
+        gas_per_vault = (
+            DEFAULT_GAS_PER_TEZ_VAULT if args.tez else DEFAULT_GAS_PER_VAULT
+        )
+
+    plan = plan_migration(
+        load_vault_contexts(args.dump),
+        args.source_compound_interest_rate,
+        args.target_compound_interest_rate,
+        args.tez,
+        gas_limit=args.gas_limit,
+        base_gas=args.base_gas,
+        gas_per_vault=gas_per_vault,
+        size_limit=args.size_limit,
+    )
+    json.dump(plan, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
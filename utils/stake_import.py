@@ -0,0 +1,233 @@
+"""Off-chain companion of the resumable stake import of the StakeManager (start_import_session, import_stakes_chunk and
+close_import_session).
+
+The tool orders the stakes deterministically (by owner, then updater), splits them into chunks sized with the gas
+measured per record and computes the checksum the StakeManager chains over every imported stake. An interrupted
+import is resumed by passing the imported_count of the open session (view import_session), the already imported
+records are skipped and the checksum up to that point is reported to compare it with the one on-chain.
+
+Usage:
+    python -m utils.stake_import stakes.json --session-id 1 --gas-per-record 2200 > chunks.json
+    python -m utils.stake_import stakes.json --session-id 1 --gas-per-record 2200 --resume-from 1200 > chunks.json
+"""
+import argparse
+import hashlib
+import json
+import sys
+
+from pytezos.michelson.types import MichelsonType
+
+from utils.migration import (
+    ADDRESS_BYTES,
+    DEFAULT_BASE_BYTES,
+    HARD_GAS_LIMIT_PER_OPERATION,
+    MAX_OPERATION_DATA_LENGTH,
+    nat_bytes,
+)
+
+# estimate for the call without any record, calibrate with a dry-run of the first chunk
+DEFAULT_BASE_GAS = 60000
+
+# ImportStake of the StakeManager, laid out as ("updater", ("owner", "amount"))
+IMPORT_STAKE_TYPE = MichelsonType.match(
+    {
+        "prim": "pair",
+        "args": [
+            {"prim": "address"},
+            {"prim": "pair", "args": [{"prim": "address"}, {"prim": "nat"}]},
+        ],
+    }
+)
+
+
+def pack_import_stake(stake):
+    """Returns the packed import stake, same as sp.pack of the ImportStake record of the StakeManager.
+
+    Args:
+        stake (dict): updater, owner and amount
+
+    Returns:
+        bytes: the packed stake
+    """
+    return IMPORT_STAKE_TYPE.from_python_object(
+        (stake["updater"], stake["owner"], int(stake["amount"]))
+    ).pack()
+
+
+def chain_checksum(checksum, stake):
+    """Returns the next checksum of the chain, same as the StakeManager computes it.
+
+    Args:
+        checksum (bytes): the checksum so far
+        stake (dict): the imported stake
+
+    Returns:
+        bytes: blake2b(checksum + pack(stake))
+    """
+    return hashlib.blake2b(
+        checksum + pack_import_stake(stake), digest_size=32
+    ).digest()
+
+
+def compute_checksum(stakes):
+    """Returns the checksum after importing all given stakes in order.
+
+    Args:
+        stakes (list): the ordered stakes
+
+    Returns:
+        bytes: the checksum
+    """
+    checksum = b""
+    for stake in stakes:
+        checksum = chain_checksum(checksum, stake)
+    return checksum
+
+
+def order_stakes(stakes):
+    """Orders the stakes to import by owner and updater.
+
+    Args:
+        stakes (list): {"updater", "owner", "amount"} entries
+
+    Returns:
+        list: the ordered stakes
+    """
+    return sorted(
+        (
+            {
+                "updater": stake["updater"],
+                "owner": stake["owner"],
+                "amount": int(stake["amount"]),
+            }
+            for stake in stakes
+        ),
+        key=lambda stake: (stake["owner"], stake["updater"]),
+    )
+
+
+def load_stakes(path):
+    """Loads the stakes to import and orders them by owner and updater.
+
+    Args:
+        path (str): path of the json list of {"updater", "owner", "amount"}
+
+    Returns:
+        list: the ordered stakes
+    """
+    with open(path) as stakes_file:
+        return order_stakes(json.load(stakes_file))
+
+
+def plan_chunks(
+    stakes,
+    gas_per_record,
+    gas_limit=HARD_GAS_LIMIT_PER_OPERATION,
+    base_gas=DEFAULT_BASE_GAS,
+    size_limit=MAX_OPERATION_DATA_LENGTH,
+    base_bytes=DEFAULT_BASE_BYTES,
+):
+    """Splits the ordered stakes into chunks, each chunk stays below the gas and the size limit of an operation.
+
+    Args:
+        stakes (list): the ordered stakes
+        gas_per_record (int): measured gas per imported record
+        gas_limit (int, optional): gas limit of one chunk. Defaults to HARD_GAS_LIMIT_PER_OPERATION.
+        base_gas (int, optional): measured gas of the call without any record. Defaults to DEFAULT_BASE_GAS.
+        size_limit (int, optional): size limit of one chunk in bytes. Defaults to MAX_OPERATION_DATA_LENGTH.
+        base_bytes (int, optional): estimated size of the operation without any record. Defaults to DEFAULT_BASE_BYTES.
+
+    Returns:
+        list: the chunks, lists of stakes
+    """
+    if base_gas + gas_per_record > gas_limit:
+        raise ValueError("a single record does not fit into the gas limit")
+
+    chunks = []
+    chunk = []
+    chunk_gas = base_gas
+    chunk_bytes = base_bytes
+    for stake in stakes:
+        record_bytes = 2 * ADDRESS_BYTES + nat_bytes(stake["amount"])
+        if chunk and (
+            chunk_gas + gas_per_record > gas_limit
+            or chunk_bytes + record_bytes > size_limit
+        ):
+            chunks.append(chunk)
+            chunk = []
+            chunk_gas = base_gas
+            chunk_bytes = base_bytes
+        chunk.append(stake)
+        chunk_gas += gas_per_record
+        chunk_bytes += record_bytes
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def plan_import(stakes, session_id, gas_per_record, resume_from=0, **chunk_limits):
+    """Plans the (remaining) calls of an import session.
+
+    Args:
+        stakes (list): the ordered stakes
+        session_id (int): the id of the import session
+        gas_per_record (int): measured gas per imported record
+        resume_from (int, optional): imported_count of the open session. Defaults to 0.
+        **chunk_limits: limits passed to plan_chunks
+
+    Returns:
+        dict: the start and close parameters, the checksum expected on-chain at resume_from and the chunk parameters
+    """
+    if resume_from > len(stakes):
+        raise ValueError("more records imported than planned")
+
+    chunks = []
+    offset = resume_from
+    for chunk in plan_chunks(stakes[resume_from:], gas_per_record, **chunk_limits):
+        chunks.append({"session_id": session_id, "offset": offset, "stakes": chunk})
+        offset += len(chunk)
+
+    return {
+        "start": {"session_id": session_id, "expected_count": len(stakes)},
+        "resume_checksum": "0x" + compute_checksum(stakes[:resume_from]).hex(),
+        "chunks": chunks,
+        "close": {
+            "session_id": session_id,
+            "checksum": "0x" + compute_checksum(stakes).hex(),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Plans a resumable stake import into the StakeManager."
+    )
+    parser.add_argument("stakes", help="json list of updater, owner and amount")
+    parser.add_argument("--session-id", type=int, required=True)
+    parser.add_argument("--gas-per-record", type=int, required=True)
+    parser.add_argument(
+        "--resume-from",
+        type=int,
+        default=0,
+        help="imported_count of the open import session",
+    )
+    parser.add_argument("--gas-limit", type=int, default=HARD_GAS_LIMIT_PER_OPERATION)
+    parser.add_argument("--base-gas", type=int, default=DEFAULT_BASE_GAS)
+    parser.add_argument("--size-limit", type=int, default=MAX_OPERATION_DATA_LENGTH)
+    args = parser.parse_args(argv)
+
+    plan = plan_import(
+        load_stakes(args.stakes),
+        args.session_id,
+        args.gas_per_record,
+        resume_from=args.resume_from,
+        gas_limit=args.gas_limit,
+        base_gas=args.base_gas,
+        size_limit=args.size_limit,
+    )
+    json.dump(plan, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()